@@ -0,0 +1,64 @@
+"""Time of `Tracker.diff` over a whole session.
+
+Replays the `demo-data` changelogs with synthetic gazes at `--rate` Hz
+(see `gaze_annotation.py`), and times the diff from the first to the
+last snapshot, which moves the gazes of every moved token, and the time
+to turn its gaze changes into `GazeChange` tuples.
+
+Usage (from the repository root, with gazel importable):
+    python benchmarks/diff_gazes.py [--rate HZ] [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from gaze_annotation import synthetic_gazes  # noqa: E402
+
+from gazel import Tracker  # noqa: E402
+
+DEMO_DATA = os.path.join(os.path.dirname(__file__), os.pardir, "demo-data")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'session':<16}{'gazes':>10}{'changes':>10}{'gaze changes':>14}{'diff':>10}"
+        f"{'tuples':>10}"
+    )
+    for language in sorted(os.listdir(DEMO_DATA)):
+        base = os.path.join(DEMO_DATA, language)
+        with open(os.path.join(base, f"Sample-Data.{language}")) as f:
+            source = f.read()
+        with open(os.path.join(base, "changelog.json")) as f:
+            changelog = json.load(f)["log"][:-1]
+        gazes = synthetic_gazes(source, changelog, args.rate)
+        tracker = Tracker(source, gazes, changelog, language, 0)
+
+        best = tuples = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            diff = tracker.diff(0, len(tracker.snapshots))
+            best = min(best, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            list(diff.gaze_changes)
+            tuples = min(tuples, time.perf_counter() - start)
+
+        print(
+            f"{'demo-data/' + language:<16}{len(gazes):>10}"
+            f"{len(diff.token_changes):>10}{len(diff.gaze_changes):>14}{best:>9.3f}s"
+            f"{tuples:>9.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
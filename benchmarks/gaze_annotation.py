@@ -0,0 +1,87 @@
+"""Time to assign tokens to the gazes of a high frequency eye tracker.
+
+Replays the `demo-data` changelogs, and spreads synthetic gazes over
+each session at `--rate` Hz, most of them on a character of the source
+and some of them outside of it. Reports the time to build a `Tracker`
+with these gazes, and the part of it that is spent on assigning tokens
+to gazes.
+
+Usage (from the repository root, with gazel importable):
+    python benchmarks/gaze_annotation.py [--rate HZ] [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from gazel import Tracker
+from gazel.core import gaze_tokens, gaze_versions
+from gazel.core_types import Categories
+
+DEMO_DATA = os.path.join(os.path.dirname(__file__), os.pardir, "demo-data")
+
+
+def synthetic_gazes(source: str, changelog: list, rate: float) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    start = changelog[0]["timestamp"] - 10_000
+    end = changelog[-1]["timestamp"] + 10_000
+    times = np.arange(start, end, 1000 / rate).astype(np.int64)
+    line_lengths = np.array([len(line) for line in source.splitlines()])
+    lines = rng.integers(0, len(line_lengths) + 5, len(times))
+    cols = rng.integers(0, 1 + line_lengths[np.minimum(lines, len(line_lengths) - 1)])
+
+    return pd.DataFrame(
+        {
+            "x": rng.random(len(times)) * 1920,
+            "y": rng.random(len(times)) * 1080,
+            "system_time": times,
+            "source_file_line": lines,
+            "source_file_col": cols,
+        }
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'session':<16}{'gazes':>10}{'tracker':>12}{'annotation':>12}")
+    for language in sorted(os.listdir(DEMO_DATA)):
+        base = os.path.join(DEMO_DATA, language)
+        with open(os.path.join(base, f"Sample-Data.{language}")) as f:
+            source = f.read()
+        with open(os.path.join(base, "changelog.json")) as f:
+            changelog = json.load(f)["log"][:-1]
+        gazes = synthetic_gazes(source, changelog, args.rate)
+
+        tracker_time = annotation_time = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            tracker = Tracker(source, gazes, changelog, language)
+            tracker.gazes
+            tracker_time = min(tracker_time, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            gaze_tokens(
+                gazes["source_file_line"],
+                gazes["source_file_col"],
+                gaze_versions(gazes["system_time"], tracker.snapshot_times),
+                tracker.snapshots,
+                Categories(),
+            )
+            annotation_time = min(annotation_time, time.perf_counter() - start)
+
+        print(
+            f"{'demo-data/' + language:<16}{len(gazes):>10}"
+            f"{tracker_time:>11.2f}s{annotation_time:>11.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
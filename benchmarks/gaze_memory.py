@@ -0,0 +1,61 @@
+"""Memory used by the gazes of a session.
+
+Builds a `Tracker` for each `demo-data` session, once with the raw
+gazes of its `plugin.xml` and once with its fixations, and reports the
+bytes per gaze of the input frame, of `Tracker.gazes`, and of the typed
+columns of `Tracker.gaze_store` that back it.
+
+Usage (from the repository root, with gazel importable):
+    python benchmarks/gaze_memory.py
+"""
+
+import json
+import os
+
+import pandas as pd
+
+from gazel import Tracker
+from gazel.fixation_filters.core import ivt, load_gazes_from_xml
+from gazel.fixation_filters.ivt import IVTConfig
+
+DEMO_DATA = os.path.join(os.path.dirname(__file__), os.pardir, "demo-data")
+
+
+def frame_bytes(frame: pd.DataFrame) -> int:
+    return int(frame.memory_usage(deep=True).sum())
+
+
+def main():
+    print(f"{'session':<24}{'gazes':>8}{'input':>10}{'gazes':>10}{'store':>10}")
+    for language in sorted(os.listdir(DEMO_DATA)):
+        base = os.path.join(DEMO_DATA, language)
+        with open(os.path.join(base, f"Sample-Data.{language}")) as f:
+            source = f.read()
+        with open(os.path.join(base, "changelog.json")) as f:
+            changelog = json.load(f)["log"][:-1]
+
+        raw = load_gazes_from_xml(os.path.join(base, "plugin.xml"))
+        raw = raw.rename(columns={"plugin_time": "system_time"})
+        raw["system_time"] = pd.to_numeric(raw["system_time"])
+        fixations = ivt(
+            os.path.join(base, "core.xml"),
+            os.path.join(base, "plugin.xml"),
+            changelog,
+            IVTConfig(50, 80),
+        )
+
+        for kind, gazes in (("raw", raw), ("fixations", fixations)):
+            tracker = Tracker(source, gazes, changelog, language)
+            size = len(gazes)
+            store = getattr(tracker, "gaze_store", None)
+            columns = [frame_bytes(gazes), frame_bytes(tracker.gazes)]
+            if store is not None:
+                columns.append(store.nbytes)
+            print(
+                f"{f'demo-data/{language} {kind}':<24}{size:>8}"
+                + "".join(f"{c / size:>9.0f}B" for c in columns)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark for the import time of gazel.
+
+Every statement is timed in a fresh interpreter, since imports are
+cached per process. Reports the best wall time over several runs, and
+which heavy dependencies each statement ends up loading.
+
+Usage (from the repository root, with gazel importable):
+    python benchmarks/import_time.py [--repeat N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+
+HEAVY_DEPENDENCIES = ("pandas", "numpy", "tree_sitter", "git", "tqdm", "pampy")
+
+STATEMENTS = (
+    "pass",
+    "import gazel",
+    "from gazel.fixation_filters.ivt import identifyFixations",
+    "from gazel import fixation_filters; fixation_filters.core",
+    "from gazel import Tracker",
+)
+
+_TIMER = """
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+loaded = [m for m in {dependencies!r} if m in sys.modules]
+print(elapsed, ",".join(loaded))
+"""
+
+
+def time_statement(statement: str) -> Tuple[float, List[str]]:
+    script = _TIMER.format(statement=statement, dependencies=HEAVY_DEPENDENCIES)
+    env = {**os.environ, "PYTHONPATH": os.getcwd()}
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    ).stdout.split()
+    loaded = output[1].split(",") if len(output) > 1 else []
+
+    return float(output[0]), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'statement':<60}{'time':>10}  loaded")
+    for statement in STATEMENTS:
+        timings = [time_statement(statement) for _ in range(args.repeat)]
+        best = min(t for t, _ in timings)
+        loaded = timings[-1][1]
+        print(f"{statement:<60}{best * 1000:>8.1f}ms  {', '.join(loaded) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
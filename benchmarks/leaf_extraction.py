@@ -0,0 +1,102 @@
+"""Micro-benchmark for leaf extraction.
+
+Compares `gazel.parsing.extract_leaves` (and `extract_tokens_from_tree`,
+which is built on it) against the recursive `walk_tree` based extractor
+that gazel used before, on the `demo-data` sources and on a synthetic
+20k line file.
+
+Usage (from the repository root, with gazel importable):
+    python benchmarks/leaf_extraction.py [--repeat N]
+"""
+import argparse
+import os
+import sys
+import timeit
+from typing import Callable, List, Tuple
+
+from tree_sitter import Tree, TreeCursor
+
+from gazel.parsing import extract_leaves, extract_tokens_from_tree, parse
+
+DEMO_DATA = os.path.join(os.path.dirname(__file__), os.pardir, "demo-data")
+SYNTHETIC_LINES = 20_000
+
+
+def _recursive_walk(cursor: TreeCursor, move: str, fn) -> None:
+    if move in ("down", "right"):
+        fn(cursor)
+        if cursor.goto_first_child():
+            _recursive_walk(cursor, "down", fn)
+        elif cursor.goto_next_sibling():
+            _recursive_walk(cursor, "right", fn)
+        elif cursor.goto_parent():
+            _recursive_walk(cursor, "up", fn)
+    elif move == "up":
+        if cursor.goto_next_sibling():
+            _recursive_walk(cursor, "right", fn)
+        elif cursor.goto_parent():
+            _recursive_walk(cursor, "up", fn)
+
+
+def recursive_extract(tree: Tree) -> List[Tuple[Tuple[int, int], str]]:
+    """the extractor gazel used before `extract_leaves`"""
+    children = []
+
+    def walker(cursor: TreeCursor):
+        if cursor.node.child_count == 0:
+            children.append(
+                ((cursor.node.start_byte, cursor.node.end_byte), cursor.node.type)
+            )
+
+    _recursive_walk(tree.walk(), "down", walker)
+
+    return children
+
+
+def load_sources() -> List[Tuple[str, str, str]]:
+    sources = []
+    for language in sorted(os.listdir(DEMO_DATA)):
+        path = os.path.join(DEMO_DATA, language, f"Sample-Data.{language}")
+        with open(path) as f:
+            source = f.read()
+        sources.append((f"demo-data/{language}", language, source))
+
+    # repeat the cpp sample until it is at least SYNTHETIC_LINES long
+    name, language, source = next(s for s in sources if s[1] == "cpp")
+    repeats = -(-SYNTHETIC_LINES // len(source.splitlines()))
+    sources.append((f"synthetic {SYNTHETIC_LINES} lines", language, source * repeats))
+
+    return sources
+
+
+def bench(fn: Callable[[], object], repeat: int) -> float:
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # the recursive walker recurses once per cursor move
+    sys.setrecursionlimit(10_000_000)
+
+    print(f"{'source':<24}{'leaves':>9}{'recursive':>12}{'tokens':>12}{'leaves':>12}")
+    for name, language, source in load_sources():
+        tree = parse(source, language)
+        assert recursive_extract(tree) == extract_tokens_from_tree(tree)
+
+        timings = [
+            bench(lambda: recursive_extract(tree), args.repeat),
+            bench(lambda: extract_tokens_from_tree(tree), args.repeat),
+            bench(lambda: extract_leaves(tree), args.repeat),
+        ]
+        leaf_count = len(extract_leaves(tree).kinds)
+        print(
+            f"{name:<24}{leaf_count:>9}"
+            + "".join(f"{t * 1000:>10.2f}ms" for t in timings)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Memory and access time of snapshot histories with checkpoints.
+
+Replays the `demo-data` changelogs, and a synthetic session of small
+edits on a 2k line file, with different checkpoint intervals. Reports
+the memory held by the snapshots, the time to build them, and the
+time to access a random snapshot and to iterate over all of them.
+
+Usage (from the repository root, with gazel importable):
+    python benchmarks/snapshot_history.py [--edits N] [--intervals K [K ...]]
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+import tracemalloc
+from typing import List, Tuple
+
+from gazel.core import make_versions
+from gazel.snapshot_cache import SnapshotCache
+
+DEMO_DATA = os.path.join(os.path.dirname(__file__), os.pardir, "demo-data")
+SYNTHETIC_LINES = 2_000
+
+
+def load_sessions(edits: int) -> List[Tuple[str, str, str, List[dict]]]:
+    sessions = []
+    for language in sorted(os.listdir(DEMO_DATA)):
+        base = os.path.join(DEMO_DATA, language)
+        with open(os.path.join(base, f"Sample-Data.{language}")) as f:
+            source = f.read()
+        with open(os.path.join(base, "changelog.json")) as f:
+            changelog = json.load(f)["log"][:-1]
+        sessions.append((f"demo-data/{language}", language, source, changelog))
+
+    # a long file, typed into at a few places
+    name, language, source, _ = next(s for s in sessions if s[1] == "cpp")
+    source *= -(-SYNTHETIC_LINES // len(source.splitlines()))
+    rng = random.Random(0)
+    line_count = len(source.splitlines())
+    rows = [rng.randrange(line_count) for _ in range(5)]
+    changelog = [
+        {
+            "type": "insert",
+            "row": rows[i * len(rows) // edits],
+            "col": 0,
+            "text": rng.choice(["x", " ", ";", "\n"]),
+            "timestamp": i,
+        }
+        for i in range(edits)
+    ]
+    sessions.append((f"synthetic {SYNTHETIC_LINES} lines", language, source, changelog))
+
+    return sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edits", type=int, default=100)
+    parser.add_argument("--intervals", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--accesses", type=int, default=50)
+    args = parser.parse_args()
+
+    print(
+        f"{'session':<24}{'interval':>10}{'memory':>12}{'build':>12}"
+        f"{'random':>12}{'iterate':>12}"
+    )
+    for name, language, source, changelog in load_sessions(args.edits):
+        for interval in args.intervals:
+            # without a snapshot cache, which would keep snapshots alive
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            snapshots = make_versions(
+                source,
+                language,
+                changelog,
+                cache=SnapshotCache(0),
+                checkpoint_interval=interval,
+            )
+            memory = tracemalloc.get_traced_memory()[0] - before
+            tracemalloc.stop()
+            del snapshots
+
+            start = time.perf_counter()
+            snapshots = make_versions(
+                source,
+                language,
+                changelog,
+                cache=SnapshotCache(0),
+                checkpoint_interval=interval,
+            )
+            build = time.perf_counter() - start
+
+            rng = random.Random(0)
+            indices = [rng.randrange(len(snapshots)) for _ in range(args.accesses)]
+            start = time.perf_counter()
+            for i in indices:
+                snapshots[i]
+            random_access = (time.perf_counter() - start) / len(indices)
+
+            start = time.perf_counter()
+            for _ in snapshots:
+                pass
+            iterate = time.perf_counter() - start
+
+            print(
+                f"{name:<24}{interval:>10}{memory / 2**20:>10.1f}MB"
+                f"{build:>11.2f}s{random_access * 1e3:>10.2f}ms{iterate:>11.3f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Memory used by the tokens of a session.
+
+Replays the `demo-data` changelogs, and a synthetic session of small
+edits on a 5k line file, and compares the memory held by the token
+tables of all snapshots with the memory the same tokens take as
+`Token` objects, the representation gazel used before `TokenTable`.
+
+Usage (from the repository root, with gazel importable):
+    python benchmarks/token_memory.py [--edits N]
+"""
+
+import argparse
+import json
+import os
+import random
+import tracemalloc
+from typing import List, Tuple
+
+from gazel.core import make_versions
+from gazel.core_types import Snapshot
+
+DEMO_DATA = os.path.join(os.path.dirname(__file__), os.pardir, "demo-data")
+SYNTHETIC_LINES = 5_000
+
+
+def load_sessions(edits: int) -> List[Tuple[str, str, str, List[dict]]]:
+    sessions = []
+    for language in sorted(os.listdir(DEMO_DATA)):
+        base = os.path.join(DEMO_DATA, language)
+        with open(os.path.join(base, f"Sample-Data.{language}")) as f:
+            source = f.read()
+        with open(os.path.join(base, "changelog.json")) as f:
+            changelog = json.load(f)["log"][:-1]
+        sessions.append((f"demo-data/{language}", language, source, changelog))
+
+    # a long file, with single character inserts spread over it
+    name, language, source, _ = next(s for s in sessions if s[1] == "cpp")
+    source *= -(-SYNTHETIC_LINES // len(source.splitlines()))
+    rng = random.Random(0)
+    line_count = len(source.splitlines())
+    changelog = [
+        {
+            "type": "insert",
+            "row": rng.randrange(line_count),
+            "col": 0,
+            "text": " ",
+            "timestamp": i,
+        }
+        for i in range(edits)
+    ]
+    sessions.append((f"synthetic {SYNTHETIC_LINES} lines", language, source, changelog))
+
+    return sessions
+
+
+def table_bytes(snapshots: List[Snapshot]) -> int:
+    return sum(
+        getattr(snapshot.tokens, column).nbytes
+        for snapshot in snapshots
+        for column in snapshot.tokens.columns
+    )
+
+
+def object_bytes(snapshots: List[Snapshot]) -> int:
+    # one snapshot at a time, the objects of a whole session
+    # may not fit into memory
+    total = 0
+    tracemalloc.start()
+    for snapshot in snapshots:
+        before = tracemalloc.get_traced_memory()[0]
+        tokens = tuple(snapshot.tokens)
+        total += tracemalloc.get_traced_memory()[0] - before
+        del tokens
+    tracemalloc.stop()
+
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edits", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'session':<24}{'snapshots':>10}{'tokens':>10}{'objects':>12}{'table':>12}")
+    for name, language, source, changelog in load_sessions(args.edits):
+        snapshots = make_versions(source, language, changelog)
+        token_count = sum(len(snapshot.tokens) for snapshot in snapshots)
+        objects, table = object_bytes(snapshots), table_bytes(snapshots)
+        print(
+            f"{name:<24}{len(snapshots):>10}{token_count:>10}"
+            f"{objects / 2**20:>10.1f}MB{table / 2**20:>10.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Construction time and memory of gazel's core value types.
+
+Compares `Point`, `Position`, `Range` and `Token` from
+`gazel.core_types` against the frozen dataclasses gazel used before,
+by building the five objects that make up a token.
+
+Usage (from the repository root, with gazel importable):
+    python benchmarks/value_types.py [--count N] [--repeat N]
+"""
+
+import argparse
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+
+from gazel import core_types
+
+
+@dataclass(frozen=True, eq=True, order=True)
+class Point:
+    line: int
+    col: int
+
+
+@dataclass(frozen=True, repr=True, eq=True, order=True)
+class Position:
+    index: int
+    point: Point
+
+
+@dataclass(frozen=True, repr=True, eq=True, order=True)
+class Range:
+    start: Position
+    end: Position
+
+
+@dataclass(frozen=True, eq=True, order=True)
+class Token:
+    range: Range
+    source: str
+    id: int
+    syntax_node: str
+
+
+DATACLASSES = (Point, Position, Range, Token)
+SLOTTED = (core_types.Point, core_types.Position, core_types.Range, core_types.Token)
+
+
+def make_tokens(types, count: int) -> list:
+    Point, Position, Range, Token = types
+    return [
+        Token(
+            Range(Position(i, Point(i, 0)), Position(i + 1, Point(i, 1))),
+            "source",
+            i,
+            "identifier",
+        )
+        for i in range(count)
+    ]
+
+
+def bytes_per_token(types, count: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tokens = make_tokens(types, count)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del tokens
+
+    return used / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'types':<14}{'construct':>14}{'hash x3':>14}{'memory':>16}")
+    for name, types in (("dataclasses", DATACLASSES), ("slotted", SLOTTED)):
+        construct = min(
+            timeit.repeat(
+                lambda: make_tokens(types, args.count), number=1, repeat=args.repeat
+            )
+        )
+        tokens = make_tokens(types, args.count)
+        hashing = min(
+            timeit.repeat(
+                lambda: [hash(t) + hash(t) + hash(t) for t in tokens],
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        memory = bytes_per_token(types, args.count)
+        print(
+            f"{name:<14}"
+            f"{construct / args.count * 1e6:>10.2f}us/t"
+            f"{hashing / args.count * 1e6:>10.2f}us/t"
+            f"{memory:>12.0f}B/tok"
+        )
+
+
+if __name__ == "__main__":
+    main()
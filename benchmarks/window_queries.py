@@ -0,0 +1,90 @@
+"""Time of snapshot and gaze window queries on a `Tracker`.
+
+Replays the `demo-data` changelogs with synthetic gazes at `--rate` Hz
+(see `gaze_annotation.py`), and times the gazes of every snapshot with
+`get_fixations_for_snapshot`, and the snapshot at 10k timestamps with
+`snapshot_at_time`, and with the batch variants of both where the
+tracker has them.
+
+Usage (from the repository root, with gazel importable):
+    python benchmarks/window_queries.py [--rate HZ] [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from gaze_annotation import synthetic_gazes  # noqa: E402
+
+from gazel import Tracker  # noqa: E402
+
+DEMO_DATA = os.path.join(os.path.dirname(__file__), os.pardir, "demo-data")
+
+
+def best_of(repeat: int, function) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'session':<16}{'gazes':>10}{'snapshots':>10}{'windows':>12}{'at time':>12}"
+        f"{'batch':>12}{'batch':>12}"
+    )
+    for language in sorted(os.listdir(DEMO_DATA)):
+        base = os.path.join(DEMO_DATA, language)
+        with open(os.path.join(base, f"Sample-Data.{language}")) as f:
+            source = f.read()
+        with open(os.path.join(base, "changelog.json")) as f:
+            changelog = json.load(f)["log"][:-1]
+        gazes = synthetic_gazes(source, changelog, args.rate)
+        tracker = Tracker(source, gazes, changelog, language, 0)
+        tracker.gazes
+        times = np.random.default_rng(0).uniform(
+            tracker.snapshot_times[0], tracker.snapshot_times[-1] + 10_000, 10_000
+        )
+
+        windows = best_of(
+            args.repeat,
+            lambda: [
+                tracker.get_fixations_for_snapshot(i)
+                for i in range(len(tracker.snapshots))
+            ],
+        )
+        at_time = best_of(
+            args.repeat, lambda: [tracker.snapshot_at_time(t) for t in times]
+        )
+        row = (
+            f"{'demo-data/' + language:<16}{len(gazes):>10}"
+            f"{len(tracker.snapshots):>10}{windows:>11.3f}s{at_time:>11.3f}s"
+        )
+        if hasattr(tracker, "snapshots_at_times"):
+            windows = best_of(
+                args.repeat,
+                lambda: tracker.get_fixations_for_snapshots(
+                    range(len(tracker.snapshots))
+                ),
+            )
+            at_time = best_of(args.repeat, lambda: tracker.snapshots_at_times(times))
+            row += f"{windows:>11.3f}s{at_time:>11.3f}s"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,34 @@
-import functools
-from typing import Dict, List, Set, Union, cast
+import bisect
+from typing import Callable, Iterable, List, Optional, Set, Tuple, Union, cast
 
-import pampy
+import numpy as np
 import pandas as pd
 
-from gazel.core import assign_tokens_to_gazes, make_versions
-from gazel.core_types import GazeChange, Snapshot, SnapshotDiff, TokenChange
-
-
-def get_edit_time(edit: Dict) -> float:
-    if edit["type"] == "aggregated":
-        return edit["edits"][-1]["timestamp"]
-    else:
-        return edit["timestamp"]
-
-
-def _merge_edits(*edits: Dict) -> Dict:
-    assert len(edits) > 0
-
-    first_edit = edits[0]
-
-    if first_edit["type"] == "aggregated":
-        first_edit["edits"].extend(edits[1:])
-        return first_edit
-    else:
-        return {"type": "aggregated", "edits": list(edits)}
-
-
-def _aggregate_edits(edits: List[Dict], aggregation_window=3):
-    def _reducer(accumulated_edits: List[Dict], next_edit: Dict) -> List[Dict]:
-        if not accumulated_edits:
-            return [next_edit]
-        else:
-            last_edit = accumulated_edits[-1]
-            last_time = get_edit_time(last_edit)
-            curr_time = get_edit_time(next_edit)
-            if curr_time - last_time < aggregation_window:
-                return accumulated_edits[:-1] + [_merge_edits(last_edit, next_edit)]
-
-            return accumulated_edits + [next_edit]
-
-    return functools.reduce(_reducer, edits, cast(List[Dict], []))
+from gazel.aggregation import AggregationPolicy, aggregate_edits, time_window
+from gazel.common import GazeConfig
+from gazel.core import GazeTokens, LazyVersions, gaze_tokens, gaze_versions
+from gazel.core_types import (
+    GAZE_CHANGE_TYPES,
+    NO_ID,
+    GazeChanges,
+    Snapshot,
+    SnapshotDiff,
+    TokenChange,
+    syntax_nodes,
+)
+from gazel.gaze_store import GazeStore
+from gazel.snapshot_cache import SnapshotCache, default_cache_size
+
+
+def _reserve(array: np.ndarray, size: int) -> np.ndarray:
+    """`array`, grown geometrically to hold at least `size` values, like
+    the columns of `GazeStore`."""
+    if size <= len(array):
+        return array
+
+    grown = np.empty(max(size, 2 * len(array), 16), dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
 
 
 class Tracker:
@@ -51,15 +39,330 @@ class Tracker:
         changelog: List[dict],
         source_language: str,
         edit_aggregation_window: float = 3.0,
+        snapshot_cache_size: Optional[int] = None,
+        checkpoint_interval: int = 1,
+        edit_aggregation_policy: Optional[AggregationPolicy] = None,
+        lazy: bool = False,
+        replay_cache_size: int = 16,
     ):
-        changelog = _aggregate_edits(changelog, edit_aggregation_window)
+        # edits are grouped by time, in milliseconds like their
+        # timestamps, unless another policy is given, see `gazel.aggregation`
+        if edit_aggregation_policy is None:
+            edit_aggregation_policy = time_window(edit_aggregation_window)
+        self.edit_aggregation_policy = edit_aggregation_policy
+        changelog = list(aggregate_edits(changelog, edit_aggregation_policy))
         self.changelog = changelog
         # self.changelog = changelog
 
         self.edit_aggregation_window = edit_aggregation_window
-        self.snapshots = make_versions(source, source_language, self.changelog)
-        gazes = assign_tokens_to_gazes(gazes.to_dict("records"), self.snapshots)
-        self.gazes: pd.dataFrame = pd.DataFrame(gazes)
+        self.lazy = lazy
+        # repeated source states reuse their parsed token layout,
+        # see `snapshot_cache.stats()` for hit rates. By default the
+        # cache shrinks with `checkpoint_interval`, since it keeps the
+        # snapshots in it in full
+        if snapshot_cache_size is None:
+            snapshot_cache_size = default_cache_size(checkpoint_interval)
+        self.snapshot_cache = SnapshotCache(snapshot_cache_size)
+        # every `checkpoint_interval`-th snapshot is stored in full, the
+        # others are rebuilt from deltas when they are accessed. In lazy
+        # mode, snapshots are only built when they are first accessed
+        self.snapshots = LazyVersions(
+            source,
+            source_language,
+            self.changelog,
+            cache=self.snapshot_cache,
+            checkpoint_interval=checkpoint_interval,
+            replay_cache_size=replay_cache_size,
+        )
+        self.snapshot_times = self.snapshots.times
+        # window queries are binary searches over the sorted snapshot
+        # and gaze times
+        self._snapshot_time_index = np.asarray(self.snapshot_times)
+        if not lazy:
+            self.snapshots.build()
+
+        # gazes are kept in typed columns, and the token columns are
+        # filled one snapshot window at a time, the first time that gazes
+        # of the window are needed
+        self.gaze_store = GazeStore(GazeTokens._fields)
+        # snapshot of each gaze, and whether it has its tokens yet, in
+        # buffers that grow with the store, see `_gaze_versions`
+        self._version_buffer = np.empty(0, dtype=np.int64)
+        self._annotated_buffer = np.empty(0, dtype=bool)
+        # rows that were appended or moved to another snapshot since they
+        # were last annotated, so that they are found without a scan
+        self._unannotated: List[np.ndarray] = []
+        self._gazes: Optional[pd.DataFrame] = None
+        # rows of the gazes in order of time, and their times. `None` as
+        # long as the gazes come in order, which is the usual case
+        self._gaze_order: Optional[np.ndarray] = None
+        self._sorted_gaze_times: Optional[np.ndarray] = None
+        # token ids of the annotated gazes, sorted, and the rows of the
+        # gazes for each id. Newly annotated gazes are merged into it
+        # when it is next used, see `_token_gaze_rows`
+        self._token_index: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._new_token_rows: List[Tuple[np.ndarray, np.ndarray]] = []
+        self.append_gazes(gazes)
+
+    def append_edits(self, edits: List[dict]):
+        """Appends edits made after the last snapshot, for sessions that
+        are still in progress. Earlier snapshots are not rebuilt.
+
+        The edits are grouped with the aggregation policy of the tracker,
+        but never join the group of the last snapshot, which is already
+        built. Gazes that were assigned to the last snapshot are assigned
+        again, since some of them may come after the new edits.
+
+        Parameters
+        ----------
+        edits : List[dict]
+            changelog edits, in the format of the changelog the tracker
+            was created with
+        """
+        last = len(self.snapshots) - 1
+        self.snapshots.extend(aggregate_edits(edits, self.edit_aggregation_policy))
+        self._snapshot_time_index = np.asarray(self.snapshot_times)
+        if not self.lazy:
+            self.snapshots.build()
+
+        # the gazes after the last snapshot, which come last in time order
+        times = self._gaze_times
+        if self._gaze_order is not None:
+            times = self._sorted_gaze_times
+        start = (
+            np.searchsorted(times, self.snapshot_times[last], "right") if last else 0
+        )
+        self._assign_gazes(self._window_rows(start, len(times)))
+
+    def append_gazes(self, gazes: Union[List[dict], pd.DataFrame]):
+        """Appends gazes recorded after the gazes of the tracker, for
+        sessions that are still in progress. Earlier gazes are not
+        annotated again.
+
+        Parameters
+        ----------
+        gazes : Union[List[dict], pd.DataFrame]
+            the new gazes, with the same columns as the gazes the tracker
+            was created with
+        """
+        start = len(self.gaze_store)
+        self.gaze_store.append(gazes)
+        size = len(self.gaze_store) - start
+        if not size:
+            return
+
+        self._version_buffer = _reserve(self._version_buffer, start + size)
+        self._annotated_buffer = _reserve(self._annotated_buffer, start + size)
+        self._gaze_versions[start:] = -1
+        self._annotated[start:] = False
+        self._unannotated.append(np.arange(start, start + size))
+        self._index_gazes(start)
+        self._assign_gazes(np.arange(start, start + size))
+
+    def _index_gazes(self, start: int):
+        """Updates the time order of the gazes, after gazes were appended
+        at `start`."""
+        times = self._gaze_times
+        if (
+            self._gaze_order is None
+            and (np.diff(times[max(start - 1, 0) :]) >= 0).all()
+        ):
+            return
+
+        self._gaze_order = np.argsort(times, kind="stable")
+        self._sorted_gaze_times = times[self._gaze_order]
+
+    def _assign_gazes(self, rows: np.ndarray):
+        """Assigns the gazes at `rows` to snapshots. Gazes that move to
+        another snapshot lose their token information, and are annotated
+        again with the new snapshot."""
+        times = self._gaze_times[rows]
+        versions = gaze_versions(times, self.snapshot_times)
+        changed = versions != self._gaze_versions[rows]
+        moved = rows[changed]
+        if self._annotated[moved].any():
+            # the index is rebuilt from the gazes that stay annotated
+            self._token_index = None
+        self._gaze_versions[moved] = versions[changed]
+        self._annotated[moved] = False
+        self._unannotated.append(moved)
+        for column in GazeTokens._fields:
+            self.gaze_store.clear(column, moved)
+
+        self._gazes = None
+        if not self.lazy:
+            self._annotate(self._unannotated_rows())
+
+    def _annotate(self, rows: np.ndarray):
+        """Assigns tokens to the gazes at `rows` that have none yet."""
+        rows = rows[~self._annotated[rows]]
+        if not len(rows):
+            return
+
+        store = self.gaze_store
+        config = GazeConfig()
+        # missing points are not in the source
+        lines, cols = (
+            (
+                np.where(store.mask(key)[rows], -1, store.array(key)[rows])
+                if store.mask(key) is not None
+                else store.array(key)[rows]
+            )
+            for key in (config.line_key, config.col_key)
+        )
+        offsets, nodes, ids, texts = gaze_tokens(
+            lines,
+            cols,
+            self._gaze_versions[rows],
+            self.snapshots,
+            store.categories("syntax_node_text"),
+        )
+        store.write("syntax_node_offset", rows, offsets, missing=nodes < 0)
+        store.write(
+            "syntax_node",
+            rows,
+            syntax_nodes.recode(nodes, store.categories("syntax_node")),
+        )
+        store.write("syntax_node_id", rows, ids, missing=ids == NO_ID)
+        store.write("syntax_node_text", rows, texts)
+        self._annotated[rows] = True
+        found = ids != NO_ID
+        self._new_token_rows.append((ids[found], rows[found]))
+        self._gazes = None
+
+    @property
+    def _gaze_versions(self) -> np.ndarray:
+        return self._version_buffer[: len(self.gaze_store)]
+
+    @property
+    def _annotated(self) -> np.ndarray:
+        return self._annotated_buffer[: len(self.gaze_store)]
+
+    def _unannotated_rows(self) -> np.ndarray:
+        """The rows of the gazes that have no tokens yet, in order."""
+        if not self._unannotated:
+            return np.empty(0, dtype=np.int64)
+
+        rows = np.unique(np.concatenate(self._unannotated))
+        rows = rows[~self._annotated[rows]]
+        self._unannotated = [rows] if len(rows) else []
+        return rows
+
+    @property
+    def gazes(self) -> pd.DataFrame:
+        """All gazes, annotated with the tokens they fall on, see
+        `GazeStore` for the dtypes of the columns."""
+        self._annotate(self._unannotated_rows())
+        if self._gazes is None:
+            self._gazes = self.gaze_store.frame(columns=self._gaze_columns())
+
+        return self._gazes
+
+    @property
+    def _gaze_times(self) -> np.ndarray:
+        return self._gaze_array(GazeConfig().time_key)
+
+    def _gaze_array(self, column: str) -> np.ndarray:
+        """`gaze_store.array(column)`, which is empty as long as the
+        tracker has no gazes, and so no gaze columns."""
+        if not len(self.gaze_store) and column not in self.gaze_store.columns:
+            return np.empty(0, dtype=np.int64)
+
+        return self.gaze_store.array(column)
+
+    def _gaze_columns(self) -> List[str]:
+        """The columns of the gazes, followed by the token columns."""
+        return [
+            *(c for c in self.gaze_store.columns if c not in GazeTokens._fields),
+            *GazeTokens._fields,
+        ]
+
+    def _token_gaze_rows(self, ids: np.ndarray) -> List[np.ndarray]:
+        """The rows of the annotated gazes on each of the tokens `ids`,
+        in order, looked up in the token index."""
+        if self._token_index is None or self._new_token_rows:
+            if self._token_index is None:
+                token_ids = self.gaze_store.array("syntax_node_id")
+                rows = np.flatnonzero(self._annotated & (token_ids != NO_ID))
+                token_ids = token_ids[rows]
+            else:
+                token_ids, rows = (
+                    np.concatenate(parts)
+                    for parts in zip(self._token_index, *self._new_token_rows)
+                )
+            order = np.lexsort((rows, token_ids))
+            self._token_index = (token_ids[order], rows[order])
+            self._new_token_rows = []
+
+        token_ids, rows = self._token_index
+        starts = np.searchsorted(token_ids, ids, side="left")
+        ends = np.searchsorted(token_ids, ids, side="right")
+        return [rows[start:end] for start, end in zip(starts, ends)]
+
+    def _gaze_records(self) -> Callable[[np.ndarray], List[dict]]:
+        """Returns the gazes at given rows as dicts, with the columns that
+        the gazes have now."""
+        store, columns = self.gaze_store, self._gaze_columns()
+        return lambda rows: store.frame(rows, columns).to_dict("records")
+
+    def _gaze_windows(
+        self, starts: np.ndarray, ends: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """The positions of the gazes in `[starts, ends)` in time order,
+        as two binary searches over the sorted gaze times."""
+        times = self._gaze_times
+        if self._gaze_order is not None:
+            times = self._sorted_gaze_times
+        return np.searchsorted(times, starts), np.searchsorted(times, ends)
+
+    def _window_rows(self, start: int, end: int) -> np.ndarray:
+        if self._gaze_order is None:
+            return np.arange(start, end)
+        # rows keep the order of the gazes
+        return np.sort(self._gaze_order[start:end])
+
+    def _window_gazes(self, start: int, end: int) -> pd.DataFrame:
+        """The annotated gazes at positions `[start, end)` in time order.
+        When the gazes are in order and the whole frame is built, this is
+        a slice of `gazes`, without copying."""
+        rows = self._window_rows(start, end)
+        self._annotate(rows)
+        if self._gazes is None:
+            return self.gaze_store.frame(rows, self._gaze_columns())
+        if self._gaze_order is None:
+            return self._gazes.iloc[start:end]
+        return self._gazes.iloc[rows]
+
+    def gazes_between(self, start: float, end: float) -> pd.DataFrame:
+        """Returns the gazes recorded in `[start, end)`.
+
+        Parameters
+        ----------
+        start : float
+            first timestamp of the window
+        end : float
+            timestamp after the window
+
+        Returns
+        -------
+        pd.DataFrame
+            the gazes of the window, annotated with their tokens
+        """
+        (lo,), (hi,) = self._gaze_windows(np.array([start]), np.array([end]))
+        return self._window_gazes(lo, hi)
+
+    def _batch_windows(
+        self, starts: np.ndarray, ends: np.ndarray
+    ) -> List[pd.DataFrame]:
+        los, his = self._gaze_windows(starts, ends)
+        # gazes of all windows are annotated at once, grouped by snapshot
+        self._annotate(
+            np.concatenate(
+                [self._window_rows(lo, hi) for lo, hi in zip(los, his)]
+                or [np.empty(0, dtype=np.int64)]
+            )
+        )
+        return [self._window_gazes(lo, hi) for lo, hi in zip(los, his)]
 
     def diff(self, start: int = 0, end: int = -1) -> SnapshotDiff:
         """Returns a diff between the snapshot versions
@@ -84,36 +387,49 @@ class Tracker:
             snapshot = self.snapshots[i]
             changes.extend(snapshot.changes)
 
-        gaze_changes: List[GazeChange] = []
-
-        last_snapshot_time = self.snapshots[end - 1].time
-        gazes: pd.DataFrame = self.gazes
-        potentially_changed_gazes = gazes[gazes["system_time"] < last_snapshot_time]
-
-        # TODO: Add gaze changes
-        for token_change in changes:
-            if token_change.type == "moved":
-                assert (
-                    token_change.old and token_change.new
-                ), "TokenChange must have `old` and `new` tokens if change type is `moved`"
-                affected_gazes = potentially_changed_gazes[
-                    potentially_changed_gazes.syntax_node_id == token_change.old.id
-                ]
-                affected_gazes = affected_gazes.to_dict("records")
-
-                for gaze in affected_gazes:
-                    new_col = (
-                        token_change.new.range.start.point.col
-                        + gaze["syntax_node_offset"]
-                    )
-                    new_gaze = {
-                        **gaze,
-                        "source_file_line": token_change.new.range.start.point.line,
-                        "source_file_col": new_col,
-                    }
-                    gaze_changes.append(
-                        GazeChange(type="moved", old=gaze, new=new_gaze)
-                    )
+        # gazes up to the last snapshot are annotated, and the gazes of
+        # moved tokens are found in the token index
+        last_snapshot_time = self.snapshot_times[end - 1]
+        (_,), (window_end,) = self._gaze_windows(
+            np.array([-np.inf]), np.array([last_snapshot_time])
+        )
+        self._annotate(self._window_rows(0, window_end))
+
+        moves = [change for change in changes if change.type == "moved"]
+        for token_change in moves:
+            assert (
+                token_change.old and token_change.new
+            ), "TokenChange must have `old` and `new` tokens if change type is `moved`"
+        gaze_rows = self._token_gaze_rows(
+            np.array([change.old.id for change in moves], dtype=np.int64)
+        )
+        times = self._gaze_times
+        gaze_rows = [rows[times[rows] < last_snapshot_time] for rows in gaze_rows]
+
+        # moved gazes keep their offset in the token
+        rows = np.concatenate(gaze_rows or [np.empty(0, dtype=np.int64)])
+        moved = np.repeat(np.arange(len(moves)), [len(r) for r in gaze_rows])
+        new_starts = np.array(
+            [
+                (change.new.range.start.point.line, change.new.range.start.point.col)
+                for change in moves
+            ],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        store = self.gaze_store
+        config = GazeConfig()
+        offsets = store.array("syntax_node_offset")[rows].astype(np.int64)
+        gaze_changes = GazeChanges(
+            rows,
+            np.full(len(rows), GAZE_CHANGE_TYPES.index("moved"), dtype=np.int8),
+            self._gaze_array(config.line_key)[rows].astype(np.int64),
+            self._gaze_array(config.col_key)[rows].astype(np.int64),
+            new_starts[moved, 0],
+            new_starts[moved, 1] + offsets,
+            self._gaze_records(),
+            config.line_key,
+            config.col_key,
+        )
 
         return SnapshotDiff(
             old=self.snapshots[start],
@@ -145,26 +461,24 @@ class Tracker:
         """
         assert index < len(self.snapshots)
 
-        start_time = pampy.match(
-            # fmt: off
-            index, 
-            0, 0, 
-            default=self.changelog[index]["timestamp"]
-            # fmt: on
+        return self.fixations_for_edit_windows([index], snapshot_only)[0]
+
+    def fixations_for_edit_windows(
+        self, indices: Iterable[int], snapshot_only=False
+    ) -> List[pd.DataFrame]:
+        """`fixations_for_edit_window` for each of `indices`."""
+        indices = np.asarray(indices, dtype=np.int64)
+        # the window of snapshot `i` starts at the edit after it
+        times = np.append(self._snapshot_time_index, np.inf)
+        starts = np.where(
+            indices == 0, 0, times[np.minimum(indices + 1, len(times) - 1)]
         )
-        end_time = pampy.match(
-            index,
-            len(self.snapshots) - 1,
-            float("inf"),
-            default=self.changelog[index + 1]["timestamp"],
-        )
-
-        filtered_index = (self.gazes["system_time"] >= start_time) & (
-            self.gazes["system_time"] < end_time
+        ends = np.where(
+            indices == len(self.snapshots) - 1,
+            np.inf,
+            times[np.minimum(indices + 2, len(times) - 1)],
         )
-        filtered_gazes = self.gazes[filtered_index]
-
-        return filtered_gazes
+        return self._batch_windows(starts, ends)
 
     def snapshot(self, index: int) -> Snapshot:
         """Returns the snapshot at index `index`
@@ -172,9 +486,9 @@ class Tracker:
         Parameters
         ----------
         index : [type]
-            the snapshot index. 
+            the snapshot index.
             This is `0` for the original source version,
-            `1` for the first edit, `2` for second edit 
+            `1` for the first edit, `2` for second edit
             and so on.
 
         Returns
@@ -197,11 +511,27 @@ class Tracker:
         Snapshot
             The snapshot at time `t`
         """
-        for i, _ in enumerate(self.snapshots[1:]):
-            if t >= self.snapshots[i - 1].time and t < self.snapshots[i].time:
-                return self.snapshots[i - 1]
+        index = bisect.bisect_right(self.snapshot_times, t)
+        return self.snapshots[max(index - 1, 0)]
+
+    def snapshots_at_times(self, times: Iterable[float]) -> List[Snapshot]:
+        """Returns the snapshot that exists at each of `times`
 
-        return self.snapshots[-1]
+        Parameters
+        ----------
+        times : Iterable[float]
+            timestamps for which you need the snapshots
+
+        Returns
+        -------
+        List[Snapshot]
+            the snapshot at each timestamp. Times before the first edit
+            give the original snapshot.
+        """
+        indices = np.searchsorted(
+            self._snapshot_time_index, np.asarray(times), side="right"
+        )
+        return [self.snapshots[i] for i in np.maximum(indices - 1, 0).tolist()]
 
     def get_fixations(self):
         return self.gazes
@@ -210,21 +540,27 @@ class Tracker:
         assert i >= 0, "index must be >= 0"
         assert i < len(self.snapshots), "invalid snapshot id"
 
-        start_time = self.snapshots[i].time
-        end_time = (
-            self.snapshots[i + 1].time if i + 1 < len(self.snapshots) else float("inf")
-        )
-        gazes = self.gazes
-        return gazes[(gazes.system_time >= start_time) & (gazes.system_time < end_time)]
+        return self.get_fixations_for_snapshots([i])[0]
+
+    def get_fixations_for_snapshots(self, indices: Iterable[int]) -> List[pd.DataFrame]:
+        """The gazes recorded while each of the snapshots at `indices`
+        existed, see `get_fixations_for_snapshot`."""
+        indices = np.asarray(indices, dtype=np.int64)
+        times = np.append(self._snapshot_time_index, np.inf)
+        return self._batch_windows(times[indices], times[indices + 1])
 
     def get_token_history(
         self, id_or_ids: Union[Set[int], int], start_snapshot=0
     ) -> List[TokenChange]:
-        if isinstance(id_or_ids, int):
+        if isinstance(id_or_ids, (int, np.integer)):
             id_or_ids = {id_or_ids}
 
-        diff = self.diff(start_snapshot, len(self.snapshots))
-        token_changes = diff.token_changes
+        # only token changes are needed, not the gazes of a diff
+        token_changes = [
+            change
+            for snapshot in self.snapshots[start_snapshot:]
+            for change in snapshot.changes
+        ]
         return list(
             filter(
                 lambda change: _get_token_id_for_change(change)
@@ -233,6 +569,30 @@ class Tracker:
             )
         )
 
+    def get_token_gazes(self, id_or_ids: Union[Set[int], int]) -> pd.DataFrame:
+        """Returns the gazes that fell on the tokens with ids `id_or_ids`,
+        in any snapshot.
+
+        Parameters
+        ----------
+        id_or_ids : Union[Set[int], int]
+            a token id, or a set of them
+
+        Returns
+        -------
+        pd.DataFrame
+            the gazes on the tokens, in the order of `gazes`
+        """
+        if isinstance(id_or_ids, (int, np.integer)):
+            id_or_ids = {id_or_ids}
+
+        self._annotate(self._unannotated_rows())
+        rows = self._token_gaze_rows(np.array(sorted(id_or_ids), dtype=np.int64))
+        rows = np.sort(np.concatenate(rows or [np.empty(0, np.int64)]))
+        if self._gazes is not None:
+            return self._gazes.iloc[rows]
+        return self.gaze_store.frame(rows, self._gaze_columns())
+
     def get_first_token_by_text(self, text):
         for snapshot in self.snapshots:
             for token in snapshot.tokens:
@@ -249,4 +609,3 @@ def _get_token_id_for_change(change: TokenChange) -> int:
         return change.new.id
 
     raise Exception("Either old or new token need to exist in TokenChange")
-
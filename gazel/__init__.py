@@ -1,4 +1,72 @@
-from gazel.Tracker import *
-from gazel.fixation_filters import *
-from gazel.core_types import *
-from gazel.pprint import pprint
+"""gazel tracks fixations and source code tokens across edits.
+
+Names are imported lazily, on first access, so that `import gazel`
+stays cheap and heavy dependencies (pandas, tree-sitter) are only
+loaded by the parts of gazel that need them.
+"""
+
+from typing import TYPE_CHECKING, Dict
+
+from gazel._lazy import lazy_package
+
+_FIXATION_FILTERS = "gazel.fixation_filters"
+
+# public name -> module that defines it
+_LAZY_IMPORTS: Dict[str, str] = {
+    "Tracker": "gazel.Tracker",
+    # replaying and gaze assignment, formerly star imported from Tracker
+    "make_versions": "gazel.core",
+    "assign_tokens_to_gazes": "gazel.core",
+    "get_edit_time": "gazel.aggregation",
+    "pprint": "gazel.pprint",
+    "fixation_filters": _FIXATION_FILTERS,
+    **{
+        name: "gazel.core_types"
+        for name in (
+            "Point",
+            "Position",
+            "Range",
+            "IndexRange",
+            "Token",
+            "TokenTable",
+            "PositionMapping",
+            "TokenChange",
+            "GazeChange",
+            "GazeChanges",
+            "Source",
+            "Snapshot",
+            "SnapshotDiff",
+        )
+    },
+    **{
+        name: _FIXATION_FILTERS
+        for name in (
+            "load_gazes_from_xml",
+            "create_gazes_for_fixation_filters",
+            "get_raw_gaze_time",
+            "ivt",
+            "idt",
+            "basic",
+            "IVT",
+            "IDT",
+            "BASIC",
+            "Fixation",
+        )
+    },
+}
+
+_SUBMODULES = {"fixation_filters"}
+
+__all__ = list(_LAZY_IMPORTS)
+
+if TYPE_CHECKING:
+    from gazel import fixation_filters
+    from gazel.aggregation import get_edit_time
+    from gazel.core import assign_tokens_to_gazes, make_versions
+    from gazel.core_types import *
+    from gazel.fixation_filters import *
+    from gazel.pprint import pprint
+    from gazel.Tracker import Tracker
+
+
+__getattr__, __dir__ = lazy_package(__name__, _LAZY_IMPORTS, _SUBMODULES)
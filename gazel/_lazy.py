@@ -0,0 +1,67 @@
+"""Lazy imports of the public names of a package.
+
+A package lists its public names along with the module that defines
+each of them, and calls `lazy_package` to resolve them on first access
+through a module level `__getattr__`.
+"""
+
+import importlib
+import sys
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
+
+# package name -> its lazy names and the ones that are submodules
+_PACKAGES: Dict[str, Tuple[Dict[str, str], Set[str]]] = {}
+
+
+class _Package(ModuleType):
+    def __setattr__(self, name: str, value: Any) -> None:
+        # importing a submodule binds it on its package. A submodule that
+        # has the name of what it defines, e.g. `gazel.Tracker`, is not
+        # bound, so that the name keeps resolving to the definition
+        imports, submodules = _PACKAGES[self.__name__]
+        if (
+            isinstance(value, ModuleType)
+            and value.__name__ == f"{self.__name__}.{name}"
+            and name in imports
+            and name not in submodules
+        ):
+            return
+        super().__setattr__(name, value)
+
+
+def lazy_package(
+    package_name: str, imports: Dict[str, str], submodules: Iterable[str] = ()
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Makes the names of `imports`, a map of public names to the module
+    that defines them, lazy attributes of the package `package_name`.
+    Names in `submodules` stand for the module itself.
+
+    Returns the `__getattr__` and `__dir__` functions of the package.
+    """
+    submodules = set(submodules)
+    _PACKAGES[package_name] = (imports, submodules)
+    package = sys.modules[package_name]
+    namespace = vars(package)
+
+    def __getattr__(name: str) -> Any:
+        module_name = imports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+
+        module = importlib.import_module(module_name)
+        # bind every name that comes from this module at once, like a star
+        # import would, so that they shadow submodules with the same name
+        for other_name, other_module_name in imports.items():
+            if other_module_name == module_name and other_name not in submodules:
+                namespace[other_name] = getattr(module, other_name)
+        if name in submodules:
+            namespace[name] = module
+
+        return namespace[name]
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(imports))
+
+    package.__class__ = _Package
+    return __getattr__, __dir__
@@ -0,0 +1,136 @@
+"""Grouping of changelog edits into aggregated edits.
+
+An aggregated edit is `{"type": "aggregated", "edits": [...]}`, and
+becomes a single snapshot when the changelog is replayed. Which edits
+are grouped is decided by a policy: a function of the last edit of the
+current group and the next edit, which returns whether the next edit
+joins the group.
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List
+
+AggregationPolicy = Callable[[Dict, Dict], bool]
+
+
+def get_edit_time(edit: Dict) -> float:
+    if edit["type"] == "aggregated":
+        return edit["edits"][-1]["timestamp"]
+    else:
+        return edit["timestamp"]
+
+
+def _sub_edits(edit: Dict) -> List[Dict]:
+    return edit["edits"] if edit["type"] == "aggregated" else [edit]
+
+
+def _group(edits: List[Dict]) -> Dict:
+    return edits[0] if len(edits) == 1 else {"type": "aggregated", "edits": edits}
+
+
+def aggregate_edits(edits: Iterable[Dict], policy: AggregationPolicy) -> Iterator[Dict]:
+    """Groups consecutive edits for which `policy` holds.
+
+    Edits are read one at a time, and each group is yielded as soon as
+    it is complete, so `edits` can be a stream. Single edits are yielded
+    as is, and the input edits are not modified.
+
+    Parameters
+    ----------
+    edits : Iterable[Dict]
+        the changelog edits, in order
+    policy : AggregationPolicy
+        decides whether an edit joins the group of the edits before it,
+        see `time_window`, `same_line` and `same_token`
+
+    Yields
+    -------
+    Dict
+        the edits, with grouped edits merged into aggregated edits
+    """
+    group: List[Dict] = []
+    for edit in edits:
+        sub_edits = _sub_edits(edit)
+        if group and policy(group[-1], sub_edits[0]):
+            group.extend(sub_edits)
+            continue
+
+        if group:
+            yield _group(group)
+        group = list(sub_edits)
+
+    if group:
+        yield _group(group)
+
+
+def time_window(window: float = 3.0) -> AggregationPolicy:
+    """Groups edits made less than `window` after the edit before them.
+
+    `window` is in the unit of the edit timestamps, which are
+    milliseconds in changelogs, e.g. `time_window(3000)` for 3 seconds.
+    """
+
+    def policy(previous: Dict, edit: Dict) -> bool:
+        return edit["timestamp"] - previous["timestamp"] < window
+
+    return policy
+
+
+def same_line() -> AggregationPolicy:
+    """Groups edits made on the same line."""
+
+    def policy(previous: Dict, edit: Dict) -> bool:
+        return edit["row"] == previous["row"]
+
+    return policy
+
+
+def _is_word(text: str) -> bool:
+    return text.replace("_", "a").isalnum()
+
+
+def same_token() -> AggregationPolicy:
+    """Groups edits that continue typing or erasing a word where the
+    edit before them left off.
+
+    Edits are grouped before they are parsed, so tokens are approximated
+    by their text: inserts must only contain letters, digits and `_`.
+    """
+
+    def end_col(edit: Dict) -> int:
+        if edit["type"] == "insert":
+            return edit["col"] + len(edit["text"])
+        return edit["col"]
+
+    def policy(previous: Dict, edit: Dict) -> bool:
+        if edit["row"] != previous["row"]:
+            return False
+        if any(
+            e["type"] == "insert" and not _is_word(e["text"]) for e in (previous, edit)
+        ):
+            return False
+
+        col = end_col(previous)
+        if edit["type"] == "delete":
+            # deleting forward, or erasing backwards
+            return edit["col"] == col or edit["col"] + edit["len"] == col
+        return edit["col"] == col
+
+    return policy
+
+
+def all_of(*policies: AggregationPolicy) -> AggregationPolicy:
+    """Groups edits for which all `policies` hold."""
+
+    def policy(previous: Dict, edit: Dict) -> bool:
+        return all(p(previous, edit) for p in policies)
+
+    return policy
+
+
+def any_of(*policies: AggregationPolicy) -> AggregationPolicy:
+    """Groups edits for which any of `policies` holds."""
+
+    def policy(previous: Dict, edit: Dict) -> bool:
+        return any(p(previous, edit) for p in policies)
+
+    return policy
@@ -1,5 +1,4 @@
-from typing import Dict, Mapping, NamedTuple, Tuple
-from gazel.core_types import Point
+from typing import NamedTuple
 
 
 class Id:
@@ -11,31 +10,6 @@ class Id:
         return self.i
 
 
-def create_position_index_mapping(
-    source,
-) -> Tuple[Mapping[int, Point], Mapping[Point, int]]:
-    lines = source.splitlines(True,)
-    index_to_position: Dict[int, Point] = {}
-    position_to_index: Dict[Point, int] = {}
-
-    index = 0
-
-    for line, lineContents in enumerate(lines):
-
-        for col, _ in enumerate(lineContents):
-            point = Point(line=line, col=col)
-            index_to_position[index] = point
-            position_to_index[point] = index
-
-            index += 1
-
-    point = Point(line=len(lines) - 1, col=len(lines[-1]))
-    index_to_position[index] = point
-    position_to_index[point] = index
-
-    return index_to_position, position_to_index
-
-
 class EditConfig(NamedTuple):
     time_key: str = "timestamp"
     size_key: str = "len"
@@ -0,0 +1,50 @@
+import json
+import os
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pytest
+
+DEMO_DATA = os.path.join(os.path.dirname(__file__), os.pardir, "demo-data")
+
+
+def _load_session(language: str) -> Tuple[str, List[Dict]]:
+    base = os.path.join(DEMO_DATA, language)
+    with open(os.path.join(base, f"Sample-Data.{language}")) as f:
+        source = f.read()
+    with open(os.path.join(base, "changelog.json")) as f:
+        changelog = json.load(f)["log"][:-1]
+
+    return source, changelog
+
+
+def _session_gazes(source: str, changelog: List[Dict], count: int = 2000):
+    """Gazes spread over the session and some time around it, most of
+    them on a character of the source and some of them outside of it."""
+    rng = np.random.default_rng(0)
+    start = changelog[0]["timestamp"] - 5_000
+    end = changelog[-1]["timestamp"] + 5_000
+    line_lengths = np.array([len(line) for line in source.splitlines()])
+    lines = rng.integers(0, len(line_lengths) + 5, count)
+    cols = rng.integers(0, 1 + line_lengths[np.minimum(lines, len(line_lengths) - 1)])
+
+    return pd.DataFrame(
+        {
+            "system_time": np.sort(rng.integers(start, end, count)),
+            "source_file_line": lines,
+            "source_file_col": cols,
+        }
+    )
+
+
+@pytest.fixture
+def load_session() -> Callable[[str], Tuple[str, List[Dict]]]:
+    """Loads the source and changelog of a `demo-data` session."""
+    return _load_session
+
+
+@pytest.fixture
+def session_gazes() -> Callable[..., pd.DataFrame]:
+    """Makes synthetic gazes for a session."""
+    return _session_gazes
@@ -1,57 +1,290 @@
-from copy import deepcopy
-from typing import List
+from typing import (
+    TYPE_CHECKING,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+)
+
+import numpy as np
 
 from gazel.common import GazeConfig, Id
 from gazel.core_constructors import make_snapshot
-from gazel.core_types import PositionMapping, Snapshot
+from gazel.core_types import (
+    NO_ID,
+    Categories,
+    Snapshot,
+    syntax_nodes,
+)
 from gazel.edits import edit_source
-from gazel.range import token_at_index
+from gazel.history import SnapshotHistory
+from gazel.snapshot_cache import SnapshotCache, default_cache_size
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def snapshot_times(edits: List[dict]) -> List[float]:
+    """The times of the snapshots that `make_versions` builds for `edits`,
+    without building them. An aggregated edit takes the time of its first
+    edit."""
+    return [0.0] + [
+        (edit["edits"][0] if edit["type"] == "aggregated" else edit)["timestamp"]
+        for edit in edits
+    ]
+
+
+class LazyVersions(Sequence[Snapshot]):
+    """The snapshots of `make_versions`, each one built the first time it
+    is accessed.
+
+    Every snapshot is parsed incrementally from the one before it, and
+    continues its token ids, so accessing a snapshot also builds the ones
+    before it that were not built yet. Built snapshots are stored in a
+    `SnapshotHistory`: with a `checkpoint_interval` above 1, only a few of
+    them are kept in full, the last `replay_cache_size` accessed ones are
+    cached, and evicted ones are rebuilt from the closest retained
+    snapshot before them.
+
+    Parameters
+    ----------
+    source : str
+        the source before the first edit
+    language : str
+        the language of `source`
+    edits : List[dict]
+        the changelog edits, one per snapshot after the first
+    cache : Optional[SnapshotCache], optional
+        the cache of parsed source states, by default a new one of
+        `default_cache_size(checkpoint_interval)`
+    checkpoint_interval : int, optional
+        see `SnapshotHistory`, by default 1
+    replay_cache_size : int, optional
+        see `SnapshotHistory`, by default 1
+    """
+
+    def __init__(
+        self,
+        source: str,
+        language: str,
+        edits: List[dict],
+        cache: Optional[SnapshotCache] = None,
+        checkpoint_interval: int = 1,
+        replay_cache_size: int = 1,
+    ):
+        self.source = source
+        self.language = language
+        self.edits = edits
+        self.times = snapshot_times(edits)
+        if cache is None:
+            cache = SnapshotCache(default_cache_size(checkpoint_interval))
+        self.cache = cache
+        self.history = SnapshotHistory(checkpoint_interval, replay_cache_size)
+        self._next_id = Id()
+
+    def build(self, index: int = -1):
+        """Builds the snapshots up to `index`, by default all of them."""
+        if index < 0:
+            index += len(self)
 
+        history = self.history
+        if not history:
+            snapshot = make_snapshot(
+                self.source, self.language, index=0, next_id=self._next_id
+            )
+            history.append(snapshot)
+            self.cache.put(snapshot)
 
-def make_versions(source: str, language: str, edits: List[dict]) -> List[Snapshot]:
-    snapshots = []
-    snapshot_id = 0
-    next_id = Id()
+        while len(history) <= index:
+            # the latest snapshot is the only one that still
+            # has a syntax tree to reparse incrementally
+            history.append(
+                edit_source(
+                    history[-1],
+                    self.edits[len(history) - 1],
+                    next_id=self._next_id,
+                    id=len(history),
+                    cache=self.cache,
+                )
+            )
 
-    snapshots.append(
-        make_snapshot(source, language, index=snapshot_id, next_id=next_id)
+    def extend(self, edits: Iterable[dict]):
+        """Appends snapshots for `edits`, which are built when accessed."""
+        edits = list(edits)
+        self.edits.extend(edits)
+        self.times.extend(snapshot_times(edits)[1:])
+
+    def __len__(self) -> int:
+        return len(self.edits) + 1
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self)))]
+
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("snapshot index out of range")
+
+        self.build(key)
+        return self.history[key]
+
+    def __iter__(self) -> Iterator[Snapshot]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+def make_versions(
+    source: str,
+    language: str,
+    edits: List[dict],
+    cache: Optional[SnapshotCache] = None,
+    checkpoint_interval: int = 1,
+    replay_cache_size: int = 1,
+) -> SnapshotHistory:
+    versions = LazyVersions(
+        source,
+        language,
+        edits,
+        cache=cache,
+        checkpoint_interval=checkpoint_interval,
+        replay_cache_size=replay_cache_size,
     )
+    versions.build()
+
+    return versions.history
+
 
-    for edit in edits:
-        next_snapshot = edit_source(
-            snapshots[snapshot_id], edit, next_id=next_id, id=len(snapshots)
+def gaze_versions(
+    gaze_times: Iterable[float], snapshot_times: Sequence[float]
+) -> np.ndarray:
+    """Returns the index of the snapshot that each gaze is assigned to:
+    the last snapshot made before the gaze.
+
+    Parameters
+    ----------
+    gaze_times : Iterable[float]
+        the times of the gazes
+    snapshot_times : Sequence[float]
+        the times of the snapshots, in order
+
+    Returns
+    -------
+    np.ndarray
+        a snapshot index per gaze
+    """
+    return np.searchsorted(
+        np.asarray(snapshot_times[1:]), np.asarray(gaze_times), side="left"
+    )
+
+
+class GazeTokens(NamedTuple):
+    """The token under each gaze of a list of gazes, one array per
+    column. Syntax nodes are codes of `syntax_nodes`, and texts are codes
+    of the categories passed to `gaze_tokens`. Gazes without a token have
+    the code -1, and their offset is undefined. Tokens without an id have
+    the id `NO_ID`."""
+
+    syntax_node_offset: np.ndarray
+    syntax_node: np.ndarray
+    syntax_node_id: np.ndarray
+    syntax_node_text: np.ndarray
+
+    @classmethod
+    def empty(cls, size: int) -> "GazeTokens":
+        return cls(
+            np.zeros(size, dtype=np.int64),
+            np.full(size, -1, dtype=np.int32),
+            np.full(size, NO_ID, dtype=np.int64),
+            np.full(size, -1, dtype=np.int32),
         )
-        snapshots.append(next_snapshot)
-        snapshot_id += 1
 
-    return snapshots
 
+def gaze_tokens(
+    lines: Iterable,
+    cols: Iterable,
+    versions: Iterable[int],
+    snapshots: Sequence[Snapshot],
+    texts: Categories,
+) -> GazeTokens:
+    """Finds the token under each gaze, in the snapshot it is assigned to.
+
+    Gazes are handled one snapshot at a time, with array operations.
+    The text of a token is only sliced once, and coded as a category of
+    `texts`.
+
+    Parameters
+    ----------
+    lines : Iterable
+        the line of each gaze
+    cols : Iterable
+        the column of each gaze
+    versions : Iterable[int]
+        the index of the snapshot of each gaze, see `gaze_versions`
+    snapshots : Sequence[Snapshot]
+        the snapshots, of which only the ones in `versions` are accessed
+    texts : Categories
+        the categories of token texts, which new texts are added to
+
+    Returns
+    -------
+    GazeTokens
+        the token columns of the gazes
+    """
+    lines = np.asarray(lines)
+    cols = np.asarray(cols)
+    versions = np.asarray(versions, dtype=np.int64)
+    columns = GazeTokens.empty(len(versions))
+    offsets, nodes, ids, text_codes = columns
+
+    order = np.argsort(versions, kind="stable")
+    for rows in np.split(order, np.flatnonzero(np.diff(versions[order])) + 1):
+        if not len(rows):
+            continue
+        snapshot = snapshots[int(versions[rows[0]])]
+        tokens = snapshot.tokens
+        indices, valid = snapshot.source.mapping.indices_at(lines[rows], cols[rows])
+        token_rows = tokens.rows_at(indices)
+        found = valid & (token_rows >= 0)
+        rows, indices, token_rows = rows[found], indices[found], token_rows[found]
 
-def is_point_valid(line: int, col: int, mapping: PositionMapping) -> bool:
-    if not (line >= 0 and col >= 0): return False
+        offsets[rows] = indices - tokens.start_index[token_rows]
+        nodes[rows] = tokens.syntax_node_codes[token_rows]
+        ids[rows] = tokens.ids[token_rows]
 
-    try:
-        point = mapping[line, col]
+        # slice the text of each token once
+        unique_rows, inverse = np.unique(token_rows, return_inverse=True)
+        source = tokens.source
+        unique_codes = texts.codes(
+            source[start:end]
+            for start, end in zip(
+                tokens.start_index[unique_rows].tolist(),
+                tokens.end_index[unique_rows].tolist(),
+            )
+        )
+        text_codes[rows] = unique_codes[inverse]
 
-        return True
-    except:
-        return False
+    return columns
 
 
 def assign_tokens_to_gazes(
-    gazes: List[dict],
-    snapshots: List[Snapshot],
+    gazes: Union[List[dict], "pd.DataFrame"],
+    snapshots: Sequence[Snapshot],
     gaze_config: GazeConfig = GazeConfig(),
-) -> List[dict]:
+) -> Union[List[dict], "pd.DataFrame"]:
     """Assigns token information to the gazes provided
 
     Parameters
     ----------
-    gazes : List[dict]
-        The gazes to apply the token info to. This list is not mutated by
-        this function.
-    snapshots : List[Snapshot]
-        A list of snapshots from which to obtain token information.
+    gazes : Union[List[dict], pd.DataFrame]
+        The gazes to apply the token info to. They are not mutated by
+        this function. A DataFrame is annotated column by column, without
+        a dict per gaze.
+    snapshots : Sequence[Snapshot]
+        The snapshots from which to obtain token information.
         The timestamps of these snapshots must correspond to the timestamps
         in the gazes
     gaze_config : GazeConfig, optional
@@ -59,38 +292,57 @@ def assign_tokens_to_gazes(
 
     Returns
     -------
-    List[dict]
-        A list of gazes annotated with token information.
+    Union[List[dict], pd.DataFrame]
+        The gazes annotated with token information, in the type they were
+        given in. Gazes without a token get `None` values in a list, and
+        missing values in a DataFrame, which has the token columns of
+        `Tracker.gazes`.
     """
-    # TODO: cleanup
-    # TODO: test
-    current_version = 0
-    gazes = deepcopy(gazes)
-    for gaze in gazes:
-        if current_version + 1 < len(snapshots):
-            if gaze[gaze_config.time_key] > snapshots[current_version + 1].time:
-                current_version += 1
-        line, col = gaze[gaze_config.line_key], gaze[gaze_config.col_key]
-        
-        snapshot = snapshots[current_version]
-        if not is_point_valid(line, col, snapshot.source.mapping):
-            continue
-        gaze_index = snapshot.source.mapping[line, col]
+    import pandas as pd
 
-        token = token_at_index(snapshot, gaze_index)  # TODO
+    keys = (gaze_config.time_key, gaze_config.line_key, gaze_config.col_key)
+    if isinstance(gazes, pd.DataFrame):
+        times, lines, cols = (gazes[key].to_numpy() for key in keys)
+    else:
+        times, lines, cols = ([gaze[key] for gaze in gazes] for key in keys)
 
-        if token:
-            gaze["syntax_node_offset"] = gaze_index - token.range.start.index
-            gaze["syntax_node"] = token.syntax_node
-            gaze["syntax_node_id"] = token.id
-            gaze["syntax_node_text"] = token.source[
-                token.range.start.index : token.range.end.index
-            ]
-        else:
-            gaze["syntax_node_offset"] = None
-            gaze["syntax_node"] = None
-            gaze["syntax_node_id"] = None
-            gaze["syntax_node_text"] = None
+    texts = Categories()
+    offsets, nodes, ids, text_codes = gaze_tokens(
+        lines,
+        cols,
+        gaze_versions(times, [snapshot.time for snapshot in snapshots]),
+        snapshots,
+        texts,
+    )
+    found = nodes >= 0
 
-    return gazes
+    if isinstance(gazes, pd.DataFrame):
+        # only the node types of the gazes, not of every loaded grammar
+        node_names = Categories()
+        return gazes.assign(
+            syntax_node_offset=pd.arrays.IntegerArray(offsets.astype(np.int32), ~found),
+            syntax_node=pd.Categorical.from_codes(
+                syntax_nodes.recode(nodes, node_names), node_names.names
+            ),
+            syntax_node_id=pd.arrays.IntegerArray(ids, ids == NO_ID),
+            syntax_node_text=pd.Categorical.from_codes(text_codes, texts.names),
+        )
 
+    names = syntax_nodes.names
+    return [
+        {
+            **gaze,
+            "syntax_node_offset": offset if found else None,
+            "syntax_node": names[node] if found else None,
+            "syntax_node_id": None if token_id == NO_ID else token_id,
+            "syntax_node_text": texts.names[text] if found else None,
+        }
+        for gaze, found, offset, node, token_id, text in zip(
+            gazes,
+            found.tolist(),
+            offsets.tolist(),
+            nodes.tolist(),
+            ids.tolist(),
+            text_codes.tolist(),
+        )
+    ]
@@ -1,13 +1,23 @@
-from gazel.core_types import Source, PositionMapping, Position, Range, Snapshot, Token
-from gazel.common import create_position_index_mapping, Id
-from gazel.parsing import get_tokens
-from typing import Dict
+from gazel.core_types import (
+    Source,
+    PositionMapping,
+    Position,
+    Range,
+    Snapshot,
+    Token,
+    TokenTable,
+    syntax_nodes,
+)
+from gazel.common import Id
+from gazel.parsing import Leaves, extract_leaves, parse
+from typing import Optional
+
+import numpy as np
+from tree_sitter import Tree
 
 
 def make_source(source: str, language: str) -> Source:
-    itp, pti = create_position_index_mapping(source)
-
-    return Source(source, PositionMapping(itp, pti), language)
+    return Source(source, PositionMapping.from_text(source), language)
 
 
 def token_from_capture(
@@ -21,15 +31,33 @@ def token_from_capture(
     return Token(range=token_range, syntax_node=syntax_node, id=token_id, source=source)
 
 
-def make_snapshot(source: str, language: str, index=0, next_id=Id(),) -> Snapshot:
-    _source = make_source(source, language)
-    captures = get_tokens(source, language, _source.mapping.point_to_index)
-    tokens = tuple(
-        token_from_capture(capture, source, _source.mapping, token_id=next_id())
-        for capture in captures
+def token_table_from_leaves(
+    leaves: Leaves, source: str, mapping: PositionMapping, ids=None
+) -> TokenTable:
+    kinds = np.frombuffer(leaves.kinds, dtype=np.uint16)
+    # tree-sitter kind ids -> syntax node codes
+    codes = np.zeros(max(leaves.kind_names, default=0) + 1, dtype=np.int32)
+    for kind, name in leaves.kind_names.items():
+        codes[kind] = syntax_nodes.code(name)
+
+    return TokenTable.from_spans(
+        source,
+        mapping,
+        np.frombuffer(leaves.start_bytes, dtype=np.int64),
+        np.frombuffer(leaves.end_bytes, dtype=np.int64),
+        codes[kinds],
+        ids,
     )
-    token_by_range: Dict[Range, Token] = {}
-    for token in tokens:
-        token_by_range[token.range] = token
 
-    return Snapshot(index, _source, tokens, _token_by_range=token_by_range)
+
+def make_snapshot(
+    source: str, language: str, index=0, next_id=Id(), tree: Optional[Tree] = None
+) -> Snapshot:
+    _source = make_source(source, language)
+    if tree is None:
+        tree = parse(source, language)
+    leaves = extract_leaves(tree)
+    ids = [next_id() for _ in range(len(leaves.start_bytes))]
+    tokens = token_table_from_leaves(leaves, source, _source.mapping, ids)
+
+    return Snapshot(index, _source, tokens, tree=tree)
@@ -1,81 +1,767 @@
-from dataclasses import dataclass
+import threading
+from array import array
+from bisect import bisect_right
+from dataclasses import FrozenInstanceError, dataclass, field
 from difflib import Differ
+from itertools import accumulate
 from pprint import pformat
-from typing import Dict, List, Literal, Mapping, NamedTuple, Optional, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from tree_sitter import Tree
+
+    from gazel.text import Rope
+
+
+class _Value:
+    """Base of the immutable value types below.
+
+    Behaves like `@dataclass(frozen=True, order=True)`: instances are
+    compared, ordered and hashed as the tuple of their fields. Unlike a
+    frozen dataclass, instances have `__slots__`, set their fields
+    through the slot descriptors instead of `object.__setattr__`, and
+    cache their hash.
+    """
+
+    __slots__ = ("_hash",)
+    _fields: Tuple[str, ...] = ()
+
+    def _astuple(self) -> tuple:
+        return tuple(getattr(self, name) for name in self._fields)
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def __eq__(self, other):
+        if other.__class__ is self.__class__:
+            return self._astuple() == other._astuple()
+        return NotImplemented
+
+    def __lt__(self, other):
+        if other.__class__ is self.__class__:
+            return self._astuple() < other._astuple()
+        return NotImplemented
 
+    def __le__(self, other):
+        if other.__class__ is self.__class__:
+            return self._astuple() <= other._astuple()
+        return NotImplemented
+
+    def __gt__(self, other):
+        if other.__class__ is self.__class__:
+            return self._astuple() > other._astuple()
+        return NotImplemented
+
+    def __ge__(self, other):
+        if other.__class__ is self.__class__:
+            return self._astuple() >= other._astuple()
+        return NotImplemented
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            value = hash(self._astuple())
+            _set_hash(self, value)
+            return value
+
+    def __reduce__(self):
+        return self.__class__, self._astuple()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{self.__class__.__name__}({fields})"
 
-@dataclass(frozen=True, eq=True, order=True)
-class Point:
+
+_set_hash = _Value._hash.__set__  # type: ignore
+
+
+class Point(_Value):
+    __slots__ = ("line", "col")
+    _fields = __slots__
     line: int
     col: int
 
+    def __init__(self, line: int, col: int):
+        _set_line(self, line)
+        _set_col(self, col)
+
+    def _astuple(self) -> tuple:
+        return (self.line, self.col)
+
     def __repr__(self):
         return f"(l={self.line},c={self.col})"
 
 
-@dataclass(frozen=True, repr=True, eq=True, order=True)
-class Position:
+_set_line = Point.line.__set__  # type: ignore
+_set_col = Point.col.__set__  # type: ignore
+
+
+class Position(_Value):
+    __slots__ = ("index", "point")
+    _fields = __slots__
     index: int
     point: Point
 
+    def __init__(self, index: int, point: Point):
+        _set_index(self, index)
+        _set_point(self, point)
+
+    def _astuple(self) -> tuple:
+        return (self.index, self.point)
+
 
-@dataclass(frozen=True, repr=True, eq=True, order=True)
-class Range:
+_set_index = Position.index.__set__  # type: ignore
+_set_point = Position.point.__set__  # type: ignore
+
+
+class Range(_Value):
+    __slots__ = ("start", "end")
+    _fields = __slots__
     start: Position
     end: Position
 
+    def __init__(self, start: Position, end: Position):
+        _set_start(self, start)
+        _set_end(self, end)
+
+    def _astuple(self) -> tuple:
+        return (self.start, self.end)
+
     def __repr__(self):
         return f"Range: [{self.start}, {self.end}]"
 
 
+_set_start = Range.start.__set__  # type: ignore
+_set_end = Range.end.__set__  # type: ignore
+
+
 class IndexRange(NamedTuple):
     start: int
     end: int
 
 
-@dataclass(frozen=True, eq=True, order=True)
-class Token:
+class Token(_Value):
+    __slots__ = ("range", "source", "id", "syntax_node")
+    _fields = __slots__
     range: Range
     source: str
     id: int
     syntax_node: str
 
+    def __init__(self, range: Range, source: str, id: int, syntax_node: str):
+        _set_range(self, range)
+        _set_source(self, source)
+        _set_id(self, id)
+        _set_syntax_node(self, syntax_node)
+
+    def _astuple(self) -> tuple:
+        return (self.range, self.source, self.id, self.syntax_node)
+
     def __repr__(self):
         return self.source[self.range.start.index : self.range.end.index]
 
 
+_set_range = Token.range.__set__  # type: ignore
+_set_source = Token.source.__set__  # type: ignore
+_set_id = Token.id.__set__  # type: ignore
+_set_syntax_node = Token.syntax_node.__set__  # type: ignore
+
+
+# number of lines in one chunk of a `PositionMapping`
+LINES_PER_CHUNK = 256
+
+
+def _line_starts(text: str, offset: int = 0) -> List[int]:
+    """offsets at which the lines of `text` start, if `text`
+    itself starts at `offset`"""
+    starts = list(accumulate(map(len, text.splitlines(True)), initial=offset))
+    if len(starts) > 1:
+        # the last entry is the end of the text, not the start of a line
+        starts.pop()
+
+    return starts
+
+
+def _chunked(
+    line_starts: List[int], first_line: int
+) -> Tuple[Tuple[array, ...], array, array]:
+    chunks = []
+    chunk_starts = array("q")
+    chunk_lines = array("q")
+    for i in range(0, len(line_starts), LINES_PER_CHUNK):
+        offset = line_starts[i]
+        chunk = line_starts[i : i + LINES_PER_CHUNK]
+        chunks.append(array("q", [start - offset for start in chunk]))
+        chunk_starts.append(offset)
+        chunk_lines.append(first_line + i)
+
+    return tuple(chunks), chunk_starts, chunk_lines
+
+
+def _as_int_array(values: Iterable) -> Tuple[np.ndarray, np.ndarray]:
+    """`values` as an int64 array, and a mask of the values that are
+    whole numbers. Other values, e.g. NaN or None, are set to 0."""
+    values = np.asarray(values)
+    if values.dtype.kind in "iu":
+        return values.astype(np.int64, copy=False), np.ones(values.shape, dtype=bool)
+
+    values = np.asarray(values, dtype=np.float64)
+    valid = np.isfinite(values)
+    valid[valid] = values[valid] == np.floor(values[valid])
+
+    return np.where(valid, values, 0).astype(np.int64), valid
+
+
 class PositionMapping:
     """maps from line-col to index &
        index to line-col
+
+    Only the offset at which each line starts is stored. Lines are split
+    like `str.splitlines`, and the column after the last character of the
+    source is a valid point as well.
+
+    Line starts are kept in chunks of `LINES_PER_CHUNK` lines, relative to
+    the start of their chunk. An edit only rebuilds the chunks around it,
+    and shares the others with the mapping it was made from.
     """
 
     def __init__(
         self,
-        index_to_point: Mapping[int, Point] = None,
-        point_to_index: Mapping[Point, int] = None,
+        text: Union[str, "Rope"],
+        chunks: Tuple[array, ...],
+        chunk_starts: array,
+        chunk_lines: array,
     ):
-
-        self.index_to_point = index_to_point
-        self.point_to_index = point_to_index
+        self.text = text
+        self.length = len(text)
+        self._chunks = chunks
+        self._chunk_starts = chunk_starts
+        self._chunk_lines = chunk_lines
+        self.line_count = chunk_lines[-1] + len(chunks[-1])
+        self._line_table: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @classmethod
+    def from_text(cls, text: str) -> "PositionMapping":
+        return cls(text, *_chunked(_line_starts(text), 0))
+
+    def edited(
+        self, text: Union[str, "Rope"], start: int, old_end: int, new_end: int
+    ) -> "PositionMapping":
+        """Returns the mapping for `text`, which is the text of this
+        mapping with `[start, old_end)` replaced by `[start, new_end)`.
+
+        Only the lines around the edit are read from `text`, which can
+        be a `Rope` as well, e.g. for the steps of a series of edits.
+        """
+        shift = new_end - old_end
+        # the line before the edit is split again as well, since
+        # e.g. inserting "\n" right after a "\r" changes where it ends
+        first = max(self.line_of(start) - 1, 0)
+        last = self.line_of(old_end) + 1
+        lo = self.line_start(first)
+        hi = self.line_start(last) if last < self.line_count else self.length
+
+        first_chunk = bisect_right(self._chunk_lines, first) - 1
+        last_chunk = bisect_right(self._chunk_lines, last - 1) - 1
+        before = self._chunks[first_chunk][: first - self._chunk_lines[first_chunk]]
+        after = self._chunks[last_chunk][last - self._chunk_lines[last_chunk] :]
+        offset = self._chunk_starts[first_chunk]
+        line_starts = [offset + line_start for line_start in before]
+        line_starts += _line_starts(text[lo : hi + shift], lo)
+        offset = self._chunk_starts[last_chunk] + shift
+        line_starts += [offset + line_start for line_start in after]
+
+        old_lines = (
+            self._chunk_lines[last_chunk]
+            + len(self._chunks[last_chunk])
+            - self._chunk_lines[first_chunk]
+        )
+        line_shift = len(line_starts) - old_lines
+        chunks, chunk_starts, chunk_lines = _chunked(
+            line_starts, self._chunk_lines[first_chunk]
+        )
+
+        rest = slice(last_chunk + 1, None)
+        return PositionMapping(
+            text,
+            self._chunks[:first_chunk] + chunks + self._chunks[rest],
+            self._chunk_starts[:first_chunk]
+            + chunk_starts
+            + array("q", [start + shift for start in self._chunk_starts[rest]]),
+            self._chunk_lines[:first_chunk]
+            + chunk_lines
+            + array("q", [line + line_shift for line in self._chunk_lines[rest]]),
+        )
+
+    def with_text(self, text: str) -> "PositionMapping":
+        """This mapping, for `text` with the same lines as its text."""
+        return PositionMapping(
+            text, self._chunks, self._chunk_starts, self._chunk_lines
+        )
+
+    def line_start(self, line: int) -> int:
+        chunk = bisect_right(self._chunk_lines, line) - 1
+        return (
+            self._chunk_starts[chunk]
+            + self._chunks[chunk][line - self._chunk_lines[chunk]]
+        )
+
+    def line_of(self, index: int) -> int:
+        chunk = bisect_right(self._chunk_starts, index) - 1
+        offset = index - self._chunk_starts[chunk]
+
+        return self._chunk_lines[chunk] + bisect_right(self._chunks[chunk], offset) - 1
+
+    def _line_end(self, line: int) -> int:
+        if line + 1 < self.line_count:
+            return self.line_start(line + 1)
+        return self.length
+
+    def point_at(self, index: int) -> Point:
+        if not 0 <= index <= self.length:
+            raise KeyError(index)
+
+        line = self.line_of(index)
+        return Point(line, index - self.line_start(line))
+
+    def index_at(self, line: int, col: int) -> int:
+        if not 0 <= line < self.line_count or col < 0:
+            raise KeyError(Point(line, col))
+
+        index = self.line_start(line) + col
+        # every column of a line is valid, up to and including its line
+        # break. The end of the text is valid on the last line.
+        if index < self._line_end(line):
+            return index
+        if index == self.length and line == self.line_count - 1:
+            return index
+
+        raise KeyError(Point(line, col))
+
+    def _lines(self) -> Tuple[np.ndarray, np.ndarray]:
+        """start and end offsets of every line"""
+        if self._line_table is None:
+            starts = np.concatenate(
+                [
+                    np.frombuffer(chunk, dtype=np.int64) + offset
+                    for chunk, offset in zip(self._chunks, self._chunk_starts)
+                ]
+            )
+            ends = np.append(starts[1:], self.length)
+            self._line_table = starts, ends
+
+        return self._line_table
+
+    def indices_at(
+        self, lines: Iterable, cols: Iterable
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized `mapping[line, col]`.
+
+        Returns the index of every point, and a mask of the points
+        that are valid. Invalid points get the index -1.
+        """
+        lines, valid = _as_int_array(lines)
+        cols, valid_cols = _as_int_array(cols)
+        valid &= valid_cols & (lines >= 0) & (lines < self.line_count) & (cols >= 0)
+
+        starts, ends = self._lines()
+        lines = np.where(valid, lines, 0)
+        indices = starts[lines] + cols
+        # same rules as `index_at`
+        valid &= (indices < ends[lines]) | (
+            (indices == self.length) & (lines == self.line_count - 1)
+        )
+
+        return np.where(valid, indices, -1), valid
+
+    def points_at(self, indices: Iterable) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Vectorized `mapping[index]`.
+
+        Returns the line and column of every index, and a mask of the
+        indices that are valid. Invalid indices get the point (-1, -1).
+        """
+        indices, valid = _as_int_array(indices)
+        valid &= (indices >= 0) & (indices <= self.length)
+
+        starts, _ = self._lines()
+        lines = np.searchsorted(starts, indices, side="right") - 1
+        lines = np.where(valid, lines, 0)
+        cols = indices - starts[lines]
+
+        return np.where(valid, lines, -1), np.where(valid, cols, -1), valid
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PositionMapping):
+            return NotImplemented
+
+        # mappings of the same text can be chunked differently, depending
+        # on the edits they were made by, so their lines are compared
+        return (
+            self.length == other.length
+            and self.line_count == other.line_count
+            and np.array_equal(self._lines()[0], other._lines()[0])
+        )
+
+    __hash__ = None  # type: ignore
 
     def __getitem__(self, key):
         if isinstance(key, (list, tuple)):
             assert len(key) == 2
 
             line, col = key
-            # assert isinstance(line, (None, int)) and isinstance(col, (None, int))
-            if not line:
+            if line is None:
                 line = 0
-            if not col:
-                col = len(self.index_to_point[line])
-
-            return self.point_to_index[Point(line, col)]
+            if col is None:
+                # end of the line, before its line break
+                if not 0 <= line < self.line_count:
+                    raise KeyError(Point(line, col))
+                start = self.line_start(line)
+                contents = self.text[start : self._line_end(line)].splitlines()
+                return start + (len(contents[0]) if contents else 0)
+
+            return self.index_at(line, col)
         elif isinstance(key, int):
-            return self.index_to_point[key]
+            return self.point_at(key)
 
         raise Exception("Invalid access")
 
 
+# id of tokens in a `TokenTable` that were not assigned one yet
+NO_ID = -1
+
+
+class Categories:
+    """Interns strings as integer codes. The codes are shared by all
+    token tables, so that tables can be joined without recoding them.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def code(self, name: str) -> int:
+        code = self._codes.get(name)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(name)
+                if code is None:
+                    code = len(self.names)
+                    self.names.append(name)
+                    self._codes[name] = code
+
+        return code
+
+    def codes(self, names: Iterable[str]) -> np.ndarray:
+        return np.array([self.code(name) for name in names], dtype=np.int32)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return np.array(self.names, dtype=object)[codes]
+
+    def recode(self, codes: np.ndarray, categories: "Categories") -> np.ndarray:
+        """`codes` of these categories as codes of `categories`, which new
+        names are added to. Missing codes (-1) stay missing."""
+        uniques, inverse = np.unique(np.asarray(codes), return_inverse=True)
+        present = uniques >= 0
+        recoded = np.full(len(uniques), -1, dtype=np.int32)
+        recoded[present] = categories.codes(
+            self.names[code] for code in uniques[present].tolist()
+        )
+        return recoded[inverse]
+
+
+syntax_nodes = Categories()
+
+
+class TokenTable:
+    """The tokens of a snapshot, stored as one array per field.
+
+    A `TokenTable` behaves like a tuple of `Token`s, in document order.
+    `Token` objects are only created when they are accessed. Syntax
+    nodes are stored as codes of `syntax_nodes`, and tokens without an
+    id have the id `NO_ID`.
+    """
+
+    columns = (
+        "start_index",
+        "end_index",
+        "start_line",
+        "start_col",
+        "end_line",
+        "end_col",
+        "ids",
+        "syntax_node_codes",
+    )
+
+    def __init__(
+        self,
+        source: str,
+        start_index: np.ndarray,
+        end_index: np.ndarray,
+        start_line: np.ndarray,
+        start_col: np.ndarray,
+        end_line: np.ndarray,
+        end_col: np.ndarray,
+        ids: np.ndarray,
+        syntax_node_codes: np.ndarray,
+    ):
+        self.source = source
+        self.start_index = start_index
+        self.end_index = end_index
+        self.start_line = start_line
+        self.start_col = start_col
+        self.end_line = end_line
+        self.end_col = end_col
+        self.ids = ids
+        self.syntax_node_codes = syntax_node_codes
+
+    @classmethod
+    def from_spans(
+        cls,
+        source: str,
+        mapping: PositionMapping,
+        start_index: Iterable[int],
+        end_index: Iterable[int],
+        syntax_node_codes: Iterable[int],
+        ids: Optional[Iterable[int]] = None,
+    ) -> "TokenTable":
+        """Creates tokens from their index ranges, looking up their
+        points in `mapping`."""
+        start_index = np.asarray(start_index, dtype=np.int64)
+        end_index = np.asarray(end_index, dtype=np.int64)
+        start_line, start_col, _ = mapping.points_at(start_index)
+        end_line, end_col, _ = mapping.points_at(end_index)
+        if ids is None:
+            ids = np.full(len(start_index), NO_ID, dtype=np.int64)
+
+        return cls(
+            source,
+            start_index,
+            end_index,
+            start_line.astype(np.int32),
+            start_col.astype(np.int32),
+            end_line.astype(np.int32),
+            end_col.astype(np.int32),
+            np.asarray(ids, dtype=np.int64),
+            np.asarray(syntax_node_codes, dtype=np.int32),
+        )
+
+    @classmethod
+    def from_tokens(cls, source: str, tokens: Iterable[Token]) -> "TokenTable":
+        rows = [
+            (
+                token.range.start.index,
+                token.range.end.index,
+                token.range.start.point.line,
+                token.range.start.point.col,
+                token.range.end.point.line,
+                token.range.end.point.col,
+                NO_ID if token.id is None else token.id,
+                syntax_nodes.code(token.syntax_node),
+            )
+            for token in tokens
+        ]
+        columns = list(zip(*rows)) if rows else [()] * len(cls.columns)
+        dtypes = (np.int64, np.int64) + (np.int32,) * 4 + (np.int64, np.int32)
+
+        return cls(
+            source,
+            *(np.array(column, dtype=dtype) for column, dtype in zip(columns, dtypes)),
+        )
+
+    @classmethod
+    def concatenate(cls, source: str, tables: List["TokenTable"]) -> "TokenTable":
+        return cls(
+            source,
+            *(
+                np.concatenate([getattr(table, column) for table in tables])
+                for column in cls.columns
+            ),
+        )
+
+    def _map(self, fn, source: Optional[str] = None) -> "TokenTable":
+        return TokenTable(
+            self.source if source is None else source,
+            *(fn(getattr(self, column)) for column in self.columns),
+        )
+
+    def with_source(self, source: str) -> "TokenTable":
+        return self._map(lambda column: column, source)
+
+    def shifted(self, n: int, source: str, mapping: PositionMapping) -> "TokenTable":
+        """The same tokens, moved by `n` characters in `source`."""
+        return TokenTable.from_spans(
+            source,
+            mapping,
+            self.start_index + n,
+            self.end_index + n,
+            self.syntax_node_codes,
+            self.ids,
+        )
+
+    def syntax_nodes(self) -> np.ndarray:
+        return syntax_nodes.decode(self.syntax_node_codes)
+
+    def row_at(self, index: int) -> int:
+        """Returns the row of the token that contains `index`, or -1.
+
+        Tokens don't overlap and are sorted by `start_index`, so this is
+        a binary search for the last token starting at or before `index`.
+        """
+        row = bisect_right(self.start_index, index) - 1
+        if row >= 0 and index < self.end_index[row]:
+            return row
+
+        return -1
+
+    def rows_at(self, indices: Iterable[int]) -> np.ndarray:
+        """Vectorized `row_at`."""
+        indices = np.asarray(indices, dtype=np.int64)
+        if not len(self):
+            return np.full(len(indices), -1, dtype=np.int64)
+
+        rows = np.searchsorted(self.start_index, indices, side="right") - 1
+        contained = (rows >= 0) & (indices < self.end_index[np.maximum(rows, 0)])
+
+        return np.where(contained, rows, -1)
+
+    def token_at(self, index: int) -> Optional[Token]:
+        row = self.row_at(index)
+        return self[row] if row >= 0 else None
+
+    def first_overlapping(self, start: int, end: int) -> int:
+        """Returns the row of the first non-empty token that overlaps
+        `[start, end)`, or -1."""
+        if start >= end:
+            return -1
+
+        # tokens don't overlap, so their ends are sorted as well
+        row = bisect_right(self.end_index, start)
+        while row < len(self) and self.start_index[row] < end:
+            if self.start_index[row] < self.end_index[row]:
+                return row
+            row += 1
+
+        return -1
+
+    def rows_of(
+        self, start_index: Iterable[int], end_index: Iterable[int]
+    ) -> np.ndarray:
+        """Vectorized `lookup`. Returns the rows of the tokens that span
+        exactly `[start, end)`, -1 where there is no such token."""
+        start_index = np.asarray(start_index, dtype=np.int64)
+        end_index = np.asarray(end_index, dtype=np.int64)
+        if not len(self):
+            return np.full(len(start_index), -1, dtype=np.int64)
+
+        # join on (start, end), encoded as a single integer
+        width = int(max(self.end_index.max(), end_index.max(initial=0))) + 1
+        keys = self.start_index * width + self.end_index
+        order = None
+        if np.any(keys[1:] < keys[:-1]):
+            order = np.argsort(keys, kind="stable")
+            keys = keys[order]
+
+        queries = start_index * width + end_index
+        rows = np.minimum(np.searchsorted(keys, queries), len(keys) - 1)
+        found = keys[rows] == queries
+        if order is not None:
+            rows = order[rows]
+
+        return np.where(found, rows, -1)
+
+    def with_ids(self, ids: np.ndarray) -> "TokenTable":
+        return TokenTable(
+            self.source,
+            self.start_index,
+            self.end_index,
+            self.start_line,
+            self.start_col,
+            self.end_line,
+            self.end_col,
+            ids,
+            self.syntax_node_codes,
+        )
+
+    def lookup(self, token_range: Range) -> Optional[Token]:
+        """Returns the token that spans exactly `token_range`, if any."""
+        start, end = token_range.start.index, token_range.end.index
+        i = int(np.searchsorted(self.start_index, start))
+        while i < len(self) and self.start_index[i] == start:
+            if self.end_index[i] == end:
+                return self[i]
+            i += 1
+
+        return None
+
+    def _token(self, row: Tuple) -> Token:
+        start, end, start_line, start_col, end_line, end_col, token_id, code = row
+        return Token(
+            Range(
+                Position(start, Point(start_line, start_col)),
+                Position(end, Point(end_line, end_col)),
+            ),
+            self.source,
+            None if token_id == NO_ID else token_id,
+            syntax_nodes.names[code],
+        )
+
+    def __len__(self) -> int:
+        return len(self.start_index)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._map(lambda column: column[key])
+
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("token index out of range")
+
+        return self._token(
+            tuple(getattr(self, column)[key].item() for column in self.columns)
+        )
+
+    def __iter__(self) -> Iterator[Token]:
+        columns = (getattr(self, column).tolist() for column in self.columns)
+        for row in zip(*columns):
+            yield self._token(row)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TokenTable):
+            return NotImplemented
+
+        return self.source == other.source and all(
+            np.array_equal(getattr(self, column), getattr(other, column))
+            for column in self.columns
+        )
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self):
+        return f"TokenTable({list(self)})"
+
+
 @dataclass(frozen=True)
 class TokenChange:
     type: Literal["moved", "inserted", "deleted", "edited"]
@@ -104,6 +790,107 @@ class GazeChange(NamedTuple):
     new: Dict
 
 
+GAZE_CHANGE_TYPES = ("deleted", "moved")
+
+
+class GazeChanges(Sequence[GazeChange]):
+    """The gaze changes of a diff, stored as one array per field.
+
+    Each change is a gaze row (its position in `Tracker.gazes`), a type
+    code into `GAZE_CHANGE_TYPES`, and the old and new line and column
+    of the gaze. `frame` returns them as a DataFrame. `GazeChange`
+    tuples, with the full gaze as a dict, are only built when changes
+    are indexed or iterated, a chunk of gazes at a time.
+
+    Parameters
+    ----------
+    records : Callable[[np.ndarray], List[Dict]]
+        returns the gazes at the given rows as dicts
+    line_key, col_key : str
+        the keys of the line and column in the gaze dicts
+    """
+
+    fields = ("row", "type", "old_line", "old_col", "new_line", "new_col")
+    # number of gazes that are turned into dicts at once when iterating
+    chunk_size = 4096
+
+    def __init__(
+        self,
+        rows: np.ndarray,
+        types: np.ndarray,
+        old_lines: np.ndarray,
+        old_cols: np.ndarray,
+        new_lines: np.ndarray,
+        new_cols: np.ndarray,
+        records: Callable[[np.ndarray], List[Dict]],
+        line_key: str = "source_file_line",
+        col_key: str = "source_file_col",
+    ):
+        self.rows = rows
+        self.types = types
+        self.old_lines = old_lines
+        self.old_cols = old_cols
+        self.new_lines = new_lines
+        self.new_cols = new_cols
+        self._records = records
+        self._line_key = line_key
+        self._col_key = col_key
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def frame(self) -> "pd.DataFrame":
+        """The changes as a DataFrame, with one column per field."""
+        import pandas as pd
+
+        return pd.DataFrame(
+            {
+                "row": self.rows,
+                "type": pd.Categorical.from_codes(self.types, GAZE_CHANGE_TYPES),
+                "old_line": self.old_lines,
+                "old_col": self.old_cols,
+                "new_line": self.new_lines,
+                "new_col": self.new_cols,
+            }
+        )
+
+    def _changes(self, start: int, end: int) -> List[GazeChange]:
+        rows = self.rows[start:end]
+        # gazes that changed more than once are fetched once
+        unique_rows, positions = np.unique(rows, return_inverse=True)
+        records = self._records(unique_rows)
+        changes = []
+        for position, type_code, line, col in zip(
+            positions.tolist(),
+            self.types[start:end].tolist(),
+            self.new_lines[start:end].tolist(),
+            self.new_cols[start:end].tolist(),
+        ):
+            old = dict(records[position])
+            new = {**old, self._line_key: line, self._col_key: col}
+            changes.append(GazeChange(GAZE_CHANGE_TYPES[type_code], old, new))
+
+        return changes
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                return self._changes(start, stop)
+            return [self[i] for i in range(start, stop, step)]
+
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("gaze change index out of range")
+
+        return self._changes(key, key + 1)[0]
+
+    def __iter__(self) -> Iterator[GazeChange]:
+        for start in range(0, len(self), self.chunk_size):
+            yield from self._changes(start, start + self.chunk_size)
+
+
 @dataclass(frozen=True)
 class Source:
     text: str
@@ -115,15 +902,18 @@ class Source:
 class Snapshot:
     id: int
     source: Source
-    tokens: Tuple[Token, ...]
-    _token_by_range: Mapping[Range, Token]
+    tokens: TokenTable
     changes: Tuple[TokenChange, ...] = ()
     time: float = 0.0
+    # syntax tree of `source`, kept around so that the
+    # next edit can be parsed incrementally
+    tree: Optional["Tree"] = field(default=None, compare=False, repr=False)
+    # the text of `source` as a rope, which the next edit is applied to
+    rope: Optional["Rope"] = field(default=None, compare=False, repr=False)
 
 
 class SnapshotDiff(NamedTuple):
     old: Snapshot
     new: Snapshot
     token_changes: List[TokenChange]
-    gaze_changes: List[GazeChange]
-
+    gaze_changes: GazeChanges
@@ -1,17 +1,38 @@
-from typing import Callable, List, Literal, Optional, Tuple, Union
+from bisect import bisect_left
+from typing import Callable, List, NamedTuple, Optional, Tuple, Union
 
+import numpy as np
 import pampy
+from tree_sitter import Tree
 
 from gazel.common import Id
-from gazel.core_constructors import make_snapshot
-from gazel.core_types import Snapshot, Token, TokenChange
+from gazel.core_constructors import token_table_from_leaves
+from gazel.core_types import (
+    NO_ID,
+    Point,
+    PositionMapping,
+    Snapshot,
+    Source,
+    Token,
+    TokenChange,
+    TokenTable,
+    syntax_nodes,
+)
+from gazel.parsing import (
+    changed_ranges,
+    error_ranges,
+    extract_leaves,
+    extract_tokens_in_range,
+    parse,
+)
 from gazel.range import (
-    _shift_range,
     get_token_at_range,
     range_contains,
-    range_overlaps,
     same_point_range,
+    token_at_index,
 )
+from gazel.snapshot_cache import SnapshotCache
+from gazel.text import Rope
 
 
 def insert(source: str, start: int, text: str) -> str:
@@ -22,6 +43,315 @@ def delete(source: str, start: int, size: int) -> str:
     return source[:start] + source[start + size :]
 
 
+def _rope(snapshot: Snapshot) -> Rope:
+    if snapshot.rope is not None:
+        return snapshot.rope
+
+    return Rope.from_text(snapshot.source.text)
+
+
+def _point_after(point: Point, text: str) -> Point:
+    """the point reached after writing `text` starting at `point`"""
+    newlines = text.count("\n")
+    if not newlines:
+        return Point(point.line, point.col + len(text))
+
+    return Point(point.line + newlines, len(text) - text.rfind("\n") - 1)
+
+
+class _Edit(NamedTuple):
+    """`[start, old_end)` of a text replaced by `[start, new_end)`, along
+    with the points of these offsets."""
+
+    start: int
+    old_end: int
+    new_end: int
+    start_point: Point
+    old_end_point: Point
+    new_end_point: Point
+
+
+class _Region(NamedTuple):
+    """`[old_start, old_end)` of the text before a series of edits, which
+    became `[new_start, new_end)` of the text after them."""
+
+    old_start: int
+    old_end: int
+    new_start: int
+    new_end: int
+
+
+def _region_shift(region: _Region) -> int:
+    return (region.new_end - region.new_start) - (region.old_end - region.old_start)
+
+
+def _compose(edits: List[_Edit]) -> List[_Region]:
+    """The regions of the text that a series of edits replaced. Each edit
+    is given in the offsets of the text after the edits before it, and
+    edits that touch each other are merged into a single region.
+    """
+    regions: List[_Region] = []
+    for edit in edits:
+        shift = edit.new_end - edit.old_end
+        before = [r for r in regions if r.new_end < edit.start]
+        touched = [
+            r
+            for r in regions
+            if edit.start <= r.new_end and r.new_start <= edit.old_end
+        ]
+        after = [r for r in regions if r.new_start > edit.old_end]
+
+        # new offsets minus old offsets, at the start and end of the edit
+        start_offset = sum(_region_shift(r) for r in before)
+        end_offset = start_offset + sum(_region_shift(r) for r in touched)
+        first = touched[0] if touched and touched[0].new_start <= edit.start else None
+        last = touched[-1] if touched and touched[-1].new_end >= edit.old_end else None
+        merged = _Region(
+            first.old_start if first else edit.start - start_offset,
+            last.old_end if last else edit.old_end - end_offset,
+            first.new_start if first else edit.start,
+            (last.new_end if last else edit.old_end) + shift,
+        )
+        regions = before + [merged]
+        regions += [
+            _Region(r.old_start, r.old_end, r.new_start + shift, r.new_end + shift)
+            for r in after
+        ]
+
+    return regions
+
+
+def _copy_tree(snapshot: Snapshot) -> Tree:
+    """A copy of the syntax tree of `snapshot`, which can be edited
+    without changing the snapshot. Trees of this tree-sitter have no
+    `copy`, but parsing the same text again reuses every node of the tree,
+    without reading the text, unless the tree has syntax errors.
+    """
+    return parse(_rope(snapshot), snapshot.source.language, old_tree=snapshot.tree)
+
+
+def _reparse(
+    old_snapshot: Snapshot,
+    new_source: str,
+    edits: List[_Edit],
+    rope: Optional[Rope] = None,
+) -> Tuple[Tree, Optional[List[Tuple[int, int]]], List[Tuple[int, int]]]:
+    """Parses `new_source`, reusing the syntax tree of `old_snapshot`,
+    which is left as is. `new_source` is `old_snapshot`'s text after
+    `edits`.
+
+    If given, `rope` holds `new_source` and is parsed instead.
+
+    Returns the new tree, the byte ranges of the new tree whose
+    structure changed, and the erroneous regions of the old tree, moved
+    by the edits. The ranges are `None` if the tree could not be reused
+    and `new_source` was parsed from scratch.
+    """
+    language = old_snapshot.source.language
+    text = new_source if rope is None else rope
+    # a tree that was already edited belongs to a different
+    # version of the source, and cannot be reused
+    if old_snapshot.tree is None or old_snapshot.tree.root_node.has_changes:
+        return parse(text, language), None, []
+
+    old_tree = _copy_tree(old_snapshot)
+    for edit in edits:
+        old_tree.edit(
+            start_byte=edit.start,
+            old_end_byte=edit.old_end,
+            new_end_byte=edit.new_end,
+            start_point=(edit.start_point.line, edit.start_point.col),
+            old_end_point=(edit.old_end_point.line, edit.old_end_point.col),
+            new_end_point=(edit.new_end_point.line, edit.new_end_point.col),
+        )
+
+    new_tree = parse(text, language, old_tree=old_tree)
+
+    return new_tree, changed_ranges(old_tree, new_tree), error_ranges(old_tree)
+
+
+def _span_overlaps(token_start: int, token_end: int, start: int, end: int) -> bool:
+    if token_start == token_end:
+        return start <= token_start < end
+    return token_start < end and token_end > start
+
+
+def _merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+
+    return merged
+
+
+def _overlapping_tokens(tokens: TokenTable, start: int, end: int) -> Tuple[int, int]:
+    """the slice of `tokens` that overlaps `[start, end)`"""
+    starts, ends = tokens.start_index, tokens.end_index
+    first = int(np.searchsorted(starts, start))
+    while first > 0 and _span_overlaps(starts[first - 1], ends[first - 1], start, end):
+        first -= 1
+    last = int(np.searchsorted(starts, end))
+    while last < len(tokens) and _span_overlaps(starts[last], ends[last], start, end):
+        last += 1
+
+    return first, last
+
+
+def _table_from_captures(
+    captures: List[Tuple[Tuple[int], str]], source: str, mapping: PositionMapping
+) -> TokenTable:
+    return TokenTable.from_spans(
+        source,
+        mapping,
+        [start for (start, _), _ in captures],
+        [end for (_, end), _ in captures],
+        syntax_nodes.codes(syntax_node for _, syntax_node in captures),
+    )
+
+
+def _carry_over_tokens(
+    old_snapshot: Snapshot,
+    source: Source,
+    tree: Tree,
+    ranges: List[Tuple[int, int]],
+    regions: List[_Region],
+    index: int,
+    old_error_ranges: List[Tuple[int, int]],
+) -> Snapshot:
+    """Builds the snapshot for `source` without walking all of `tree`.
+    Leaves are only extracted from `tree` in the edited `regions` and the
+    structural changes in `ranges`. All other tokens are carried over
+    from `old_snapshot`, shifting the ones after an edit.
+
+    `old_error_ranges` are the erroneous regions of `old_snapshot`'s tree,
+    moved by the edits.
+    """
+    old_tokens = old_snapshot.tokens
+    new_source = source.text
+    old_starts = [region.old_start for region in regions]
+    new_starts = [region.new_start for region in regions]
+    # shift of the text after the first i regions
+    shifts = np.cumsum([0] + [_region_shift(region) for region in regions])
+
+    def to_old(i: int) -> int:
+        return i - int(shifts[bisect_left(new_starts, i)])
+
+    def to_new(i: int) -> int:
+        return i + int(shifts[bisect_left(old_starts, i)])
+
+    # `changed_ranges` is not reliable around syntax errors,
+    # so leaves of erroneous top level nodes are always re-extracted
+    ranges = [(region.new_start, region.new_end) for region in regions] + ranges
+    ranges += error_ranges(tree) + old_error_ranges
+    # pad the regions by one character on both sides, so that
+    # leaves that end or start right at their bounds are re-extracted
+    extract = _merge_ranges([(max(lo - 1, 0), hi + 1) for lo, hi in ranges])
+
+    # grow the regions until no old or new leaf crosses their bounds
+    while True:
+        extracted = []
+        grown = []
+        for lo, hi in extract:
+            captures = extract_tokens_in_range(tree, lo, hi)
+            first, last = _overlapping_tokens(old_tokens, to_old(lo), to_old(hi))
+            extracted.append((captures, first, last))
+
+            bounds = [lo, hi]
+            if captures:
+                bounds.extend((captures[0][0][0], captures[-1][0][1]))
+            if first < last:
+                bounds.append(to_new(int(old_tokens.start_index[first])))
+                bounds.append(to_new(int(old_tokens.end_index[last - 1])))
+            grown.append((min(bounds), max(bounds)))
+
+        grown = _merge_ranges(grown)
+        if grown == extract:
+            break
+        extract = grown
+
+    mapping = source.mapping
+    tables: List[TokenTable] = []
+    first_edit = old_starts[0] if regions else old_snapshot.source.mapping.length
+
+    def carry(old: TokenTable):
+        # tokens that end before the first edit did not move
+        kept = int(np.count_nonzero(old.end_index <= first_edit))
+        tables.append(old[:kept].with_source(new_source))
+        moved = old[kept:]
+        shift = shifts[np.searchsorted(old_starts, moved.end_index)]
+        tables.append(moved.shifted(shift, new_source, mapping))
+
+    carried = 0
+    for captures, first, last in extracted:
+        carry(old_tokens[carried:first])
+        tables.append(_table_from_captures(captures, new_source, mapping))
+        carried = last
+    carry(old_tokens[carried:])
+
+    return Snapshot(
+        index, source, TokenTable.concatenate(new_source, tables), tree=tree
+    )
+
+
+def _snapshot_for_edit(
+    old_snapshot: Snapshot,
+    source: Source,
+    edits: List[_Edit],
+    regions: List[_Region],
+    index=0,
+    cache: Optional[SnapshotCache] = None,
+    rope: Optional[Rope] = None,
+) -> Snapshot:
+    """Parses `source`, the text of `old_snapshot` after `edits`, which
+    replaced `regions` of it. Token ids of the returned snapshot are not
+    aligned to `old_snapshot` yet, see `_adjust_tokens_for_edit`.
+
+    If `source` was seen before, the token layout is taken from `cache`
+    instead.
+    """
+    new_source = source.text
+    cached = cache.get(new_source, source.language) if cache is not None else None
+    if cached is not None:
+        snapshot = cached.snapshot
+        # trees are never edited in place, see `_reparse`, so a tree
+        # without syntax errors is shared as is. Erroneous parts depend
+        # on the tree the text was parsed from, and are parsed again
+        if not cached.error_ranges and not snapshot.tree.root_node.has_changes:
+            return Snapshot(index, snapshot.source, snapshot.tokens, tree=snapshot.tree)
+
+    tree, ranges, old_error_ranges = _reparse(old_snapshot, new_source, edits, rope)
+    if cached is not None:
+        # leaves outside of erroneous top level nodes are the same for
+        # any parse of the text, only the others are extracted again
+        return _carry_over_tokens(
+            cached.snapshot,
+            cached.snapshot.source,
+            tree,
+            [],
+            [],
+            index,
+            old_error_ranges=cached.error_ranges,
+        )
+
+    if ranges is not None:
+        snapshot = _carry_over_tokens(
+            old_snapshot, source, tree, ranges, regions, index, old_error_ranges
+        )
+    else:
+        tokens = token_table_from_leaves(
+            extract_leaves(tree), new_source, source.mapping
+        )
+        snapshot = Snapshot(index, source, tokens, tree=tree)
+
+    if cache is not None:
+        cache.put(snapshot)
+
+    return snapshot
+
+
 def get_change(old: Token = None, new: Token = None) -> Optional[TokenChange]:
     if old and new:
         if not same_point_range(old.range, new.range):
@@ -37,138 +367,215 @@ def get_change(old: Token = None, new: Token = None) -> Optional[TokenChange]:
 def _adjust_tokens_for_edit(
     old_snapshot: Snapshot,
     new_snapshot: Snapshot,
-    direction: Literal["left", "right"],
-    affected_index_range: Tuple[int, int],
+    regions: List[_Region],
     next_id=Id(),
-):
-    shift = affected_index_range[1] - affected_index_range[0]
-    shift = pampy.match(direction, "left", -shift, "right", shift)
-    adjusted_tokens: List[Token] = []
+) -> Tuple[TokenTable, List[TokenChange]]:
+    old_tokens, new_tokens = old_snapshot.tokens, new_snapshot.tokens
+    starts, ends = new_tokens.start_index, new_tokens.end_index
+
+    # the tokens overlapping a region are contiguous, apart from
+    # empty tokens, which never overlap anything. A region affects the
+    # text that it inserted, or the character after it if it only
+    # removed text
+    overlaps = np.zeros(len(new_tokens), dtype=bool)
+    region_of = np.full(len(new_tokens), -1, dtype=np.int64)
+    affected_ends = np.zeros(len(regions), dtype=np.int64)
+    region_tokens = []
+    for i, region in enumerate(regions):
+        size = max(region.new_end - region.new_start, 1)
+        affected_start, affected_end = region.new_start, region.new_start + size
+        first = int(np.searchsorted(ends, affected_start, side="right"))
+        last = int(np.searchsorted(starts, affected_end))
+        hit = np.flatnonzero(starts[first:last] < ends[first:last]) + first
+        overlaps[hit] = True
+        region_of[hit] = i
+        affected_ends[i] = affected_end
+
+        # the old token that the edits were made in, if any. Deletes must
+        # be within the old token, and pure inserts, which only span their
+        # insertion point in the old text, must be strictly inside of it
+        old_range = (region.old_start, region.old_end)
+        if region.old_start < region.old_end:
+            old_token = get_token_at_range(old_snapshot, old_range)
+            edited = old_token is not None and range_contains(
+                (old_token.range.start.index, old_token.range.end.index), old_range
+            )
+        else:
+            old_token = token_at_index(old_snapshot, region.old_start)
+            edited = (
+                old_token is not None and old_token.range.start.index < region.old_start
+            )
+        region_tokens.append((old_token, edited))
+
+    # all other tokens are joined with the old token at the same
+    # offsets, shifted by the regions before them
+    shifts = np.cumsum([0] + [_region_shift(region) for region in regions])
+    shifted = shifts[
+        np.searchsorted(np.maximum.accumulate(affected_ends), starts, side="right")
+    ]
+    old_rows = old_tokens.rows_of(starts - shifted, ends - shifted)
+    found = ~overlaps & (old_rows >= 0)
+    matched = np.maximum(old_rows, 0)
+
+    ids = np.full(len(new_tokens), NO_ID, dtype=np.int64)
+    moved = np.zeros(len(new_tokens), dtype=bool)
+    if len(old_tokens):
+        ids[found] = old_tokens.ids[matched[found]]
+        for column in ("start_line", "start_col", "end_line", "end_col"):
+            moved |= getattr(old_tokens, column)[matched] != getattr(new_tokens, column)
+        moved &= found
+    # new ids are handed out in document order
+    for row in np.flatnonzero(~found).tolist():
+        ids[row] = next_id()
+
+    # a token edited in place keeps its id. If the edit split it, only
+    # the new token that the edit starts in does, the others are new
+    kept = np.zeros(len(new_tokens), dtype=bool)
+    for i, (old_token, edited) in enumerate(region_tokens):
+        rows = np.flatnonzero(region_of == i)
+        if not edited or not len(rows):
+            continue
+        start = regions[i].new_start
+        containing = rows[(starts[rows] <= start) & (start < ends[rows])]
+        row = containing[0] if len(containing) else rows[0]
+        ids[row] = old_token.id
+        kept[row] = True
+
+    adjusted_tokens = new_tokens.with_ids(ids)
     changes: List[TokenChange] = []
 
     # FIXME
     # deleted tokens do not get reported to
     # the change list.
-    for token in new_snapshot.tokens:
-        if range_overlaps(
-            affected_index_range, (token.range.start.index, token.range.end.index)
-        ):
-            old_token = get_token_at_range(old_snapshot, affected_index_range)
-            new_token = Token(token.range, token.source, next_id(), token.syntax_node)
-            change = None
-            if old_token:
-                old_token_index_range = (
-                    old_token.range.start.index,
-                    old_token.range.end.index,
-                )
-                if range_contains(
-                    old_token_index_range, affected_index_range
-                ):  # means we deleted, and hence
-                    new_token = Token(
-                        new_token.range,
-                        new_token.source,
-                        old_token.id,
-                        new_token.syntax_node,
-                    )
-
-                    change = TokenChange(type="edited", old=old_token, new=new_token)
+    for row in np.flatnonzero(~found | moved).tolist():
+        new_token = adjusted_tokens[row]
+        change = None
+        if overlaps[row]:
+            old_token, _ = region_tokens[region_of[row]]
+            if kept[row]:
+                change = TokenChange(type="edited", old=old_token, new=new_token)
             else:
+                # a new token, even if it replaced the old one
                 change = get_change(old=None, new=new_token)
-
-            adjusted_tokens.append(new_token)
-            if change:
-                changes.append(change)
+        elif found[row]:
+            change = get_change(old_tokens[int(old_rows[row])], new_token)
         else:
-            # only tokens that start after the
-            # end of the affected range need
-            # to be adjusted
-            if token.range.start.index >= affected_index_range[1]:
-                old_range = _shift_range(
-                    token.range, -shift, old_snapshot.source.mapping
-                )
-                if old_range in old_snapshot._token_by_range:
-                    old_token = old_snapshot._token_by_range[old_range]
-                    new_token = Token(
-                        source=token.source,
-                        range=token.range,
-                        syntax_node=token.syntax_node,
-                        id=old_token.id,
-                    )
-                    adjusted_tokens.append(new_token)
-                    change = get_change(old_token, new_token)
-                    if change:
-                        changes.append(change)
+            change = get_change(None, new_token)
+
+        if change:
+            changes.append(change)
 
     return adjusted_tokens, changes
 
 
-def token_info_for_delete(
-    old_snapshot: Snapshot, line: int, col: int, size: int, next_id=Id(), id=0, time=0.0
-):
-    start = old_snapshot.source.mapping[line, col]
-    affected_range = (start, start + size)
-    new_source = delete(old_snapshot.source.text, start, size)
+def _apply_edits(
+    old_snapshot: Snapshot,
+    edits: List[dict],
+    next_id=Id(),
+    id=0,
+    time=0.0,
+    cache: Optional[SnapshotCache] = None,
+) -> Snapshot:
+    """Applies the insert and delete `edits` to `old_snapshot` one after
+    the other, and parses the resulting text once. Token ids are aligned
+    to `old_snapshot` through the regions that the edits replaced.
+    """
+    rope = _rope(old_snapshot)
+    mapping = old_snapshot.source.mapping
+    applied: List[_Edit] = []
+    for edit in edits:
+        start = mapping[edit["row"], edit["col"]]
+        start_point = mapping[start]
+        if edit["type"] == "insert":
+            old_end, new_end = start, start + len(edit["text"])
+            rope = rope.insert(start, edit["text"])
+            new_end_point = _point_after(start_point, edit["text"])
+        else:
+            old_end, new_end = start + edit["len"], start
+            rope = rope.delete(start, old_end)
+            new_end_point = start_point
+        applied.append(
+            _Edit(start, old_end, new_end, start_point, mapping[old_end], new_end_point)
+        )
+        # the positions of the next edit are in the text after this one,
+        # which is only read around the edit
+        mapping = mapping.edited(rope, start, old_end, new_end)
 
-    new_snapshot = make_snapshot(new_source, old_snapshot.source.language, index=id,)
+    text = str(rope)
+    source = Source(text, mapping.with_text(text), old_snapshot.source.language)
 
+    regions = _compose(applied)
+    new_snapshot = _snapshot_for_edit(
+        old_snapshot, source, applied, regions, index=id, cache=cache, rope=rope
+    )
     tokens, changes = _adjust_tokens_for_edit(
-        old_snapshot, new_snapshot, "left", affected_range, next_id
+        old_snapshot, new_snapshot, regions, next_id
     )
 
     return Snapshot(
         id=new_snapshot.id,
         source=new_snapshot.source,
         tokens=tokens,
-        changes=changes,
-        _token_by_range=new_snapshot._token_by_range,
+        changes=tuple(changes),
         time=time,
+        tree=new_snapshot.tree,
+        rope=rope,
     )
 
 
-def token_info_for_insert(
-    old_snapshot: Snapshot, line: int, col: int, text: str, next_id=Id(), id=0, time=0.0
+def token_info_for_delete(
+    old_snapshot: Snapshot,
+    line: int,
+    col: int,
+    size: int,
+    next_id=Id(),
+    id=0,
+    time=0.0,
+    cache: Optional[SnapshotCache] = None,
 ):
-    start = old_snapshot.source.mapping[line, col]
-    new_source = insert(old_snapshot.source.text, start, text)
+    edit = {"type": "delete", "row": line, "col": col, "len": size}
+    return _apply_edits(old_snapshot, [edit], next_id, id=id, time=time, cache=cache)
 
-    new_snapshot = make_snapshot(new_source, old_snapshot.source.language, index=id,)
-    affected_range = (start, start + len(text))
 
-    tokens, changes = _adjust_tokens_for_edit(
-        old_snapshot, new_snapshot, "right", affected_range, next_id
-    )
-    return Snapshot(
-        id=new_snapshot.id,
-        source=new_snapshot.source,
-        tokens=tokens,
-        changes=changes,
-        _token_by_range=new_snapshot._token_by_range,
-        time=time,
-    )
+def token_info_for_insert(
+    old_snapshot: Snapshot,
+    line: int,
+    col: int,
+    text: str,
+    next_id=Id(),
+    id=0,
+    time=0.0,
+    cache: Optional[SnapshotCache] = None,
+):
+    edit = {"type": "insert", "row": line, "col": col, "text": text}
+    return _apply_edits(old_snapshot, [edit], next_id, id=id, time=time, cache=cache)
 
 
 def _perform_aggregated_edit(
-    snapshot: Snapshot, edits: dict, next_id: Callable[[], Union[str, float, int]], id=0
+    snapshot: Snapshot,
+    edits: dict,
+    next_id: Callable[[], Union[str, float, int]],
+    id=0,
+    cache: Optional[SnapshotCache] = None,
 ) -> Snapshot:
-    current_snapshot = snapshot
-    changes: List[TokenChange] = []
-
-    for edit in edits["edits"]:
-        current_snapshot = edit_source(current_snapshot, edit, next_id, id=id)
-        changes.extend(current_snapshot.changes)
-
-    return Snapshot(
+    # all edits of the group are parsed at once, and their
+    # tokens are compared with the snapshot before the group
+    return _apply_edits(
+        snapshot,
+        edits["edits"],
+        next_id,
         id=id,
-        source=current_snapshot.source,
-        tokens=current_snapshot.tokens,
         time=edits["edits"][0]["timestamp"],
-        changes=tuple(changes),
-        _token_by_range=current_snapshot._token_by_range,
+        cache=cache,
     )
 
 
 def edit_source(
-    snapshot: Snapshot, edit: dict, next_id: Callable[[], Union[str, float, int]], id=0
+    snapshot: Snapshot,
+    edit: dict,
+    next_id: Callable[[], Union[str, float, int]],
+    id=0,
+    cache: Optional[SnapshotCache] = None,
 ) -> Snapshot:
     return pampy.match(
         edit,
@@ -181,6 +588,7 @@ def edit_source(
             next_id=next_id,
             id=id,
             time=edit["timestamp"],
+            cache=cache,
         ),
         {"type": "delete"},
         lambda edit: token_info_for_delete(
@@ -191,8 +599,10 @@ def edit_source(
             next_id=next_id,
             id=id,
             time=edit["timestamp"],
+            cache=cache,
         ),
         {"type": "aggregated"},
-        lambda edit: _perform_aggregated_edit(snapshot, edit, next_id, id=id),
+        lambda edit: _perform_aggregated_edit(
+            snapshot, edit, next_id, id=id, cache=cache
+        ),
     )
-
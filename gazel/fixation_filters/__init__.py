@@ -1 +1,34 @@
-from gazel.fixation_filters.core import *
+from typing import TYPE_CHECKING, Dict
+
+from gazel._lazy import lazy_package
+
+# public name -> module that defines it, imported on first access
+_LAZY_IMPORTS: Dict[str, str] = {
+    "core": "gazel.fixation_filters.core",
+    **{
+        name: "gazel.fixation_filters.core"
+        for name in (
+            "load_gazes_from_xml",
+            "create_gazes_for_fixation_filters",
+            "get_raw_gaze_time",
+            "ivt",
+            "idt",
+            "basic",
+            "IVT",
+            "IDT",
+            "BASIC",
+            "Fixation",
+        )
+    },
+}
+
+_SUBMODULES = {"core"}
+
+__all__ = list(_LAZY_IMPORTS)
+
+if TYPE_CHECKING:
+    from gazel.fixation_filters import core
+    from gazel.fixation_filters.core import *
+
+
+__getattr__, __dir__ = lazy_package(__name__, _LAZY_IMPORTS, _SUBMODULES)
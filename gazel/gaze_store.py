@@ -0,0 +1,297 @@
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from gazel.core_types import Categories
+
+# compact dtypes of the gaze columns that gazel knows about.
+# Other numeric columns keep the dtype that they come with
+GAZE_DTYPES: Dict[str, np.dtype] = {
+    **dict.fromkeys(
+        ("event_id", "system_time", "plugin_time", "core_time", "fixation_event_time"),
+        np.dtype(np.int64),
+    ),
+    **dict.fromkeys(
+        ("x", "y", "left_pupil_diameter", "right_pupil_diameter"),
+        np.dtype(np.float32),
+    ),
+    **dict.fromkeys(
+        ("duration", "source_file_line", "source_file_col", "syntax_node_offset"),
+        np.dtype(np.int32),
+    ),
+    "syntax_node_id": np.dtype(np.int64),
+}
+
+# integer columns that are nullable even when no value is missing,
+# so that their dtype doesn't depend on the gazes
+NULLABLE_COLUMNS = (
+    "source_file_line",
+    "source_file_col",
+    "syntax_node_offset",
+    "syntax_node_id",
+)
+
+# columns that are always stored as categories. Other columns
+# are stored as categories when their values are not numbers
+CATEGORICAL_COLUMNS = (
+    "target",
+    "gaze_target",
+    "gaze_target_type",
+    "syntax_node",
+    "syntax_node_text",
+)
+
+MISSING_CODE = -1
+
+
+def _numbers(values: np.ndarray) -> np.ndarray:
+    return np.asarray(pd.to_numeric(values, errors="coerce"))
+
+
+def _is_text(values: np.ndarray) -> bool:
+    if values.dtype.kind not in "OSU":
+        return False
+    try:
+        pd.to_numeric(values)
+    except (ValueError, TypeError):
+        return True
+
+    return False
+
+
+class GazeStore:
+    """Gazes, stored as one typed array per column.
+
+    Known gaze columns get compact dtypes (`GAZE_DTYPES`): int64 times,
+    float32 coordinates and int32 points. Integer columns keep a mask of
+    missing values instead of turning into floats. Text columns are
+    stored as categories: integer codes into the list of their distinct
+    values, with `MISSING_CODE` for missing values. Each store has its
+    own categories, so syntax nodes only list the node types of the
+    gazes, not every grammar that was loaded.
+
+    Arrays grow geometrically, so that gazes can be appended a few at a
+    time. `array` returns the values of a column as a NumPy view, without
+    copying them, and `frame` returns the gazes as a pandas DataFrame,
+    with categorical and nullable integer columns.
+
+    Parameters
+    ----------
+    columns : Iterable[str], optional
+        columns to create up front, for columns that are only set with
+        `write`
+    """
+
+    def __init__(self, columns: Iterable[str] = ()):
+        self.columns: List[str] = []
+        self._size = 0
+        self._capacity = 0
+        self._values: Dict[str, np.ndarray] = {}
+        # True for missing values, only kept for integer columns
+        self._masks: Dict[str, np.ndarray] = {}
+        self._categories: Dict[str, Categories] = {}
+        for column in columns:
+            self._add_column(column, np.empty(0))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def array(self, column: str) -> np.ndarray:
+        """The values of `column`, as a view of the store. The values of
+        categorical columns are codes, see `categories`.
+
+        The view stays valid until gazes are appended.
+        """
+        return self._values[column][: self._size]
+
+    def mask(self, column: str) -> Optional[np.ndarray]:
+        """A view of the missing values of an integer column, or `None` if
+        no value of the column was ever missing."""
+        mask = self._masks.get(column)
+        return mask[: self._size] if mask is not None else None
+
+    def categories(self, column: str) -> Categories:
+        """The values that the codes of a categorical column stand for."""
+        return self._categories[column]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the gazes, including the values of categories."""
+        size = sum(
+            array[: self._size].nbytes
+            for arrays in (self._values, self._masks)
+            for array in arrays.values()
+        )
+        for categories in self._categories.values():
+            size += sum(sys.getsizeof(name) for name in categories.names)
+
+        return size
+
+    def append(self, gazes: Union[List[dict], pd.DataFrame]):
+        """Appends gazes, converting their values to the dtypes of the
+        store. Columns that are new to the store are missing for the
+        gazes before them."""
+        if isinstance(gazes, pd.DataFrame):
+            size = len(gazes)
+            columns = {column: gazes[column].to_numpy() for column in gazes.columns}
+        else:
+            size = len(gazes)
+            keys = dict.fromkeys(key for gaze in gazes for key in gaze)
+            columns = {
+                key: np.array([gaze.get(key) for gaze in gazes], dtype=object)
+                for key in keys
+            }
+        if not size:
+            return
+
+        self._reserve(self._size + size)
+        for column, values in columns.items():
+            if column not in self._values:
+                self._add_column(column, values)
+
+        rows = np.arange(self._size, self._size + size)
+        self._size += size
+        for column in self.columns:
+            if column in columns:
+                self._set(column, rows, *self._convert(column, columns[column]))
+            else:
+                self.clear(column, rows)
+
+    def write(
+        self,
+        column: str,
+        rows: np.ndarray,
+        values: np.ndarray,
+        missing: Optional[np.ndarray] = None,
+    ):
+        """Sets `column` at `rows` to `values`, which are codes for
+        categorical columns. Values are missing where `missing` is True.
+        """
+        dtype = self._values[column].dtype
+        self._set(column, rows, np.asarray(values).astype(dtype, copy=False), missing)
+
+    def clear(self, column: str, rows: np.ndarray):
+        """Sets `column` at `rows` to missing values."""
+        values = self._values[column]
+        if column in self._categories:
+            values[rows] = MISSING_CODE
+        elif values.dtype.kind == "f":
+            values[rows] = np.nan
+        elif values.dtype.kind in "iu":
+            values[rows] = 0
+            # integer columns only get a mask once a value is missing
+            if len(rows):
+                self._mask(column)[rows] = True
+        else:
+            values[rows] = np.zeros(1, dtype=values.dtype)[0]
+
+    def frame(
+        self, rows: Optional[np.ndarray] = None, columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """The gazes at `rows`, by default all of them, as a DataFrame
+        indexed by row. The values are copied."""
+        index = pd.RangeIndex(self._size) if rows is None else rows
+        if rows is None:
+            rows = np.arange(self._size)
+
+        data = {}
+        for column in columns if columns is not None else self.columns:
+            values = self.array(column)[rows]
+            if column in self._categories:
+                data[column] = pd.Categorical.from_codes(
+                    values, categories=self._categories[column].names
+                )
+            elif column in self._masks:
+                data[column] = pd.arrays.IntegerArray(values, self.mask(column)[rows])
+            else:
+                data[column] = values
+
+        return pd.DataFrame(data, index=index)
+
+    def _add_column(self, column: str, values: np.ndarray):
+        if column in CATEGORICAL_COLUMNS or (
+            column not in GAZE_DTYPES and _is_text(values)
+        ):
+            self._categories[column] = Categories()
+            dtype = np.dtype(np.int32)
+        elif column in GAZE_DTYPES:
+            dtype = GAZE_DTYPES[column]
+        elif len(values):
+            dtype = _numbers(values).dtype
+        else:
+            dtype = np.dtype(np.float64)
+
+        self.columns.append(column)
+        self._values[column] = np.empty(self._capacity, dtype=dtype)
+        if column in NULLABLE_COLUMNS:
+            self._mask(column)
+        self.clear(column, np.arange(self._size))
+
+    def _mask(self, column: str) -> np.ndarray:
+        mask = self._masks.get(column)
+        if mask is None:
+            mask = self._masks[column] = np.zeros(self._capacity, dtype=bool)
+
+        return mask
+
+    def _reserve(self, size: int):
+        if size <= self._capacity:
+            return
+
+        self._capacity = max(size, 2 * self._capacity, 16)
+        for arrays in (self._values, self._masks):
+            for column, array in arrays.items():
+                grown = np.zeros(self._capacity, dtype=array.dtype)
+                grown[: self._size] = array[: self._size]
+                arrays[column] = grown
+
+    def _convert(
+        self, column: str, values: np.ndarray
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """`values` in the dtype of `column`, and the mask of the ones that
+        are missing, for integer columns."""
+        if column in self._categories:
+            codes, uniques = pd.factorize(values)
+            # -1 stays -1, the last code
+            known = np.append(self._categories[column].codes(uniques), MISSING_CODE)
+            return known[codes], None
+
+        dtype = self._values[column].dtype
+        numbers = _numbers(values)
+        if dtype.kind not in "iu" or numbers.dtype.kind in "iub":
+            return numbers.astype(dtype), None
+
+        missing = np.isnan(numbers)
+        present = numbers[~missing]
+        if (present != np.floor(present)).any():
+            # fractions don't fit an integer column
+            self._to_floats(column)
+            return numbers, None
+
+        return np.where(missing, 0, numbers).astype(dtype), missing
+
+    def _to_floats(self, column: str):
+        values = self._values[column].astype(np.float64)
+        mask = self._masks.pop(column, None)
+        if mask is not None:
+            values[mask] = np.nan
+        self._values[column] = values
+
+    def _set(
+        self,
+        column: str,
+        rows: np.ndarray,
+        values: np.ndarray,
+        missing: Optional[np.ndarray],
+    ):
+        array = self._values[column]
+        array[rows] = values
+        if column in self._categories or array.dtype.kind not in "iu":
+            if missing is not None and missing.any():
+                self.clear(column, rows[missing])
+        elif missing is not None and missing.any():
+            self._mask(column)[rows] = missing
+        elif column in self._masks:
+            self._masks[column][rows] = False
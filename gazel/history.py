@@ -0,0 +1,332 @@
+import dataclasses
+from collections import OrderedDict
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from gazel.core_types import (
+    PositionMapping,
+    Snapshot,
+    Source,
+    Token,
+    TokenChange,
+    TokenTable,
+)
+
+CHANGE_TYPES = ("moved", "inserted", "deleted", "edited")
+
+
+class TextEdit(NamedTuple):
+    """Replaces `[start, old_end)` of a text with `text`."""
+
+    start: int
+    old_end: int
+    text: str
+
+    def apply(self, text: str) -> str:
+        return text[: self.start] + self.text + text[self.old_end :]
+
+
+def text_delta(old: str, new: str) -> TextEdit:
+    """Returns the smallest single `TextEdit` that turns `old` into `new`."""
+    # binary searches over substring comparisons, which run in C.
+    # Only the part that is not known to match yet is compared
+    lo, hi = 0, min(len(old), len(new))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old.startswith(new[lo:mid], lo):
+            lo = mid
+        else:
+            hi = mid - 1
+    prefix = lo
+
+    lo, hi = 0, min(len(old), len(new)) - prefix
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old.endswith(new[len(new) - mid : len(new) - lo], 0, len(old) - lo):
+            lo = mid
+        else:
+            hi = mid - 1
+    suffix = lo
+
+    return TextEdit(prefix, len(old) - suffix, new[prefix : len(new) - suffix])
+
+
+class TokenDelta(NamedTuple):
+    """The tokens of a snapshot, relative to the snapshot before it."""
+
+    # number of leading tokens that are unchanged
+    kept_prefix: int
+    # number of trailing tokens that only moved with the text edit
+    kept_suffix: int
+    # the tokens in between, without a source
+    rows: TokenTable
+
+
+def _token_delta(
+    old: TokenTable, new: TokenTable, shift: int, mapping: PositionMapping
+) -> TokenDelta:
+    size = min(len(old), len(new))
+    same = np.ones(size, dtype=bool)
+    for column in TokenTable.columns:
+        same &= getattr(old, column)[:size] == getattr(new, column)[:size]
+    prefix = size if same.all() else int(np.argmin(same))
+
+    # the tail is compared the way it will be rebuilt, so
+    # that rebuilding it gives back exactly the same rows
+    size -= prefix
+    tail = old[len(old) - size :].shifted(shift, "", mapping)
+    same = np.ones(size, dtype=bool)
+    for column in TokenTable.columns:
+        same &= getattr(tail, column) == getattr(new, column)[len(new) - size :]
+    suffix = size if same.all() else size - 1 - int(np.flatnonzero(~same)[-1])
+
+    rows = new[prefix : len(new) - suffix]._map(np.copy, "")
+    return TokenDelta(prefix, suffix, rows)
+
+
+class ChangeDelta(NamedTuple):
+    """The token changes of a snapshot, stored as token rows.
+
+    Tokens refer to the text of the previous snapshot (0), to texts in
+    between the two snapshots (1 to `len(texts)`, each one stored as an
+    edit of the one before it) or to the text of the snapshot itself.
+    """
+
+    types: np.ndarray
+    old: TokenTable
+    # text of each old token, -1 for changes without an old token
+    old_texts: np.ndarray
+    new: TokenTable
+    new_texts: np.ndarray
+    texts: Tuple[TextEdit, ...]
+
+
+def _change_delta(
+    changes: Sequence[TokenChange], old_text: str, new_text: str
+) -> ChangeDelta:
+    texts = [old_text]
+    text_numbers: Dict[str, int] = {old_text: 0, new_text: -1}
+    for change in changes:
+        for token in (change.old, change.new):
+            if token is not None and token.source not in text_numbers:
+                text_numbers[token.source] = len(texts)
+                texts.append(token.source)
+    # the text of the snapshot comes after all texts in between
+    text_numbers[new_text] = len(texts)
+    if new_text == old_text:
+        text_numbers[old_text] = 0
+
+    def side(tokens: List[Optional[Token]]) -> Tuple[TokenTable, np.ndarray]:
+        present = [token for token in tokens if token is not None]
+        numbers = [
+            -1 if token is None else text_numbers[token.source] for token in tokens
+        ]
+        return TokenTable.from_tokens("", present), np.array(numbers, dtype=np.int32)
+
+    old, old_texts = side([change.old for change in changes])
+    new, new_texts = side([change.new for change in changes])
+    return ChangeDelta(
+        np.array([CHANGE_TYPES.index(c.type) for c in changes], dtype=np.int8),
+        old,
+        old_texts,
+        new,
+        new_texts,
+        tuple(text_delta(a, b) for a, b in zip(texts, texts[1:])),
+    )
+
+
+def _changes_from_delta(
+    delta: ChangeDelta, old_text: str, new_text: str
+) -> Tuple[TokenChange, ...]:
+    texts = [old_text]
+    for edit in delta.texts:
+        texts.append(edit.apply(texts[-1]))
+    texts.append(new_text)
+
+    def side(table: TokenTable, numbers: np.ndarray) -> List[Optional[Token]]:
+        tables: Dict[int, TokenTable] = {}
+        rows = iter(zip(*(getattr(table, column).tolist() for column in table.columns)))
+        tokens: List[Optional[Token]] = []
+        for number in numbers.tolist():
+            if number < 0:
+                tokens.append(None)
+                continue
+            if number not in tables:
+                tables[number] = table.with_source(texts[number])
+            tokens.append(tables[number]._token(next(rows)))
+
+        return tokens
+
+    return tuple(
+        TokenChange(type=CHANGE_TYPES[code], old=old, new=new)
+        for code, old, new in zip(
+            delta.types.tolist(),
+            side(delta.old, delta.old_texts),
+            side(delta.new, delta.new_texts),
+        )
+    )
+
+
+class SnapshotDelta(NamedTuple):
+    """A snapshot, stored relative to the snapshot before it."""
+
+    id: int
+    time: float
+    text: TextEdit
+    tokens: TokenDelta
+    changes: Optional[ChangeDelta]
+
+
+def snapshot_delta(old: Snapshot, new: Snapshot) -> SnapshotDelta:
+    text = text_delta(old.source.text, new.source.text)
+    shift = len(new.source.text) - len(old.source.text)
+    return SnapshotDelta(
+        new.id,
+        new.time,
+        text,
+        _token_delta(old.tokens, new.tokens, shift, new.source.mapping),
+        (
+            _change_delta(new.changes, old.source.text, new.source.text)
+            if new.changes
+            else None
+        ),
+    )
+
+
+def apply_delta(snapshot: Snapshot, delta: SnapshotDelta) -> Snapshot:
+    """Rebuilds the snapshot that `delta` was made from, given the
+    snapshot before it."""
+    old_text = snapshot.source.text
+    edit = delta.text
+    text = edit.apply(old_text)
+    mapping = snapshot.source.mapping.edited(
+        text, edit.start, edit.old_end, edit.start + len(edit.text)
+    )
+    old_tokens = snapshot.tokens
+    kept_prefix, kept_suffix, rows = delta.tokens
+    tokens = TokenTable.concatenate(
+        text,
+        [
+            old_tokens[:kept_prefix],
+            rows,
+            old_tokens[len(old_tokens) - kept_suffix :].shifted(
+                len(text) - len(old_text), text, mapping
+            ),
+        ],
+    )
+    changes: Tuple[TokenChange, ...] = ()
+    if delta.changes is not None:
+        changes = _changes_from_delta(delta.changes, old_text, text)
+
+    return Snapshot(
+        id=delta.id,
+        source=Source(text, mapping, snapshot.source.language),
+        tokens=tokens,
+        changes=changes,
+        time=delta.time,
+    )
+
+
+class SnapshotHistory(Sequence[Snapshot]):
+    """The snapshots of a session, with most of them stored as deltas.
+
+    Every `checkpoint_interval`-th snapshot is kept in full. The ones in
+    between only keep the text edit, the token rows and the token changes
+    that differ from the snapshot before them, and are rebuilt when they
+    are accessed, by replaying the deltas since the last checkpoint
+    before them. Larger intervals use less memory, and make accessing a
+    snapshot slower.
+
+    Rebuilt snapshots are kept in an LRU cache. A snapshot that is not
+    cached is rebuilt from the closest snapshot before it that is, or
+    from its checkpoint.
+
+    The last snapshot is always kept in full, with its syntax tree and
+    rope, so that the session can be edited further. Other snapshots are
+    returned without them.
+
+    Parameters
+    ----------
+    checkpoint_interval : int, optional
+        keep every n-th snapshot in full, by default 1, which keeps all
+        snapshots in full.
+    replay_cache_size : int, optional
+        number of rebuilt snapshots to keep, by default 1, which is
+        enough to replay each delta only once when iterating.
+    """
+
+    def __init__(self, checkpoint_interval: int = 1, replay_cache_size: int = 1):
+        if checkpoint_interval < 1:
+            raise ValueError("checkpoint_interval must be at least 1")
+
+        self.checkpoint_interval = checkpoint_interval
+        self.replay_cache_size = replay_cache_size
+        self._checkpoints: List[Snapshot] = []
+        # one entry per snapshot, None for checkpoints
+        self._deltas: List[Optional[SnapshotDelta]] = []
+        self._last: Optional[Snapshot] = None
+        # rebuilt snapshots by index, least recently used first
+        self._replayed: "OrderedDict[int, Snapshot]" = OrderedDict()
+
+    def append(self, snapshot: Snapshot):
+        index = len(self._deltas)
+        if index % self.checkpoint_interval == 0:
+            self._checkpoints.append(
+                dataclasses.replace(snapshot, tree=None, rope=None)
+            )
+            self._deltas.append(None)
+        else:
+            assert self._last is not None
+            self._deltas.append(snapshot_delta(self._last, snapshot))
+        self._last = snapshot
+
+    def _replay(self, index: int) -> Snapshot:
+        if index in self._replayed:
+            self._replayed.move_to_end(index)
+            return self._replayed[index]
+
+        checkpoint = index - index % self.checkpoint_interval
+        start = max(
+            (i for i in self._replayed if checkpoint < i < index), default=checkpoint
+        )
+        if start == checkpoint:
+            snapshot = self._checkpoints[checkpoint // self.checkpoint_interval]
+        else:
+            snapshot = self._replayed[start]
+
+        for i in range(start + 1, index + 1):
+            delta = self._deltas[i]
+            assert delta is not None
+            snapshot = apply_delta(snapshot, delta)
+
+        if self.replay_cache_size > 0:
+            self._replayed[index] = snapshot
+            while len(self._replayed) > self.replay_cache_size:
+                self._replayed.popitem(last=False)
+
+        return snapshot
+
+    def __len__(self) -> int:
+        return len(self._deltas)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self)))]
+
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("snapshot index out of range")
+
+        if key == len(self) - 1:
+            assert self._last is not None
+            return self._last
+        if key % self.checkpoint_interval == 0:
+            return self._checkpoints[key // self.checkpoint_interval]
+
+        return self._replay(key)
+
+    def __iter__(self) -> Iterator[Snapshot]:
+        for i in range(len(self)):
+            yield self[i]
@@ -1,15 +1,29 @@
-
 from __future__ import annotations
 
+import hashlib
 import os
+import platform
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Literal, Optional, Tuple, cast
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 
-from git import Repo
-from tqdm.auto import tqdm
 from tree_sitter import Language, Node, Parser, Tree, TreeCursor
 
+from gazel.text import Rope
+
 SUPPORTED_LANGUAGES = {
     "java": "java",
     "js": "javascript",
@@ -37,6 +51,10 @@ SUPPORTED_LANGUAGES = {
 
 
 def clone_repo(repo_url: str, repo_path: str):
+    # only needed when a grammar has to be fetched, and slow to import
+    from git import Repo
+    from tqdm.auto import tqdm
+
     def make_progress():
         bar = tqdm()
         total = None
@@ -62,42 +80,201 @@ def get_repo_path(cache_dir: str, language: str):
     return os.path.join(cache_dir, f"tree-sitter-{language}")
 
 
-def build_language_library(cache_dir: str, library_path: str):
-    language_repo_paths = []
-    for language in SUPPORTED_LANGUAGES:
-        repo_name = f"tree-sitter-{language}"
-        repo_path = get_repo_path(cache_dir, language)
-        if not os.path.exists(cache_dir):
-            os.makedirs(cache_dir)
+def get_default_cache_dir() -> str:
+    return str(Path().home() / ".cache" / "tree-sitter-grammars")
 
-        if not os.path.exists(repo_path):
-            clone_repo(f"https://github.com/tree-sitter/{repo_name}", repo_path)
-        language_repo_paths.append(repo_path)
+
+def get_grammar_path(grammar_dir: str, language: str, clone_missing: bool) -> str:
+    """Returns the path of the `tree-sitter-<language>` checkout in
+    `grammar_dir`. A missing checkout is cloned from github if
+    `clone_missing`, and is an error otherwise.
+    """
+    repo_path = get_repo_path(grammar_dir, language)
+    if not os.path.exists(repo_path):
+        if not clone_missing:
+            raise FileNotFoundError(
+                f"no {language} grammar at {repo_path}: check out "
+                f"tree-sitter-{language} there, or pass clone_missing=True "
+                "to clone it from github"
+            )
+        os.makedirs(grammar_dir, exist_ok=True)
+        clone_repo(f"https://github.com/tree-sitter/tree-sitter-{language}", repo_path)
+
+    return repo_path
+
+
+def build_language_library(
+    cache_dir: str, library_path: str, clone_missing: bool = False
+):
+    language_repo_paths = [
+        get_grammar_path(cache_dir, language, clone_missing)
+        for language in sorted(set(SUPPORTED_LANGUAGES.values()))
+    ]
 
     Language.build_library(
-        library_path, language_repo_paths,
+        library_path,
+        language_repo_paths,
+    )
+
+
+def _grammar_source_files(repo_path: str) -> List[str]:
+    sources = []
+    for root, _, files in os.walk(os.path.join(repo_path, "src")):
+        sources.extend(
+            os.path.join(root, f) for f in files if f.endswith((".c", ".cc", ".h"))
+        )
+
+    return sorted(sources)
+
+
+def _compiler_flags() -> List[str]:
+    """everything besides the grammar sources that affects the built library"""
+    try:
+        from importlib.metadata import version
+
+        tree_sitter_version = version("tree_sitter")
+    except Exception:
+        tree_sitter_version = "unknown"
+
+    return [
+        platform.system(),
+        platform.machine(),
+        tree_sitter_version,
+        os.environ.get("CC", ""),
+        os.environ.get("CFLAGS", ""),
+        os.environ.get("LDFLAGS", ""),
+    ]
+
+
+def get_library_cache_key(repo_path: str) -> str:
+    """Hashes the sources of the grammar at `repo_path`, together
+    with the compiler flags used to build them.
+    """
+    digest = hashlib.sha256()
+    for flag in _compiler_flags():
+        digest.update(flag.encode("utf-8") + b"\0")
+    for source_path in _grammar_source_files(repo_path):
+        digest.update(os.path.relpath(source_path, repo_path).encode("utf-8") + b"\0")
+        with open(source_path, "rb") as f:
+            digest.update(f.read())
+
+    return digest.hexdigest()[:16]
+
+
+def build_language(
+    language: str,
+    cache_dir: Optional[str] = None,
+    grammar_dir: Optional[str] = None,
+    clone_missing: bool = False,
+) -> str:
+    """Builds the shared library for a single grammar, unless a library
+    built from the same sources and flags is already cached.
+
+    Parameters
+    ----------
+    language : str
+        the grammar name, i.e. one of the values of `SUPPORTED_LANGUAGES`
+    cache_dir : Optional[str], optional
+        where built libraries are cached, by default `~/.cache/tree-sitter-grammars`
+    grammar_dir : Optional[str], optional
+        the directory holding the `tree-sitter-<language>` grammar checkouts,
+        by default `cache_dir`
+    clone_missing : bool, optional
+        whether a grammar missing from `grammar_dir` is cloned from github,
+        by default False, in which case it raises a `FileNotFoundError`
+
+    Returns
+    -------
+    str
+        path to the built library
+    """
+    cache_dir = cache_dir or get_default_cache_dir()
+    repo_path = get_grammar_path(grammar_dir or cache_dir, language, clone_missing)
+
+    library_dir = os.path.join(cache_dir, "lib")
+    library_path = os.path.join(
+        library_dir, f"{language}-{get_library_cache_key(repo_path)}.so"
     )
+    if not os.path.exists(library_path):
+        os.makedirs(library_dir, exist_ok=True)
+        # build under a private name first, so that concurrent
+        # workers never load a partially written library
+        build_path = f"{library_path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        Language.build_library(build_path, [repo_path])
+        os.replace(build_path, library_path)
+
+    return library_path
+
+
+def build_languages(
+    extensions: Iterable[str],
+    cache_dir: Optional[str] = None,
+    grammar_dir: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    clone_missing: bool = False,
+) -> Dict[str, str]:
+    """Builds the grammars for `extensions` in parallel, with one
+    compiler running per core by default. See `build_language`.
+
+    Returns
+    -------
+    Dict[str, str]
+        the library path for each extension
+    """
+    extensions = list(extensions)
+    languages = sorted({SUPPORTED_LANGUAGES[extension] for extension in extensions})
+
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        paths = pool.map(
+            lambda language: build_language(
+                language, cache_dir, grammar_dir, clone_missing
+            ),
+            languages,
+        )
+        library_paths = dict(zip(languages, paths))
+
+    return {
+        extension: library_paths[SUPPORTED_LANGUAGES[extension]]
+        for extension in extensions
+    }
 
 
 def load_language(
     extension: str,
     cache_dir: Optional[str] = None,
     language_library: Optional[str] = None,
-) -> Parser:
+    grammar_dir: Optional[str] = None,
+    clone_missing: bool = False,
+) -> Language:
+    """Loads the grammar for `extension`. By default only this grammar is
+    built (see `build_language`). If `language_library` is given, all
+    supported grammars are instead built into that single library.
+    """
     if not cache_dir:
-        cache_dir = Path().home() / ".cache" / "tree-sitter-grammars"
-    if not language_library:
-        language_library = "language_lib.so"
+        cache_dir = get_default_cache_dir()
     assert (
         extension in SUPPORTED_LANGUAGES
     ), f"Invalid language, can be one of [{', '.join(SUPPORTED_LANGUAGES)}]"
-    language_library = os.path.join(cache_dir, language_library)
+    language = SUPPORTED_LANGUAGES[extension]
 
-    if not os.path.exists(language_library):
-        build_language_library(cache_dir=cache_dir, library_path=language_library)
+    if language_library:
+        language_library = os.path.join(cache_dir, language_library)
+        if not os.path.exists(language_library):
+            build_language_library(
+                cache_dir=cache_dir,
+                library_path=language_library,
+                clone_missing=clone_missing,
+            )
+    else:
+        language_library = build_language(
+            language,
+            cache_dir=cache_dir,
+            grammar_dir=grammar_dir,
+            clone_missing=clone_missing,
+        )
 
-    language = SUPPORTED_LANGUAGES[extension]
-    grammar = Language(language_library, language)
+    # grammar symbols use underscores, e.g. `tree_sitter_c_sharp`
+    grammar = Language(language_library, language.replace("-", "_"))
 
     return grammar
 
@@ -109,10 +286,149 @@ def make_parser(language):
     return parser
 
 
-def get_tokens(source: str, language_extension: str, pti):
-    language = load_language(language_extension)
-    parser = make_parser(language)
-    tree = parser.parse(bytes(source, "utf-8"))
+class RegistryStats(NamedTuple):
+    language_hits: int
+    language_misses: int
+    parser_hits: int
+    parser_misses: int
+
+
+class ParserRegistry:
+    """Process-wide cache of grammars and parsers.
+
+    Each `Language` is loaded from the shared library once per process.
+    `Parser` instances are kept per thread, so that concurrent trackers
+    never share a parser.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        language_library: Optional[str] = None,
+        grammar_dir: Optional[str] = None,
+        clone_missing: bool = False,
+    ):
+        self.cache_dir = cache_dir
+        self.language_library = language_library
+        self.grammar_dir = grammar_dir
+        self.clone_missing = clone_missing
+        self._languages: Dict[str, Language] = {}
+        self._lock = threading.Lock()
+        # held while the grammar of an extension is being loaded
+        self._loading: Dict[str, threading.Lock] = {}
+        self._local = threading.local()
+        self._language_hits = 0
+        self._language_misses = 0
+        self._parser_hits = 0
+        self._parser_misses = 0
+
+    def language(self, extension: str) -> Language:
+        """Returns the grammar for `extension`, loading it on first use.
+
+        Grammars are loaded, and built if needed, outside of the registry
+        lock, so that a slow build never blocks the other extensions. A
+        lock per extension still makes sure that each is loaded once.
+        """
+        with self._lock:
+            grammar = self._languages.get(extension)
+            if grammar is not None:
+                self._language_hits += 1
+                return grammar
+            loading = self._loading.setdefault(extension, threading.Lock())
+
+        with loading:
+            with self._lock:
+                # loaded by another thread while this one waited
+                grammar = self._languages.get(extension)
+                if grammar is not None:
+                    self._language_hits += 1
+                    return grammar
+                self._language_misses += 1
+
+            grammar = load_language(
+                extension,
+                cache_dir=self.cache_dir,
+                language_library=self.language_library,
+                grammar_dir=self.grammar_dir,
+                clone_missing=self.clone_missing,
+            )
+            with self._lock:
+                self._languages[extension] = grammar
+                self._loading.pop(extension, None)
+
+            return grammar
+
+    def parser(self, extension: str) -> Parser:
+        """Returns this thread's parser for `extension`."""
+        parsers: Optional[Dict[str, Parser]] = getattr(self._local, "parsers", None)
+        if parsers is None:
+            parsers = self._local.parsers = {}
+
+        parser = parsers.get(extension)
+        with self._lock:
+            if parser is not None:
+                self._parser_hits += 1
+                return parser
+            self._parser_misses += 1
+
+        parser = make_parser(self.language(extension))
+        parsers[extension] = parser
+
+        return parser
+
+    def stats(self) -> RegistryStats:
+        with self._lock:
+            return RegistryStats(
+                language_hits=self._language_hits,
+                language_misses=self._language_misses,
+                parser_hits=self._parser_hits,
+                parser_misses=self._parser_misses,
+            )
+
+    def clear(self) -> None:
+        """Drops all cached grammars and parsers, and resets the counters.
+        Parsers already handed out to other threads are only dropped from
+        the calling thread.
+        """
+        with self._lock:
+            self._languages.clear()
+            self._local = threading.local()
+            self._language_hits = 0
+            self._language_misses = 0
+            self._parser_hits = 0
+            self._parser_misses = 0
+
+
+registry = ParserRegistry()
+
+
+def get_parser(language_extension: str) -> Parser:
+    return registry.parser(language_extension)
+
+
+def parse(
+    source: Union[str, Rope], language_extension: str, old_tree: Optional[Tree] = None
+) -> Tree:
+    """Parses `source`. If `old_tree` is given, it must already have been
+    edited (see `Tree.edit`) to match `source`, and is used to parse
+    incrementally.
+
+    A `Rope` is read chunk by chunk through a read callback, instead of
+    being encoded as a whole. This saves a copy of the text per parse,
+    not the parse itself: tree-sitter still reads all the text that it
+    lexes again, which is all of it after edits near a syntax error.
+    """
+    parser = get_parser(language_extension)
+    read = source.read if isinstance(source, Rope) else bytes(source, "utf-8")
+    if old_tree is None:
+        return parser.parse(read)
+
+    return parser.parse(read, old_tree)
+
+
+def get_tokens(source: str, language_extension: str, pti, tree: Optional[Tree] = None):
+    if tree is None:
+        tree = parse(source, language_extension)
     captures = extract_tokens_from_tree(tree)
 
     return captures
@@ -127,46 +443,171 @@ def walk_tree(cursor: TreeCursor, move: Literal["down", "up", "right"], fn) -> N
         move (Literal["down", "up", "right"]): the move made to get to current cursor position
         fn (function): the visitor function to apply to each node.
     """
-    if move in ("down", "right"):
-        fn(cursor)
-        if cursor.goto_first_child():
-            walk_tree(cursor, "down", fn)
-        elif cursor.goto_next_sibling():
-            walk_tree(cursor, "right", fn)
-        elif cursor.goto_parent():
-            walk_tree(cursor, "up", fn)
-    elif move == "up":
-        if cursor.goto_next_sibling():
-            walk_tree(cursor, "right", fn)
-        elif cursor.goto_parent():
-            walk_tree(cursor, "up", fn)
+    while True:
+        if move in ("down", "right"):
+            fn(cursor)
+            if cursor.goto_first_child():
+                move = "down"
+            elif cursor.goto_next_sibling():
+                move = "right"
+            elif cursor.goto_parent():
+                move = "up"
+            else:
+                return
+        elif move == "up":
+            if cursor.goto_next_sibling():
+                move = "right"
+            elif cursor.goto_parent():
+                move = "up"
+            else:
+                return
+        else:
+            return
 
 
 def is_child_node(node: Node) -> bool:
     return node.child_count == 0
 
 
+class Leaves(NamedTuple):
+    """The leaves of a syntax tree in document order, as parallel arrays.
+    `kinds` holds tree-sitter's node kind ids, `kind_names` maps them
+    back to node types.
+    """
+
+    start_bytes: array
+    end_bytes: array
+    kinds: array
+    kind_names: Dict[int, str]
+
+    def captures(self) -> List[Tuple[Tuple[int], str]]:
+        names = self.kind_names
+        return [
+            (cast(Tuple[int], (start, end)), names[kind])
+            for start, end, kind in zip(self.start_bytes, self.end_bytes, self.kinds)
+        ]
+
+
+def extract_leaves(tree: Tree) -> Leaves:
+    """Collects the leaves of `tree` with a single, non-recursive
+    cursor walk. Only leaf nodes are materialized as python objects.
+
+    Args:
+        tree (Tree): target tree
+
+    Returns:
+        Leaves: start bytes, end bytes and kind ids of all leaves
+    """
+    start_bytes = array("q")
+    end_bytes = array("q")
+    kinds = array("H")
+    kind_names: Dict[int, str] = {}
+    cursor: TreeCursor = tree.walk()
+
+    while True:
+        if cursor.goto_first_child():
+            continue
+
+        node = cursor.node
+        kind = node.kind_id
+        if kind not in kind_names:
+            kind_names[kind] = node.type
+        start_bytes.append(node.start_byte)
+        end_bytes.append(node.end_byte)
+        kinds.append(kind)
+
+        while not cursor.goto_next_sibling():
+            if not cursor.goto_parent():
+                return Leaves(start_bytes, end_bytes, kinds, kind_names)
+
+
 def extract_tokens_from_tree(tree: Tree) -> List[Tuple[Tuple[int], str]]:
-    """Walks the given tree, in a depth first manner, 
+    """Walks the given tree, in a depth first manner,
     and extracts token indices from all child nodes
 
     Args:
         tree (Tree): target tree
 
     Returns:
-        List[Tuple[Tuple[int], str]]: [description]
+        List[Tuple[Tuple[int], str]]: `((start, end), type)` for every leaf
+    """
+    return extract_leaves(tree).captures()
+
+
+def changed_ranges(old_tree: Tree, new_tree: Tree) -> List[Tuple[int, int]]:
+    """Byte ranges of `new_tree` whose syntactic structure differs from
+    `old_tree`. `old_tree` must have been edited to match `new_tree`'s source.
+    """
+    if hasattr(old_tree, "changed_ranges"):
+        ranges = old_tree.changed_ranges(new_tree)
+    else:  # tree_sitter < 0.20.2
+        ranges = old_tree.get_changed_ranges(new_tree)
+
+    return [(r.start_byte, r.end_byte) for r in ranges]
+
+
+def error_ranges(tree: Tree) -> List[Tuple[int, int]]:
+    """Byte ranges of the top level nodes of `tree` that contain syntax errors.
+
+    Error recovery can change leaves inside of these without
+    `changed_ranges` reporting it, so each range also covers the extras
+    and zero-width (missing) nodes that directly follow it.
+    """
+    ranges: List[Tuple[int, int]] = []
+    cursor: TreeCursor = tree.walk()
+    if not cursor.node.has_error or not cursor.goto_first_child():
+        return ranges
+
+    extending = False
+    while True:
+        node = cursor.node
+        if extending and (node.is_extra or node.start_byte == node.end_byte):
+            ranges[-1] = (ranges[-1][0], node.end_byte)
+        elif node.has_error:
+            ranges.append((node.start_byte, node.end_byte))
+            extending = True
+        else:
+            extending = False
+        if not cursor.goto_next_sibling():
+            break
+
+    return ranges
+
+
+def _overlaps_range(node: Node, start: int, end: int) -> bool:
+    if node.start_byte == node.end_byte:
+        return start <= node.start_byte < end
+    return node.start_byte < end and node.end_byte > start
+
+
+def extract_tokens_in_range(
+    tree: Tree, start: int, end: int
+) -> List[Tuple[Tuple[int], str]]:
+    """Same as `extract_tokens_from_tree`, but only returns the leaves
+    that overlap the byte range `[start, end)`. Only the path down to
+    the first such leaf and the leaves inside the range are visited.
     """
     cursor: TreeCursor = tree.walk()
     children: List[Tuple[Tuple[int], str]] = []
 
-    def walker(cursor: TreeCursor):
-        if is_child_node(cursor.node):
-            indices: Tuple[int] = cast(
-                Tuple[int], (cursor.node.start_byte, cursor.node.end_byte)
-            )
-            children.append((indices, cursor.node.type))
-
-    walk_tree(cursor, "down", walker)
+    # descend to the first leaf that ends at or after `start`
+    while cursor.goto_first_child():
+        while cursor.node.end_byte < start and cursor.goto_next_sibling():
+            pass
+
+    while True:
+        node = cursor.node
+        if node.start_byte >= end and node.start_byte != node.end_byte:
+            break
+        if _overlaps_range(node, start, end):
+            indices: Tuple[int] = cast(Tuple[int], (node.start_byte, node.end_byte))
+            children.append((indices, node.type))
+
+        # move to the next leaf
+        while not cursor.goto_next_sibling():
+            if not cursor.goto_parent():
+                return children
+        while cursor.goto_first_child():
+            pass
 
     return children
-
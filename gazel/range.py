@@ -1,5 +1,7 @@
 from gazel.core_types import Position, PositionMapping, Range, Snapshot, Token, Point
-from typing import Tuple, Union, Optional
+from typing import Iterable, Tuple, Union, Optional
+
+import numpy as np
 
 
 def _shift_range(token_range: Range, n: int, mapping: PositionMapping) -> Range:
@@ -22,8 +24,9 @@ def token_at_point(snapshot: Snapshot, point: Point) -> Union[Token, None]:
     return token_at_index(snapshot, index)
 
 
-def range_overlaps(a: Tuple[int, int], b: Tuple[int, int]):
-    return set(range(a[0], a[1])) & set(range(b[0], b[1]))
+def range_overlaps(a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+    """if the half open ranges `a` and `b` share an index"""
+    return a[0] < a[1] and b[0] < b[1] and a[0] < b[1] and b[0] < a[1]
 
 
 def range_contains(a: Tuple[int, int], b: Tuple[int, int]) -> bool:
@@ -45,11 +48,8 @@ def range_contains(a: Tuple[int, int], b: Tuple[int, int]) -> bool:
 
 
 def get_token_at_range(snapshot: Snapshot, r: Tuple[int, int]) -> Optional[Token]:
-    for token in snapshot.tokens:
-        if range_overlaps((token.range.start.index, token.range.end.index), r):
-            return token
-
-    return None
+    row = snapshot.tokens.first_overlapping(*r)
+    return snapshot.tokens[row] if row >= 0 else None
 
 
 def range_contains_index(r: Range, index: int) -> bool:
@@ -57,10 +57,13 @@ def range_contains_index(r: Range, index: int) -> bool:
 
 
 def token_at_index(snapshot: Snapshot, index: int) -> Optional[Token]:
-    for token in snapshot.tokens:
-        if range_contains_index(token.range, index):
-            return token
-    return None
+    return snapshot.tokens.token_at(index)
+
+
+def tokens_at_indices(snapshot: Snapshot, indices: Iterable[int]) -> np.ndarray:
+    """Batch version of `token_at_index`. Returns the rows of
+    `snapshot.tokens` that contain each index, -1 for no token."""
+    return snapshot.tokens.rows_at(indices)
 
 
 def same_point_range(a: Range, b: Range) -> bool:
@@ -0,0 +1,116 @@
+import hashlib
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional, Tuple
+
+from gazel.core_types import Snapshot
+from gazel.parsing import error_ranges
+
+# number of source states cached when every snapshot is stored in full
+DEFAULT_CACHE_SIZE = 128
+
+
+def default_cache_size(checkpoint_interval: int = 1) -> int:
+    """Size of the snapshot cache for a history that stores every
+    `checkpoint_interval`-th snapshot in full.
+
+    Cached snapshots are kept in full, with their syntax tree, so a
+    cache as large as with full snapshots would keep most of the memory
+    that storing deltas saves. The cache is scaled down with the
+    interval instead, which keeps the most recent source states, where
+    most repeated states are found (a typo and its backspace), and is
+    turned off for intervals over `DEFAULT_CACHE_SIZE`.
+    """
+    return DEFAULT_CACHE_SIZE // max(checkpoint_interval, 1)
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class CachedSnapshot(NamedTuple):
+    snapshot: Snapshot
+    # byte ranges of the top level nodes that failed to parse
+    error_ranges: List[Tuple[int, int]]
+
+
+class SnapshotCache:
+    """LRU cache of parsed source states, keyed by the content of the source.
+
+    Editing sessions revisit the same text often (a typo and its
+    backspace, undo/redo). For those states the token layout and the
+    syntax tree of an earlier snapshot are reused as is; only the token
+    ids still have to be aligned against the previous snapshot. Texts
+    with syntax errors are parsed again, since tree-sitter may recover
+    from the errors differently depending on the tree it reparses, but
+    only their erroneous parts are extracted again.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        number of source states to keep, by default `DEFAULT_CACHE_SIZE`.
+        A size of 0 disables the cache.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[bytes, CachedSnapshot]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def key(text: str, language: str) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(language.encode())
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8", "surrogatepass"))
+        return digest.digest()
+
+    def get(self, text: str, language: str) -> Optional[CachedSnapshot]:
+        """Returns the snapshot cached for `text`, if any."""
+        key = self.key(text, language)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, snapshot: Snapshot):
+        """Caches the token layout of `snapshot` under its source text.
+        `snapshot.tree` is shared with the snapshots built from the
+        cache, and must not be edited.
+        """
+        if self.maxsize <= 0 or snapshot.tree is None:
+            return
+
+        key = self.key(snapshot.source.text, snapshot.source.language)
+        # tree-sitter may recover from syntax errors differently when
+        # the same text is parsed again, so the erroneous parts of the
+        # layout are remembered while the tree is still intact
+        self._entries[key] = CachedSnapshot(snapshot, error_ranges(snapshot.tree))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            size=len(self._entries),
+            maxsize=self.maxsize,
+        )
+
+    def clear(self):
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
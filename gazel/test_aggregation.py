@@ -0,0 +1,110 @@
+import copy
+from typing import Dict, List
+
+from gazel.aggregation import (
+    aggregate_edits,
+    all_of,
+    any_of,
+    same_line,
+    same_token,
+    time_window,
+)
+
+
+def insert(row: int, col: int, text: str, timestamp: float) -> Dict:
+    return {
+        "type": "insert",
+        "row": row,
+        "col": col,
+        "text": text,
+        "timestamp": timestamp,
+    }
+
+
+def delete(row: int, col: int, size: int, timestamp: float) -> Dict:
+    return {
+        "type": "delete",
+        "row": row,
+        "col": col,
+        "len": size,
+        "timestamp": timestamp,
+    }
+
+
+def groups(edits: List[Dict], policy) -> List[List[Dict]]:
+    return [
+        edit["edits"] if edit["type"] == "aggregated" else [edit]
+        for edit in aggregate_edits(edits, policy)
+    ]
+
+
+def test_time_window_groups_edits_close_to_the_one_before_them():
+    edits = [insert(0, i, "a", t) for i, t in enumerate([0, 100, 250, 1000, 1050])]
+
+    assert groups(edits, time_window(200)) == [edits[:3], edits[3:]]
+    assert groups(edits, time_window(10)) == [[edit] for edit in edits]
+
+
+def test_edits_are_not_modified_and_single_edits_are_not_wrapped():
+    edits = [insert(0, 0, "a", 0), insert(0, 1, "b", 1), insert(1, 0, "c", 9)]
+    before = copy.deepcopy(edits)
+
+    aggregated = list(aggregate_edits(edits, time_window(5)))
+
+    assert edits == before
+    assert aggregated == [{"type": "aggregated", "edits": edits[:2]}, edits[2]]
+    assert aggregated[1] is edits[2]
+
+
+def test_aggregated_edits_are_merged_into_groups():
+    edits = [insert(0, 0, "a", 0), insert(0, 1, "b", 1), insert(0, 2, "c", 2)]
+    aggregated = list(aggregate_edits(edits[:2], time_window(5)))
+
+    assert groups(aggregated + edits[2:], time_window(5)) == [edits]
+
+
+def test_groups_are_yielded_as_soon_as_they_are_complete():
+    def stream():
+        yield insert(0, 0, "a", 0)
+        yield insert(0, 1, "b", 1)
+        yield insert(0, 2, "c", 100)
+        raise AssertionError("read past the first group")
+
+    aggregated = aggregate_edits(stream(), time_window(5))
+
+    assert next(aggregated)["edits"][1]["text"] == "b"
+
+
+def test_same_line():
+    edits = [insert(0, 0, "a", 0), delete(0, 5, 1, 1), insert(1, 0, "b", 2)]
+
+    assert groups(edits, same_line()) == [edits[:2], edits[2:]]
+
+
+def test_same_token_continues_words_where_they_left_off():
+    typing = [insert(0, 4 + i, c, i) for i, c in enumerate("foo_1")]
+    erasing = [delete(0, 8 - i, 1, 10 + i) for i in range(3)]
+    forward = [delete(0, 6, 1, 20), delete(0, 6, 1, 21)]
+    edits = typing + erasing + forward
+
+    assert groups(edits, same_token()) == [edits]
+    # a space, a jump and another line each start a new group
+    edits = [
+        insert(0, 0, "a", 0),
+        insert(0, 1, " ", 1),
+        insert(0, 2, "b", 2),
+        insert(0, 7, "c", 3),
+        insert(1, 8, "d", 4),
+    ]
+    assert groups(edits, same_token()) == [[edit] for edit in edits]
+
+
+def test_policies_combine():
+    edits = [insert(0, 0, "a", 0), insert(0, 1, "b", 1), insert(1, 0, "c", 2)]
+    edits.append(insert(1, 1, "d", 500))
+
+    both = all_of(time_window(100), same_line())
+    either = any_of(time_window(100), same_line())
+
+    assert groups(edits, both) == [edits[:2], edits[2:3], edits[3:]]
+    assert groups(edits, either) == [edits]
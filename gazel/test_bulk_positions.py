@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from gazel.core_types import PositionMapping
+
+TEXT = "ab\r\ncde\n\nf"
+
+
+def scalar_index(mapping: PositionMapping, line, col) -> int:
+    """`mapping[line, col]`, or -1 if the point is not in the text or is
+    not a pair of whole numbers."""
+    try:
+        if line != int(line) or col != int(col):
+            return -1
+        return mapping[int(line), int(col)]
+    except (KeyError, ValueError, TypeError):
+        return -1
+
+
+@pytest.mark.parametrize(
+    "lines, cols",
+    [
+        (np.arange(-1, 5).repeat(7), np.tile(np.arange(-1, 6), 6)),
+        (
+            np.array([0.0, 1.0, np.nan, 1.5, 3.0]),
+            np.array([1.0, np.nan, 0.0, 0.0, 1.0]),
+        ),
+        (np.array([0, None, 1], dtype=object), np.array([1, 0, None], dtype=object)),
+        (np.array([], dtype=np.int64), np.array([], dtype=np.int64)),
+    ],
+)
+def test_indices_at_matches_lookups(lines, cols):
+    mapping = PositionMapping.from_text(TEXT)
+
+    indices, valid = mapping.indices_at(lines, cols)
+
+    expected = [
+        scalar_index(mapping, line, col)
+        for line, col in zip(lines.tolist(), cols.tolist())
+    ]
+    assert indices.tolist() == expected
+    assert valid.tolist() == [index >= 0 for index in expected]
+
+
+def test_points_at_matches_lookups():
+    mapping = PositionMapping.from_text(TEXT)
+    indices = np.arange(-2, len(TEXT) + 3)
+
+    lines, cols, valid = mapping.points_at(indices)
+
+    for index, line, col, ok in zip(indices.tolist(), lines, cols, valid):
+        if 0 <= index <= len(TEXT):
+            assert ok
+            assert (mapping[index].line, mapping[index].col) == (line, col)
+        else:
+            assert not ok
+            assert (line, col) == (-1, -1)
+
+
+def test_points_at_rejects_fractions():
+    mapping = PositionMapping.from_text(TEXT)
+
+    lines, cols, valid = mapping.points_at([1.0, 1.5, np.nan])
+
+    assert valid.tolist() == [True, False, False]
+    assert (lines.tolist(), cols.tolist()) == ([0, -1, -1], [1, -1, -1])
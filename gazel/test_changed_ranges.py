@@ -0,0 +1,80 @@
+import pytest
+
+import gazel.edits
+from gazel.common import Id
+from gazel.core import make_versions
+from gazel.core_constructors import make_snapshot
+from gazel.edits import edit_source
+from gazel.parsing import extract_tokens_from_tree, extract_tokens_in_range, parse
+from gazel.snapshot_cache import SnapshotCache
+
+SOURCE = "".join(
+    f"function f{i}(a, b) {{\n  return a + b * {i};\n}}\n" for i in range(500)
+)
+
+
+def layout(snapshot):
+    return [
+        ((token.range.start.index, token.range.end.index), token.syntax_node)
+        for token in snapshot.tokens
+    ]
+
+
+@pytest.mark.parametrize(
+    "start, end",
+    [(0, 0), (0, 1), (5, 40), (100, 101), (len(SOURCE) - 3, len(SOURCE) + 5)],
+)
+def test_tokens_in_range_are_the_overlapping_leaves(start, end):
+    tree = parse(SOURCE, "js")
+
+    def overlaps(leaf_start, leaf_end):
+        if leaf_start == leaf_end:
+            return start <= leaf_start < end
+        return leaf_start < end and leaf_end > start
+
+    assert extract_tokens_in_range(tree, start, end) == [
+        ((leaf_start, leaf_end), kind)
+        for (leaf_start, leaf_end), kind in extract_tokens_from_tree(tree)
+        if overlaps(leaf_start, leaf_end)
+    ]
+
+
+def test_an_edit_only_extracts_the_leaves_around_it(monkeypatch):
+    next_id = Id()
+    snapshot = make_snapshot(SOURCE, "js", next_id=next_id)
+    extracted = []
+
+    def extract_leaves(tree):
+        raise AssertionError("walked the whole tree")
+
+    def extract_in_range(tree, start, end):
+        captures = extract_tokens_in_range(tree, start, end)
+        extracted.extend(captures)
+        return captures
+
+    monkeypatch.setattr(gazel.edits, "extract_leaves", extract_leaves)
+    monkeypatch.setattr(gazel.edits, "extract_tokens_in_range", extract_in_range)
+    line = 250 * 3 + 1
+    edit = {"type": "insert", "row": line, "col": 13, "text": "c + ", "timestamp": 0}
+    edited = edit_source(snapshot, edit, next_id, id=1)
+
+    assert len(extracted) < 10 < len(snapshot.tokens)
+    assert layout(edited) == extract_tokens_from_tree(parse(edited.source.text, "js"))
+
+
+def test_edits_around_syntax_errors_match_a_fresh_parse():
+    source = "let x = 1;\nfoo(x);\n"
+    typed = '[{"a": (x'
+    edits = [
+        {"type": "insert", "row": 0, "col": 8 + i, "text": c, "timestamp": i}
+        for i, c in enumerate(typed)
+    ]
+    edits += [
+        {"type": "delete", "row": 0, "col": 8, "len": 1, "timestamp": 100 + i}
+        for i in range(len(typed))
+    ]
+    versions = make_versions(source, "js", edits, cache=SnapshotCache(0))
+
+    for snapshot in versions:
+        fresh = parse(snapshot.source.text, "js")
+        assert layout(snapshot) == extract_tokens_from_tree(fresh)
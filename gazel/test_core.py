@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from gazel.core import assign_tokens_to_gazes, gaze_tokens, gaze_versions, make_versions
+from gazel.core_types import NO_ID, Categories
+
+
+def test_gaze_versions_are_the_last_snapshot_before_each_gaze():
+    snapshot_times = [0, 10, 20]
+    gaze_times = [-5, 0, 5, 10, 15, 20, 25]
+
+    # a gaze at the time of an edit still sees the text before it
+    assert gaze_versions(gaze_times, snapshot_times).tolist() == [0, 0, 0, 0, 1, 1, 2]
+    assert gaze_versions([5], [0]).tolist() == [0]
+    assert gaze_versions([], snapshot_times).tolist() == []
+
+
+def test_gaze_tokens_skip_missing_and_out_of_range_points():
+    source = "let x = 1;\nfoo();\n"
+    edit = {"type": "insert", "row": 1, "col": 0, "text": "  ", "timestamp": 10}
+    snapshots = make_versions(source, "js", [edit])
+    texts = Categories()
+
+    lines = [0, 1, 1, np.nan, 0, 1, 5, -1]
+    cols = [4, 0, 2, 0, np.nan, 99, 0, 0]
+    versions = [0, 0, 1, 0, 0, 0, 0, 0]
+    offsets, nodes, ids, text_codes = gaze_tokens(
+        lines, cols, versions, snapshots, texts
+    )
+
+    x, foo = snapshots[0].tokens[1], snapshots[0].tokens[5]
+    assert ids[:3].tolist() == [x.id, foo.id, snapshots[1].tokens[5].id]
+    assert [texts.names[code] for code in text_codes[:3]] == ["x", "foo", "foo"]
+    assert offsets[:3].tolist() == [0, 0, 0]
+    assert (nodes[3:] == -1).all()
+    assert (ids[3:] == NO_ID).all()
+    assert (text_codes[3:] == -1).all()
+
+
+def test_assign_tokens_to_gazes_in_lists_and_frames():
+    source = "let x = 1;\nfoo();\n"
+    snapshots = make_versions(source, "js", [])
+    gazes = [
+        {"system_time": 1, "source_file_line": 1, "source_file_col": 2},
+        {"system_time": 2, "source_file_line": 9, "source_file_col": 0},
+    ]
+
+    annotated = assign_tokens_to_gazes(gazes, snapshots)
+    frame = assign_tokens_to_gazes(pd.DataFrame(gazes), snapshots)
+
+    foo = snapshots[0].tokens[5]
+    assert annotated[0] == {
+        **gazes[0],
+        "syntax_node_offset": 2,
+        "syntax_node": "identifier",
+        "syntax_node_id": foo.id,
+        "syntax_node_text": "foo",
+    }
+    assert annotated[1] == {
+        **gazes[1],
+        "syntax_node_offset": None,
+        "syntax_node": None,
+        "syntax_node_id": None,
+        "syntax_node_text": None,
+    }
+    assert "syntax_node" not in gazes[0]
+    assert frame["syntax_node_offset"].dtype == "Int32"
+    assert frame["syntax_node_id"].dtype == "Int64"
+    assert frame["syntax_node_text"].dtype == "category"
+    # the same values, with missing ones as None
+    values = frame.astype(object).where(frame.notna(), None)
+    assert values.to_dict("records") == annotated
@@ -0,0 +1,168 @@
+from typing import Dict, List, Tuple
+
+import pytest
+
+from gazel.aggregation import aggregate_edits, time_window
+from gazel.common import Id
+from gazel.core import make_versions
+from gazel.core_constructors import make_snapshot
+from gazel.core_types import Snapshot
+from gazel.edits import edit_source
+from gazel.range import same_point_range
+from gazel.snapshot_cache import SnapshotCache
+
+
+def layout(snapshot: Snapshot) -> List[Tuple[int, int, str]]:
+    return [
+        (token.range.start.index, token.range.end.index, token.syntax_node)
+        for token in snapshot.tokens
+    ]
+
+
+def group_size(edit: Dict) -> int:
+    return len(edit["edits"]) if edit["type"] == "aggregated" else 1
+
+
+@pytest.mark.parametrize("language", ["cpp", "js"])
+@pytest.mark.parametrize("window", [500, 3000])
+def test_aggregated_replay_matches_step_by_step(load_session, language, window):
+    source, changelog = load_session(language)
+    groups = list(aggregate_edits(changelog, time_window(window)))
+    steps = make_versions(source, language, changelog)
+    aggregated = make_versions(source, language, groups)
+
+    step = 0
+    for i, group in enumerate(groups):
+        step_end = step + group_size(group)
+        check_group(aggregated[i], aggregated[i + 1], steps[step], steps[step_end])
+        step = step_end
+
+
+def check_group(
+    before: Snapshot, after: Snapshot, step_before: Snapshot, step_after: Snapshot
+):
+    """Checks the snapshot `after` a group of edits against the snapshot
+    `step_after` of replaying them one at a time, from `before` and
+    `step_before` respectively."""
+    assert after.source.text == step_after.source.text
+    assert layout(after) == layout(step_after)
+    ids = [token.id for token in after.tokens]
+    assert len(set(ids)) == len(ids)
+
+    # ids of the two replays only differ by new tokens, so they are
+    # compared through the tokens they had before the group
+    old_ids = {token.id for token in before.tokens}
+    step_ids = {
+        step_token.id: token.id
+        for step_token, token in zip(step_before.tokens, before.tokens)
+    }
+    for token, step_token in zip(after.tokens, step_after.tokens):
+        if step_token.id in step_ids:
+            # a token that kept its identity over every single edit
+            # keeps it over the group
+            assert token.id == step_ids[step_token.id]
+
+    # the net changes of the group: each token is reported once, tokens
+    # that kept their id as edited or moved, and new ones as inserted
+    reported = [change.new.id for change in after.changes if change.new]
+    assert len(set(reported)) == len(reported)
+    for change in after.changes:
+        if change.type in ("edited", "moved"):
+            assert change.old.id == change.new.id
+            assert change.old.id in old_ids
+        elif change.type == "inserted":
+            assert change.new.id not in old_ids
+
+    # every token with a new id is reported, and so is every token
+    # that kept its id but not its line and column
+    old_tokens = {token.id: token for token in before.tokens}
+    for token in after.tokens:
+        if token.id not in old_ids:
+            assert token.id in reported
+        elif not same_point_range(old_tokens[token.id].range, token.range):
+            assert token.id in reported
+
+
+def test_aggregated_edit_inside_token_keeps_id():
+    # the group inserts more text than is left of the comment after
+    # the insertion point
+    source = "// a comment\nlet x = 1;\n"
+    edits = [
+        {"type": "insert", "row": 0, "col": 10 + i, "text": c, "timestamp": i}
+        for i, c in enumerate("ntary about the")
+    ]
+    group = {"type": "aggregated", "edits": edits}
+    before, after = make_versions(source, "js", [group])
+    comment = before.tokens[0]
+
+    assert after.source.text.startswith("// a commentary about the")
+    assert after.tokens[0].id == comment.id
+    assert [(c.type, c.old.id, c.new.id) for c in after.changes] == [
+        ("edited", comment.id, comment.id)
+    ]
+    # the same as editing the comment one character at a time
+    steps = make_versions(source, "js", edits)
+    assert steps[-1].tokens[0].id == comment.id
+
+
+def test_edit_that_splits_a_token_keeps_its_id_once():
+    source = "let foobar = 1;\n"
+    edit = {"type": "insert", "row": 0, "col": 7, "text": "1+2", "timestamp": 0}
+    before, after = make_versions(source, "js", [edit])
+    foobar = before.tokens[1]
+
+    assert after.source.text == "let foo1+2bar = 1;\n"
+    ids = [token.id for token in after.tokens]
+    assert len(set(ids)) == len(ids)
+    # the token that the edit starts in is the edited one, the tokens
+    # split off of it are new
+    foo = after.tokens[1]
+    assert after.source.text[foo.range.start.index : foo.range.end.index] == "foo1"
+    assert foo.id == foobar.id
+    changes = [
+        (c.type, c.old.id if c.old else None, c.new.id)
+        for c in after.changes
+        if c.type != "moved"
+    ]
+    new_ids = {token.id for token in after.tokens} - {t.id for t in before.tokens}
+    assert changes[0] == ("edited", foobar.id, foobar.id)
+    assert sorted(changes[1:]) == sorted(("inserted", None, i) for i in new_ids)
+
+
+def test_aggregated_edit_that_splits_a_token():
+    source = "let foobar = 1;\n"
+    edits = [
+        {"type": "insert", "row": 0, "col": 7 + i, "text": c, "timestamp": i}
+        for i, c in enumerate("1 + 2")
+    ]
+    group = {"type": "aggregated", "edits": edits}
+    before, after = make_versions(source, "js", [group])
+    steps = make_versions(source, "js", edits)
+
+    assert after.source.text == "let foo1 + 2bar = 1;\n"
+    check_group(before, after, steps[0], steps[-1])
+    assert after.tokens[1].id == before.tokens[1].id
+
+
+@pytest.mark.parametrize("language", ["cpp", "js"])
+def test_incremental_replay_matches_fresh_parse(load_session, language):
+    source, changelog = load_session(language)
+    versions = make_versions(source, language, changelog, cache=SnapshotCache(0))
+
+    for snapshot in versions:
+        fresh = make_snapshot(snapshot.source.text, language)
+        assert layout(snapshot) == layout(fresh)
+
+
+def test_editing_a_snapshot_leaves_its_tree_unedited():
+    source = "let x = 1;\n"
+    next_id = Id()
+    snapshots = [make_snapshot(source, "js", next_id=next_id)]
+    for i, c in enumerate(" + 2"):
+        edit = {"type": "insert", "row": 0, "col": 9 + i, "text": c, "timestamp": i}
+        snapshots.append(edit_source(snapshots[-1], edit, next_id, id=i + 1))
+
+    for snapshot in snapshots:
+        assert not snapshot.tree.root_node.has_changes
+        fresh = make_snapshot(snapshot.source.text, "js")
+        assert snapshot.tree.root_node.sexp() == fresh.tree.root_node.sexp()
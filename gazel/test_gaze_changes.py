@@ -0,0 +1,101 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+from gazel import Tracker
+from gazel.core_types import GAZE_CHANGE_TYPES, GazeChange, GazeChanges
+
+GAZES = [
+    {"system_time": i, "source_file_line": i // 10, "source_file_col": i % 10}
+    for i in range(50)
+]
+
+
+@pytest.fixture
+def fetched() -> List[List[int]]:
+    return []
+
+
+@pytest.fixture
+def changes(fetched) -> GazeChanges:
+    def records(rows: np.ndarray):
+        fetched.append(rows.tolist())
+        return [GAZES[row] for row in rows.tolist()]
+
+    rows = np.array([3, 7, 3, 20, 41])
+    return GazeChanges(
+        rows,
+        np.array([1, 1, 0, 1, 1], dtype=np.int8),
+        np.array([GAZES[row]["source_file_line"] for row in rows]),
+        np.array([GAZES[row]["source_file_col"] for row in rows]),
+        np.array([5, 6, 7, 8, 9]),
+        np.array([0, 1, 2, 3, 4]),
+        records,
+    )
+
+
+def test_frame_has_a_column_per_field(changes, fetched):
+    frame = changes.frame()
+
+    assert list(frame.columns) == list(GazeChanges.fields)
+    assert frame["row"].tolist() == [3, 7, 3, 20, 41]
+    assert frame["type"].tolist() == ["moved", "moved", "deleted", "moved", "moved"]
+    assert list(frame["type"].cat.categories) == list(GAZE_CHANGE_TYPES)
+    assert frame["old_line"].tolist() == [0, 0, 0, 2, 4]
+    assert frame["new_col"].tolist() == [0, 1, 2, 3, 4]
+    # no gaze is turned into a dict for the frame
+    assert fetched == []
+
+
+def test_changes_are_built_when_iterated(changes, fetched, monkeypatch):
+    monkeypatch.setattr(GazeChanges, "chunk_size", 2)
+
+    listed = list(changes)
+
+    assert fetched == [[3, 7], [3, 20], [41]]
+    assert listed[0] == GazeChange(
+        "moved",
+        GAZES[3],
+        {"system_time": 3, "source_file_line": 5, "source_file_col": 0},
+    )
+    assert listed[2].type == "deleted"
+    assert listed[2].old == GAZES[3]
+    # changes of the same gaze don't share dicts
+    assert listed[0].old is not listed[2].old
+    assert listed[0].old is not GAZES[3]
+
+
+def test_changes_are_a_sequence(changes, fetched):
+    assert len(changes) == 5
+    assert changes[-1] == changes[4] == list(changes)[4]
+    assert changes[1:3] == list(changes)[1:3]
+    assert changes[::2] == list(changes)[::2]
+    # repeated gazes of a slice are fetched once
+    fetched.clear()
+    changes[0:3]
+    assert fetched == [[3, 7]]
+    with pytest.raises(IndexError):
+        changes[5]
+
+
+def test_diff_changes_match_their_frame(load_session, session_gazes):
+    source, changelog = load_session("js")
+    tracker = Tracker(source, session_gazes(source, changelog), changelog, "js")
+
+    gaze_changes = tracker.diff(0, len(tracker.snapshots)).gaze_changes
+    frame = gaze_changes.frame()
+    gazes = tracker.gazes
+
+    assert len(frame) > 0
+    for change, row in zip(gaze_changes, frame.itertuples()):
+        assert change.type == row.type
+        assert change.old == gazes.iloc[[row.row]].to_dict("records")[0]
+        assert (change.old["source_file_line"], change.old["source_file_col"]) == (
+            row.old_line,
+            row.old_col,
+        )
+        assert (change.new["source_file_line"], change.new["source_file_col"]) == (
+            row.new_line,
+            row.new_col,
+        )
@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+
+from gazel.gaze_store import GazeStore
+
+
+def test_integer_columns_are_only_nullable_with_missing_values():
+    store = GazeStore(["system_time", "source_file_line"])
+    store.append(pd.DataFrame({"system_time": [1, 2], "x": [0.5, 1.5]}))
+    store.append([{"system_time": 3, "duration": 10}])
+
+    frame = store.frame()
+    assert frame["system_time"].dtype == np.int64
+    assert frame["system_time"].tolist() == [1, 2, 3]
+    # always nullable, see `NULLABLE_COLUMNS`
+    assert frame["source_file_line"].dtype == pd.Int32Dtype()
+    # missing for the gazes before it
+    assert frame["duration"].dtype == pd.Int32Dtype()
+    assert frame["duration"].isna().tolist() == [True, True, False]
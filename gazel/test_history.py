@@ -0,0 +1,63 @@
+import pytest
+
+from gazel.core import make_versions
+from gazel.core_types import PositionMapping
+from gazel.snapshot_cache import SnapshotCache, default_cache_size
+
+
+@pytest.mark.parametrize("language", ["cpp", "js"])
+def test_rebuilt_snapshots_equal_full_snapshots(load_session, language):
+    source, changelog = load_session(language)
+
+    full = make_versions(source, language, changelog, cache=SnapshotCache(0))
+    rebuilt = make_versions(
+        source, language, changelog, cache=SnapshotCache(0), checkpoint_interval=8
+    )
+
+    for expected, snapshot in zip(full, rebuilt):
+        assert snapshot.source.mapping is not expected.source.mapping
+        assert snapshot == expected
+
+
+def test_position_mappings_compare_by_lines():
+    text = "a\nbc\r\nd"
+    mapping = PositionMapping.from_text(text)
+    edited = PositionMapping.from_text("a\nd").edited(text, 2, 2, 6)
+
+    assert edited == mapping
+    assert edited != PositionMapping.from_text("a\nbc\nd")
+
+
+def test_snapshot_cache_shrinks_with_checkpoint_interval():
+    assert default_cache_size(1) == SnapshotCache().maxsize
+    assert default_cache_size(16) == SnapshotCache().maxsize // 16
+    assert default_cache_size(1000) == 0
+
+
+def test_cached_snapshots_equal_parsed_snapshots(load_session):
+    source, changelog = load_session("js")
+    cache = SnapshotCache()
+
+    parsed = make_versions(source, "js", changelog, cache=SnapshotCache(0))
+    cached = make_versions(source, "js", changelog, cache=cache)
+
+    assert cache.stats().hits > 0
+    assert list(cached) == list(parsed)
+
+
+def test_snapshot_cache_reuses_tree_of_a_repeated_text():
+    source = "let x = 1;\n"
+    typo = {"type": "insert", "row": 0, "col": 9, "text": "2", "timestamp": 0}
+    backspace = {"type": "delete", "row": 0, "col": 9, "len": 1, "timestamp": 1}
+    cache = SnapshotCache()
+
+    versions = make_versions(source, "js", [typo, backspace], cache=cache)
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 1, 2)
+    assert [(t.range, t.syntax_node) for t in versions[2].tokens] == [
+        (t.range, t.syntax_node) for t in versions[0].tokens
+    ]
+    assert versions[2].tree is cache.get(source, "js").snapshot.tree
+    parsed = make_versions(source, "js", [typo, backspace], cache=SnapshotCache(0))
+    assert versions[2] == parsed[2]
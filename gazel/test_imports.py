@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(__file__), os.pardir)
+
+
+def run(script: str) -> str:
+    """Runs `script` in a fresh interpreter, since imports are cached per
+    process, and returns what it printed."""
+    env = {**os.environ, "PYTHONPATH": os.path.abspath(ROOT)}
+    return subprocess.run(
+        [sys.executable, "-c", script],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+
+
+@pytest.mark.parametrize(
+    "package, name, submodule_import",
+    [
+        ("gazel", "Tracker", "import gazel.Tracker"),
+        ("gazel", "Tracker", "from gazel.Tracker import Tracker"),
+        ("gazel", "pprint", "import gazel.pprint"),
+        ("gazel", "pprint", "from gazel.pprint import pprint"),
+        ("gazel.fixation_filters", "ivt", "import gazel.fixation_filters.ivt"),
+    ],
+)
+def test_names_are_not_shadowed_by_their_submodules(package, name, submodule_import):
+    for statements in (
+        [submodule_import, f"from {package} import {name}"],
+        [f"from {package} import {name}", submodule_import],
+    ):
+        script = "\n".join(
+            statements
+            + [
+                f"from {package} import {name} as imported",
+                "import types",
+                "print(isinstance(imported, types.ModuleType), imported.__name__)",
+            ]
+        )
+        assert run(script) == f"False {name}", statements
+
+
+def test_names_of_the_former_star_imports():
+    assert (
+        run(
+            "from gazel import make_versions, assign_tokens_to_gazes, get_edit_time\n"
+            "print(make_versions.__module__, assign_tokens_to_gazes.__module__,"
+            " get_edit_time.__module__)"
+        )
+        == "gazel.core gazel.core gazel.aggregation"
+    )
+
+
+def test_import_gazel_is_cheap():
+    assert (
+        run(
+            "import sys, gazel, gazel.fixation_filters\n"
+            "print(sorted(m for m in ('pandas', 'tree_sitter') if m in sys.modules))"
+        )
+        == "[]"
+    )
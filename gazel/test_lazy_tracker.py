@@ -0,0 +1,47 @@
+import random
+
+import pandas as pd
+
+from gazel import Tracker
+
+
+def test_lazy_tracker_builds_snapshots_when_accessed(load_session, session_gazes):
+    source, changelog = load_session("js")
+    tracker = Tracker(
+        source, session_gazes(source, changelog), changelog, "js", lazy=True
+    )
+    history = tracker.snapshots.history
+
+    assert len(history) == 0
+    tracker.snapshot(0)
+    assert len(history) == 1
+    tracker.get_fixations_for_snapshot(2)
+    assert len(history) == 3 < len(tracker.snapshots)
+
+
+def test_lazy_snapshots_equal_eager_snapshots(load_session, session_gazes):
+    source, changelog = load_session("js")
+    gazes = session_gazes(source, changelog)
+    eager = Tracker(source, gazes, changelog, "js")
+    # a small replay cache, so that snapshots are evicted and rebuilt
+    lazy = Tracker(
+        source,
+        gazes,
+        changelog,
+        "js",
+        lazy=True,
+        checkpoint_interval=4,
+        replay_cache_size=2,
+    )
+
+    indices = list(range(len(eager.snapshots)))
+    random.Random(0).shuffle(indices)
+    for i in indices + indices:
+        assert lazy.snapshot(i) == eager.snapshot(i)
+        # categories are listed in the order that windows were annotated in
+        pd.testing.assert_frame_equal(
+            lazy.get_fixations_for_snapshot(i),
+            eager.get_fixations_for_snapshot(i),
+            check_categorical=False,
+        )
+    pd.testing.assert_frame_equal(lazy.gazes, eager.gazes, check_categorical=False)
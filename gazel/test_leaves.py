@@ -0,0 +1,53 @@
+import sys
+
+import pytest
+
+from gazel.parsing import (
+    extract_leaves,
+    extract_tokens_from_tree,
+    is_child_node,
+    parse,
+    walk_tree,
+)
+
+
+def walked_leaves(tree):
+    """The leaves of `tree`, visited with `walk_tree`."""
+    leaves = []
+
+    def visit(cursor):
+        node = cursor.node
+        if is_child_node(node):
+            leaves.append(((node.start_byte, node.end_byte), node.type))
+
+    walk_tree(tree.walk(), "down", visit)
+    return leaves
+
+
+@pytest.mark.parametrize("language", ["cpp", "js"])
+def test_leaves_match_a_walk_of_every_node(load_session, language):
+    source, _ = load_session(language)
+    tree = parse(source, language)
+
+    leaves = extract_leaves(tree)
+
+    assert leaves.captures() == walked_leaves(tree)
+    assert extract_tokens_from_tree(tree) == walked_leaves(tree)
+    assert len(leaves.start_bytes) == len(leaves.end_bytes) == len(leaves.kinds)
+    assert set(leaves.kinds) == set(leaves.kind_names)
+
+
+def test_deeply_nested_source_does_not_recurse():
+    depth = sys.getrecursionlimit() * 2
+    source = "x = " + "[" * depth + "]" * depth + ";\n"
+
+    leaves = extract_leaves(parse(source, "js"))
+
+    assert len(leaves.start_bytes) == 2 * depth + 3
+    assert leaves.captures() == walked_leaves(parse(source, "js"))
+
+
+def test_root_of_an_empty_source_is_its_only_leaf():
+    leaves = extract_leaves(parse("", "js"))
+
+    assert leaves.captures() == [((0, 0), "program")]
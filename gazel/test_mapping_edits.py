@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from gazel.core_types import LINES_PER_CHUNK, PositionMapping
+from gazel.text import Rope
+
+TEXT = "".join(
+    f"line {i}" + ("\r\n" if i % 7 == 0 else "\n") for i in range(3 * LINES_PER_CHUNK)
+)
+
+
+def check_edit(mapping: PositionMapping, start: int, old_end: int, inserted: str):
+    text = mapping.text
+    new_text = text[:start] + inserted + text[old_end:]
+    new_end = start + len(inserted)
+
+    edited = mapping.edited(new_text, start, old_end, new_end)
+    expected = PositionMapping.from_text(new_text)
+    assert edited == expected
+    assert edited.line_count == expected.line_count
+    for index in range(max(start - 20, 0), min(new_end + 20, len(new_text)) + 1):
+        assert edited[index] == expected[index]
+    assert edited[len(new_text)] == expected[len(new_text)]
+
+    return edited
+
+
+@pytest.mark.parametrize(
+    "start, old_end, inserted",
+    [
+        (0, 0, "x"),
+        (5, 5, "\n"),
+        (5, 5, "a\nb\r\nc"),
+        (0, len(TEXT), ""),
+        (10, 200, ""),
+        (len(TEXT), len(TEXT), "\nend"),
+        # across chunks
+        (TEXT.index("line 250"), TEXT.index("line 700"), "joined"),
+    ],
+)
+def test_edited_mapping_equals_mapping_of_the_text(start, old_end, inserted):
+    check_edit(PositionMapping.from_text(TEXT), start, old_end, inserted)
+
+
+def test_edits_that_change_line_breaks():
+    mapping = PositionMapping.from_text("a\rb\r\nc\n")
+
+    # "\r" + "\n" is one line break, "\r\n" split in two is two
+    joined = check_edit(mapping, 2, 2, "\n")
+    assert joined.line_count == 3
+    split = check_edit(mapping, 4, 4, "x")
+    assert split.line_count == 4
+
+
+def test_random_edits():
+    rng = random.Random(0)
+    mapping = PositionMapping.from_text(TEXT)
+    for _ in range(200):
+        start = rng.randrange(len(mapping.text) + 1)
+        old_end = min(start + rng.choice([0, 0, 1, 5, 300]), len(mapping.text))
+        inserted = "".join(rng.choice("ab\n\r") for _ in range(rng.choice([0, 1, 4])))
+        mapping = check_edit(mapping, start, old_end, inserted)
+
+
+def test_edits_share_the_chunks_they_do_not_touch():
+    mapping = PositionMapping.from_text(TEXT)
+    start = TEXT.index("line 300")
+    edited = mapping.edited(TEXT[:start] + "\n" + TEXT[start:], start, start, start + 1)
+
+    assert edited._chunks[0] is mapping._chunks[0]
+    # later chunks are shifted as a whole
+    assert edited._chunks[-1] is mapping._chunks[-1]
+    assert edited.line_count == mapping.line_count + 1
+
+
+def test_edited_mapping_reads_a_rope():
+    rope = Rope.from_text(TEXT)
+    mapping = PositionMapping.from_text(TEXT)
+    edited_rope = rope.insert(100, "x\ny")
+
+    edited = mapping.edited(edited_rope, 100, 100, 103)
+    assert edited == PositionMapping.from_text(str(edited_rope))
+    assert edited.text is edited_rope
@@ -0,0 +1,97 @@
+import os
+import threading
+
+import pytest
+
+import gazel.parsing
+from gazel.parsing import ParserRegistry, build_language, get_library_cache_key
+
+
+def test_registry_loads_languages_outside_of_its_lock(monkeypatch):
+    building = threading.Event()
+    release = threading.Event()
+    loads = []
+
+    def load_language(extension, **kwargs):
+        loads.append(extension)
+        if extension == "cpp":
+            building.set()
+            release.wait(5)
+        return f"grammar for {extension}"
+
+    monkeypatch.setattr(gazel.parsing, "load_language", load_language)
+    registry = ParserRegistry()
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.language("cpp")))
+        for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    assert building.wait(5)
+
+    # another extension loads while cpp is still being built
+    other = threading.Thread(target=registry.language, args=("js",))
+    other.start()
+    other.join(1)
+    assert not other.is_alive()
+
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ["grammar for cpp"] * 2
+    assert sorted(loads) == ["cpp", "js"]
+    stats = registry.stats()
+    assert (stats.language_hits, stats.language_misses) == (1, 2)
+
+
+@pytest.fixture
+def grammar(tmp_path, monkeypatch):
+    """A fake grammar checkout, built by writing its sources to the
+    library. Returns the checkout and the list of built libraries."""
+    repo_path = tmp_path / "tree-sitter-fake"
+    (repo_path / "src").mkdir(parents=True)
+    (repo_path / "src" / "parser.c").write_text("int parser;")
+    builds = []
+
+    def build_library(library_path, repo_paths):
+        builds.append(library_path)
+        with open(library_path, "w") as f:
+            f.write((repo_path / "src" / "parser.c").read_text())
+
+    monkeypatch.setattr(gazel.parsing.Language, "build_library", build_library)
+    return repo_path, builds
+
+
+def test_build_language_reuses_cached_library(tmp_path, grammar):
+    repo_path, builds = grammar
+    library = build_language("fake", cache_dir=str(tmp_path))
+
+    assert os.path.basename(library).startswith("fake-")
+    assert build_language("fake", cache_dir=str(tmp_path)) == library
+    assert len(builds) == 1
+
+
+def test_library_cache_key_follows_sources_and_flags(tmp_path, grammar, monkeypatch):
+    repo_path, builds = grammar
+    key = get_library_cache_key(str(repo_path))
+    library = build_language("fake", cache_dir=str(tmp_path))
+
+    (repo_path / "src" / "parser.c").write_text("int parser = 1;")
+    assert get_library_cache_key(str(repo_path)) != key
+    edited = build_language("fake", cache_dir=str(tmp_path))
+    assert edited != library
+
+    monkeypatch.setenv("CFLAGS", "-O3")
+    assert build_language("fake", cache_dir=str(tmp_path)) not in (library, edited)
+    assert len(builds) == 3
+
+
+def test_missing_grammar_is_not_cloned(tmp_path, monkeypatch):
+    def clone_repo(*args):
+        raise AssertionError("cloned")
+
+    monkeypatch.setattr(gazel.parsing, "clone_repo", clone_repo)
+    with pytest.raises(FileNotFoundError, match="tree-sitter-missing"):
+        build_language("missing", cache_dir=str(tmp_path))
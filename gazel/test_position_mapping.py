@@ -0,0 +1,65 @@
+from typing import Dict, Tuple
+
+import pytest
+
+from gazel.core_types import LINES_PER_CHUNK, Point, PositionMapping
+
+TEXTS = [
+    "",
+    "a",
+    "a\nbc\n",
+    "a\r\nbc\rd\n\n",
+    "\n".join(f"line {i}" for i in range(3 * LINES_PER_CHUNK + 5)),
+]
+
+
+def character_mapping(text: str) -> Tuple[Dict[int, Point], Dict[Point, int]]:
+    """The mapping as one entry per character, the way it was stored
+    before `PositionMapping`."""
+    lines = text.splitlines(True) or [""]
+    points = {}
+    index = 0
+    for line, contents in enumerate(lines):
+        for col in range(len(contents)):
+            points[index] = Point(line, col)
+            index += 1
+    points[index] = Point(len(lines) - 1, len(lines[-1]))
+
+    return points, {point: index for index, point in points.items()}
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_mapping_matches_a_mapping_per_character(text):
+    mapping = PositionMapping.from_text(text)
+    points, indices = character_mapping(text)
+
+    for index, point in points.items():
+        assert mapping[index] == point
+    for point, index in indices.items():
+        assert mapping[point.line, point.col] == index
+    assert mapping.line_count == max(len(text.splitlines()), 1)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_points_outside_of_the_text_are_missing(text):
+    mapping = PositionMapping.from_text(text)
+    points, _ = character_mapping(text)
+    last = points[len(text)]
+
+    for key in [-1, len(text) + 1]:
+        with pytest.raises(KeyError):
+            mapping[key]
+    for line, col in [(-1, 0), (0, -1), (last.line, last.col + 1), (last.line + 1, 0)]:
+        with pytest.raises(KeyError):
+            mapping[line, col]
+
+
+def test_none_column_is_the_end_of_the_line():
+    text = "ab\r\ncde\n\nf"
+    mapping = PositionMapping.from_text(text)
+
+    assert [mapping[line, None] for line in range(4)] == [2, 7, 8, 10]
+    # a missing line is the first line
+    assert mapping[None, 1] == 1
+    with pytest.raises(KeyError):
+        mapping[4, None]
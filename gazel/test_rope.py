@@ -0,0 +1,67 @@
+import random
+
+from gazel.parsing import extract_tokens_from_tree, parse
+from gazel.text import LEAF_SIZE, Rope
+
+TEXT = "".join(f"let x{i} = 'é{i}';\n" for i in range(400))
+
+
+def test_edits_match_string_edits():
+    rng = random.Random(0)
+    text = TEXT
+    rope = Rope.from_text(text)
+    for _ in range(300):
+        start = rng.randrange(len(text) + 1)
+        if rng.random() < 0.5:
+            inserted = "".join(
+                rng.choice("ab\né") for _ in range(rng.choice([1, 50, 3000]))
+            )
+            text = text[:start] + inserted + text[start:]
+            rope = rope.insert(start, inserted)
+        else:
+            end = min(start + rng.choice([1, 50, 3000]), len(text))
+            text = text[:start] + text[end:]
+            rope = rope.delete(start, end)
+
+        assert len(rope) == len(text)
+        assert rope.nbytes == len(text.encode("utf-8"))
+        lo = rng.randrange(len(text) + 1)
+        assert rope[lo : lo + 100] == text[lo : lo + 100]
+    assert str(rope) == text
+
+
+def test_edits_leave_the_rope_unchanged():
+    rope = Rope.from_text("hello world")
+
+    assert str(rope.insert(5, ",")) == "hello, world"
+    assert str(rope.delete(0, 6)) == "world"
+    assert str(rope) == "hello world"
+    assert rope.insert(3, "") is rope
+    assert rope.delete(3, 3) is rope
+    assert str(Rope.from_text("").insert(0, "a")) == "a"
+
+
+def test_read_returns_the_encoded_text_in_chunks():
+    rope = Rope.from_text(TEXT).insert(LEAF_SIZE // 2, "ünïcode")
+    encoded = str(rope).encode("utf-8")
+
+    chunks = []
+    offset = 0
+    while True:
+        chunk = rope.read(offset)
+        if not chunk:
+            break
+        assert len(chunk) <= 2 * LEAF_SIZE
+        chunks.append(chunk)
+        offset += len(chunk)
+    assert b"".join(chunks) == encoded
+    assert rope.read(len(encoded)) == b""
+    assert rope.read(3) == encoded[3 : 3 + len(rope.read(3))]
+
+
+def test_parsing_a_rope_equals_parsing_its_text():
+    rope = Rope.from_text(TEXT).insert(100, "\nfunction f() { return 'ö'; }\n")
+
+    assert extract_tokens_from_tree(parse(rope, "js")) == extract_tokens_from_tree(
+        parse(str(rope), "js")
+    )
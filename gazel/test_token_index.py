@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from gazel import Tracker
+
+
+def test_token_gazes_match_a_scan_of_the_gazes(load_session, session_gazes):
+    source, changelog = load_session("js")
+    gazes = session_gazes(source, changelog)
+    half = len(gazes) // 2
+    tracker = Tracker(source, gazes.iloc[:half], changelog, "js")
+    ids = tracker.gazes["syntax_node_id"].dropna().unique()[:20].tolist()
+    tracker.get_token_gazes(set(ids))
+
+    # gazes appended after the index was built are found as well
+    tracker.append_gazes(gazes.iloc[half:])
+    frame = tracker.gazes
+
+    for token_id in ids:
+        expected = frame[frame["syntax_node_id"] == token_id]
+        pd.testing.assert_frame_equal(tracker.get_token_gazes(token_id), expected)
+    token_ids = frame["syntax_node_id"].fillna(-1).astype(np.int64)
+    expected = frame[token_ids.isin(ids)]
+    pd.testing.assert_frame_equal(tracker.get_token_gazes(set(ids)), expected)
+    assert tracker.get_token_gazes(-5).empty
+
+
+def test_diff_finds_the_gazes_of_moved_tokens(load_session, session_gazes):
+    source, changelog = load_session("js")
+    tracker = Tracker(source, session_gazes(source, changelog), changelog, "js")
+    end = len(tracker.snapshots)
+
+    diff = tracker.diff(0, end)
+
+    # the gazes of each moved token before the last snapshot, by a scan
+    gazes = tracker.gazes
+    before_end = gazes[gazes["system_time"] < tracker.snapshot_times[end - 1]]
+    expected = [
+        row
+        for change in diff.token_changes
+        if change.type == "moved"
+        for row in before_end.index[before_end["syntax_node_id"] == change.old.id]
+    ]
+    assert len(expected) > 0
+    assert diff.gaze_changes.rows.tolist() == expected
+    assert np.all(diff.gaze_changes.frame()["type"] == "moved")
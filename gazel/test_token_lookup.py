@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from gazel.core_types import PositionMapping, TokenTable, syntax_nodes
+from gazel.range import range_contains_index, range_overlaps
+
+SOURCE = "abc de  fgh\nij"
+# with gaps between tokens and empty tokens, like missing nodes
+SPANS = [(0, 3), (4, 4), (4, 6), (8, 8), (8, 11), (12, 14), (14, 14)]
+
+
+def table(spans=SPANS) -> TokenTable:
+    return TokenTable.from_spans(
+        SOURCE,
+        PositionMapping.from_text(SOURCE),
+        [start for start, _ in spans],
+        [end for _, end in spans],
+        syntax_nodes.codes("identifier" for _ in spans),
+    )
+
+
+def scanned_row(tokens: TokenTable, index: int) -> int:
+    """The row of the token that contains `index`, by a linear scan."""
+    for row, token in enumerate(tokens):
+        if range_contains_index(token.range, index):
+            return row
+    return -1
+
+
+@pytest.mark.parametrize("spans", [SPANS, []])
+def test_rows_at_match_a_linear_scan(spans):
+    tokens = table(spans)
+    indices = np.arange(-2, len(SOURCE) + 3)
+
+    expected = [scanned_row(tokens, index) for index in indices.tolist()]
+    assert [tokens.row_at(index) for index in indices.tolist()] == expected
+    assert tokens.rows_at(indices).tolist() == expected
+    assert [tokens.token_at(index) for index in indices.tolist()] == [
+        tokens[row] if row >= 0 else None for row in expected
+    ]
+
+
+def test_first_overlapping_matches_a_linear_scan():
+    tokens = table()
+    spans = [(token.range.start.index, token.range.end.index) for token in tokens]
+
+    for start in range(-1, len(SOURCE) + 2):
+        for end in range(start, len(SOURCE) + 3):
+            expected = next(
+                (
+                    row
+                    for row, span in enumerate(spans)
+                    if range_overlaps(span, (start, end))
+                ),
+                -1,
+            )
+            assert tokens.first_overlapping(start, end) == expected, (start, end)
+
+
+def test_rows_of_and_lookup_find_exact_spans():
+    tokens = table()
+    starts = [0, 4, 4, 8, 0, 13]
+    ends = [3, 4, 6, 11, 4, 14]
+
+    assert tokens.rows_of(starts, ends).tolist() == [0, 1, 2, 4, -1, -1]
+    assert tokens.lookup(tokens[2].range) == tokens[2]
+    assert table([]).rows_of(starts, ends).tolist() == [-1] * len(starts)
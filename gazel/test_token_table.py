@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from gazel.core_constructors import make_snapshot
+from gazel.core_types import NO_ID, PositionMapping, Token, TokenTable
+
+SOURCE = "let x = 1;\nfoo(x, 'a');\n"
+
+
+@pytest.fixture
+def tokens() -> TokenTable:
+    return make_snapshot(SOURCE, "js").tokens
+
+
+def test_table_round_trips_through_tokens(tokens):
+    listed = list(tokens)
+    rebuilt = TokenTable.from_tokens(SOURCE, listed)
+
+    assert rebuilt == tokens
+    assert all(isinstance(token, Token) for token in listed)
+    assert [tokens[i] for i in range(len(tokens))] == listed
+    assert tokens[-1] == listed[-1]
+    assert [repr(token) for token in listed[:4]] == ["let", "x", "=", "1"]
+    assert TokenTable.from_tokens(SOURCE, []) == tokens[:0]
+
+
+def test_columns_are_compact_arrays(tokens):
+    dtypes = {column: getattr(tokens, column).dtype for column in tokens.columns}
+
+    assert dtypes == {
+        "start_index": np.int64,
+        "end_index": np.int64,
+        "start_line": np.int32,
+        "start_col": np.int32,
+        "end_line": np.int32,
+        "end_col": np.int32,
+        "ids": np.int64,
+        "syntax_node_codes": np.int32,
+    }
+    assert list(tokens.syntax_nodes()[:2]) == ["let", "identifier"]
+
+
+def test_slices_are_tables(tokens):
+    head = tokens[:3]
+
+    assert isinstance(head, TokenTable)
+    assert list(head) == list(tokens)[:3]
+    with pytest.raises(IndexError):
+        tokens[len(tokens)]
+
+
+def test_tokens_without_an_id(tokens):
+    unassigned = tokens.with_ids(np.full(len(tokens), NO_ID, dtype=np.int64))
+
+    assert all(token.id is None for token in unassigned)
+    assert TokenTable.from_tokens(SOURCE, unassigned) == unassigned
+    assert unassigned != tokens
+
+
+def test_shifted_tokens_follow_the_mapping(tokens):
+    source = "\n\n" + SOURCE
+    shifted = tokens.shifted(2, source, PositionMapping.from_text(source))
+    expected = make_snapshot(source, "js").tokens
+
+    assert [token.range for token in shifted] == [token.range for token in expected]
+    assert TokenTable.concatenate(SOURCE, [tokens[:3], tokens[3:]]) == tokens
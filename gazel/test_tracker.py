@@ -1 +1,120 @@
+import numpy as np
+import pandas as pd
+import pytest
 
+from gazel import Tracker
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_live_session_matches_whole_session(load_session, session_gazes, lazy):
+    source, changelog = load_session("js")
+    gazes = session_gazes(source, changelog)
+    # edits are not grouped, since live edits never join a built group
+    whole = Tracker(source, gazes, changelog, "js", 0)
+
+    live = Tracker(source, [], [], "js", 0, lazy=lazy)
+    assert live.gazes.empty
+    assert live.get_fixations_for_snapshot(0).empty
+    times = gazes["system_time"].to_numpy()
+    seen = 0
+    for edit in changelog:
+        # the gazes before each edit arrive before it
+        before = int(np.searchsorted(times, edit["timestamp"]))
+        live.append_gazes(gazes.iloc[seen:before].to_dict("records"))
+        seen = before
+        live.append_edits([edit])
+    live.append_gazes(gazes.iloc[seen:])
+
+    assert len(live.snapshots) == len(whole.snapshots)
+    for snapshot, expected in zip(live.snapshots, whole.snapshots):
+        assert snapshot == expected
+    # categories are listed in the order that gazes were annotated in
+    pd.testing.assert_frame_equal(live.gazes, whole.gazes, check_categorical=False)
+
+
+def test_tracker_without_gazes_has_empty_windows():
+    tracker = Tracker("let x = 1;\n", [], [], "js")
+    tracker.append_edits(
+        [{"type": "insert", "row": 0, "col": 0, "text": "a", "timestamp": 10}]
+    )
+
+    assert len(tracker.snapshots) == 2
+    assert tracker.gazes_between(0, 100).empty
+    assert all(w.empty for w in tracker.get_fixations_for_snapshots([0, 1]))
+    assert all(w.empty for w in tracker.fixations_for_edit_windows([0, 1]))
+    assert len(tracker.diff(0, 2).gaze_changes) == 0
+
+
+def test_snapshot_at_time(load_session):
+    source, changelog = load_session("js")
+    tracker = Tracker(source, [], changelog, "js", 0)
+    first, last = changelog[0]["timestamp"], changelog[-1]["timestamp"]
+    times = [first - 1, first, first + 1, last, last + 10_000]
+    expected = [
+        tracker.snapshots[0],
+        tracker.snapshots[1],
+        tracker.snapshots[1],
+        tracker.snapshots[-1],
+        tracker.snapshots[-1],
+    ]
+
+    # before the first edit is the original source
+    assert [tracker.snapshot_at_time(t) for t in times] == expected
+    assert tracker.snapshots_at_times(times) == expected
+
+
+@pytest.mark.parametrize("window", [0, 3000])
+def test_windows_match_gaze_times(load_session, session_gazes, window):
+    source, changelog = load_session("js")
+    gazes = session_gazes(source, changelog)
+    tracker = Tracker(source, gazes, changelog, "js", window)
+    if window:
+        assert len(tracker.snapshots) < len(changelog) + 1
+    all_gazes = tracker.gazes
+    times = all_gazes["system_time"].to_numpy()
+    # the times at which snapshots start, and end
+    bounds = [*tracker.snapshot_times, np.inf]
+
+    def between(start, end):
+        return all_gazes[(times >= start) & (times < end)]
+
+    indices = range(len(tracker.snapshots))
+    for i, frame in zip(indices, tracker.get_fixations_for_snapshots(indices)):
+        pd.testing.assert_frame_equal(frame, between(bounds[i], bounds[i + 1]))
+    # the window of an edit lasts from the snapshot after it until the
+    # next edit, and is open ended for the last edit
+    for i, frame in zip(indices, tracker.fixations_for_edit_windows(indices)):
+        start = bounds[i + 1] if i else 0
+        end = bounds[i + 2] if i + 2 < len(bounds) else np.inf
+        pd.testing.assert_frame_equal(frame, between(start, end))
+
+    last = len(tracker.snapshots) - 1
+    pd.testing.assert_frame_equal(
+        tracker.fixations_for_edit_window(last - 1),
+        between(bounds[last] if last > 1 else 0, np.inf),
+    )
+    assert tracker.fixations_for_edit_window(last).empty
+
+
+def test_appended_gazes_keep_their_dtypes_and_own_categories(
+    load_session, session_gazes
+):
+    cpp_source, cpp_changelog = load_session("cpp")
+    Tracker(cpp_source, session_gazes(cpp_source, cpp_changelog), cpp_changelog, "cpp")
+    source, changelog = load_session("js")
+    gazes = session_gazes(source, changelog)
+    tracker = Tracker(source, gazes.iloc[:10], changelog, "js")
+
+    tracker.append_gazes(gazes.iloc[10:].to_dict("records"))
+
+    frame = tracker.gazes
+    assert len(frame) == len(gazes)
+    assert frame["system_time"].dtype == np.int64
+    assert frame["source_file_line"].dtype == pd.Int32Dtype()
+    assert frame["syntax_node_offset"].dtype == pd.Int32Dtype()
+    assert frame["syntax_node_id"].dtype == pd.Int64Dtype()
+    for column in ("syntax_node", "syntax_node_text"):
+        assert frame[column].dtype == "category"
+    # node types of the C++ grammar are not categories of JavaScript gazes
+    nodes = frame["syntax_node"]
+    assert set(nodes.cat.categories) == set(nodes.dropna())
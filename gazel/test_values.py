@@ -0,0 +1,59 @@
+import copy
+import pickle
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from gazel.core_types import Point, Position, Range, Token
+
+
+def token(start: int, end: int, id=1) -> Token:
+    return Token(
+        Range(Position(start, Point(0, start)), Position(end, Point(0, end))),
+        "abcdef",
+        id,
+        "identifier",
+    )
+
+
+VALUES = [Point(1, 2), Position(3, Point(1, 2)), token(1, 3).range, token(1, 3)]
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_values_survive_pickling_and_copying(value):
+    for copied in (pickle.loads(pickle.dumps(value)), copy.deepcopy(value)):
+        assert copied == value
+        assert hash(copied) == hash(value)
+        assert type(copied) is type(value)
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_values_are_immutable(value):
+    name = value._fields[0]
+    with pytest.raises(FrozenInstanceError):
+        setattr(value, name, None)
+    with pytest.raises(FrozenInstanceError):
+        delattr(value, name)
+    with pytest.raises(AttributeError):
+        value.other = 1
+
+
+def test_values_compare_as_tuples_of_their_fields():
+    assert Point(1, 2) == Point(1, 2)
+    assert Point(1, 2) != Point(2, 1)
+    assert Point(0, 9) < Point(1, 0) <= Point(1, 0) < Point(1, 1)
+    assert Point(2, 0) > Point(1, 5) >= Point(1, 5)
+    assert sorted([token(3, 4), token(1, 2, id=2), token(1, 2)]) == [
+        token(1, 2),
+        token(1, 2, id=2),
+        token(3, 4),
+    ]
+    assert len({token(1, 2), token(1, 2), token(1, 2, id=2)}) == 2
+
+
+def test_values_of_different_types_are_not_equal():
+    # like dataclasses, values only equal values of their own type
+    assert Point(1, 2) != (1, 2)
+    assert Position(1, Point(0, 1)) != Point(0, 1)
+    with pytest.raises(TypeError):
+        Point(1, 2) < (1, 2)
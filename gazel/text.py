@@ -0,0 +1,215 @@
+from typing import List, Optional, Tuple, Union
+
+# leaves are split to at most this many characters, and small
+# neighbouring leaves are merged up to it
+LEAF_SIZE = 1024
+
+
+class _Leaf:
+    __slots__ = ("text", "size", "nbytes")
+    height = 0
+
+    def __init__(self, text: str):
+        self.text = text
+        self.size = len(text)
+        self.nbytes = len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+class _Node:
+    __slots__ = ("left", "right", "size", "nbytes", "height")
+
+    def __init__(self, left: "_Tree", right: "_Tree"):
+        self.left = left
+        self.right = right
+        self.size = left.size + right.size
+        self.nbytes = left.nbytes + right.nbytes
+        self.height = max(left.height, right.height) + 1
+
+
+_Tree = Union[_Leaf, _Node]
+
+
+def _rotate_right(node: _Node) -> _Node:
+    left = node.left
+    return _Node(left.left, _Node(left.right, node.right))
+
+
+def _rotate_left(node: _Node) -> _Node:
+    right = node.right
+    return _Node(_Node(node.left, right.left), right.right)
+
+
+def _balanced(left: _Tree, right: _Tree) -> _Node:
+    """`_Node(left, right)`, rotated if the heights of `left` and
+    `right` differ by 2."""
+    node = _Node(left, right)
+    if left.height > right.height + 1:
+        if left.right.height > left.left.height:
+            node = _Node(_rotate_left(left), right)
+        return _rotate_right(node)
+    if right.height > left.height + 1:
+        if right.left.height > right.right.height:
+            node = _Node(left, _rotate_right(right))
+        return _rotate_left(node)
+
+    return node
+
+
+def _join(left: Optional[_Tree], right: Optional[_Tree]) -> Optional[_Tree]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+
+    if abs(left.height - right.height) <= 1:
+        if (
+            isinstance(left, _Leaf)
+            and isinstance(right, _Leaf)
+            and left.size + right.size <= LEAF_SIZE
+        ):
+            return _Leaf(left.text + right.text)
+        return _Node(left, right)
+    if left.height > right.height:
+        return _balanced(left.left, _join(left.right, right))
+
+    return _balanced(_join(left, right.left), right.right)
+
+
+def _split(
+    tree: Optional[_Tree], index: int
+) -> Tuple[Optional[_Tree], Optional[_Tree]]:
+    if tree is None:
+        return None, None
+    if isinstance(tree, _Leaf):
+        left, right = tree.text[:index], tree.text[index:]
+        return (_Leaf(left) if left else None, _Leaf(right) if right else None)
+
+    if index <= tree.left.size:
+        left, right = _split(tree.left, index)
+        return left, _join(right, tree.right)
+
+    left, right = _split(tree.right, index - tree.left.size)
+    return _join(tree.left, left), right
+
+
+def _build(leaves: List[_Leaf]) -> Optional[_Tree]:
+    if not leaves:
+        return None
+    if len(leaves) == 1:
+        return leaves[0]
+
+    middle = len(leaves) // 2
+    return _Node(_build(leaves[:middle]), _build(leaves[middle:]))
+
+
+def _collect(tree: Optional[_Tree], start: int, stop: int, chunks: List[str]):
+    """Appends the text of `[start, stop)` of `tree` to `chunks`."""
+    if tree is None or start >= stop:
+        return
+    if isinstance(tree, _Leaf):
+        chunks.append(tree.text[start:stop])
+        return
+
+    size = tree.left.size
+    if start < size:
+        _collect(tree.left, start, min(stop, size), chunks)
+    if stop > size:
+        _collect(tree.right, max(start - size, 0), stop - size, chunks)
+
+
+class Rope:
+    """An immutable text, stored as a balanced tree of chunks.
+
+    Inserting and deleting return a new `Rope` in O(log n), which shares
+    all unchanged chunks with this one. Contiguous text is only built
+    when it is asked for, with `str(rope)` or a slice, and parsers can
+    read the utf-8 encoded text chunk by chunk through `read`.
+
+    Replaying edits still builds the text of every snapshot once, since
+    `Source.text` and the tokens refer to it as a `str`, so an edit
+    costs time linear in the size of the text either way. The rope only
+    saves the copies made for each edit of a group and for parsing.
+    """
+
+    __slots__ = ("_tree",)
+
+    def __init__(self, tree: Optional[_Tree] = None):
+        self._tree = tree
+
+    @classmethod
+    def from_text(cls, text: str) -> "Rope":
+        return cls(
+            _build(
+                [_Leaf(text[i : i + LEAF_SIZE]) for i in range(0, len(text), LEAF_SIZE)]
+            )
+        )
+
+    def __len__(self) -> int:
+        return self._tree.size if self._tree is not None else 0
+
+    @property
+    def nbytes(self) -> int:
+        """length of the utf-8 encoded text"""
+        return self._tree.nbytes if self._tree is not None else 0
+
+    def insert(self, index: int, text: str) -> "Rope":
+        if not text:
+            return self
+
+        left, right = _split(self._tree, index)
+        inserted = Rope.from_text(text)._tree
+        return Rope(_join(_join(left, inserted), right))
+
+    def delete(self, start: int, end: int) -> "Rope":
+        if start >= end:
+            return self
+
+        left, rest = _split(self._tree, start)
+        _, right = _split(rest, end - start)
+        return Rope(_join(left, right))
+
+    def __getitem__(self, key: slice) -> str:
+        """The text of a slice of the rope, built from the chunks that
+        it spans only."""
+        start, stop, step = key.indices(len(self))
+        if step != 1:
+            return str(self)[key]
+
+        chunks = []
+        _collect(self._tree, start, stop, chunks)
+        return "".join(chunks)
+
+    def read(self, byte_offset: int, point=None) -> bytes:
+        """Returns the encoded text from `byte_offset` to the end of the
+        chunk that contains it, or `b""` at the end of the text.
+
+        This is the read callback of `tree_sitter.Parser.parse`.
+        """
+        tree = self._tree
+        if tree is None or byte_offset >= tree.nbytes:
+            return b""
+
+        while isinstance(tree, _Node):
+            if byte_offset < tree.left.nbytes:
+                tree = tree.left
+            else:
+                byte_offset -= tree.left.nbytes
+                tree = tree.right
+
+        return tree.text.encode("utf-8")[byte_offset:]
+
+    def __str__(self) -> str:
+        chunks = []
+        stack = [self._tree] if self._tree is not None else []
+        while stack:
+            tree = stack.pop()
+            if isinstance(tree, _Leaf):
+                chunks.append(tree.text)
+            else:
+                stack.append(tree.right)
+                stack.append(tree.left)
+
+        return "".join(chunks)
+
+    def __repr__(self):
+        return f"Rope({str(self)!r})"
@@ -18,6 +18,7 @@ setuptools.setup(
         'GitPython',
         'tqdm',
         'pandas',
+        'numpy',
         "tree_sitter",
     ],
     classifiers=[